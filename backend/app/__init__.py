@@ -1,18 +1,54 @@
+import importlib
 import os
 from flask import Flask
-from flask_migrate import Migrate
-from dotenv import load_dotenv
 
 from app.models import db
+from app.cache import cache
+from app import banco, conexoes, eventos, instrumentacao, replicas, resumos, importacao
 
-# Carregar variáveis de ambiente
-load_dotenv()
+# Blueprints (módulo em app.routes, prefixo), importados só pelo create_app
+BLUEPRINTS = (
+    ("views", None),  # Frontend (HTML)
+    ("auth", None),  # API
+    ("usuarios", "/api/usuarios"),
+    ("veiculos", "/api/veiculos"),
+    ("servicos", "/api/servicos"),
+    ("dashboard", "/api/dashboard"),
+    ("exportacao", "/api/export"),
+    ("relatorios", "/api/relatorios"),
+    ("sistema", "/api/sistema"),
+    ("eventos", "/api/eventos"),
+)
 
-migrate = Migrate()
+_ambiente_carregado = False
+
+
+def _carregar_ambiente():
+    """Lê o .env na primeira chamada do create_app (e não no import do pacote)"""
+    global _ambiente_carregado
+    if not _ambiente_carregado:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _ambiente_carregado = True
+
+
+def _registrar_migracoes(app):
+    """Flask-Migrate (comandos ``flask db``); importa o Alembic, ~0,3 s"""
+    from flask_migrate import Migrate
+
+    Migrate(app, db)
 
 
 def create_app(config=None):
-    """Factory function para criar a aplicação Flask"""
+    """Factory function para criar a aplicação Flask
+
+    Não cria tabelas: o esquema vem de ``flask banco criar`` (ou
+    ``flask db upgrade``). Com ``MIGRACOES=False`` (usado pelo ``wsgi.py``) o
+    Flask-Migrate não é carregado.
+    """
+    _carregar_ambiente()
+
     # Determinar diretórios de templates e static via variável de ambiente ou padrão
     template_dir = os.getenv(
         "TEMPLATES_FOLDER",
@@ -46,28 +82,32 @@ def create_app(config=None):
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", app.config["SECRET_KEY"])
     app.config["JWT_ACCESS_TOKEN_EXPIRES"] = 3600  # 1 hora
+    app.config["BCRYPT_LOG_ROUNDS"] = int(os.getenv("BCRYPT_LOG_ROUNDS", "12"))
+    app.config["MIGRACOES"] = True
 
     # Configurações adicionais se fornecidas
     if config:
         app.config.update(config)
 
     # Inicializar extensões
+    conexoes.configurar(app)
+    replicas.configurar(app)
     db.init_app(app)
-    migrate.init_app(app, db)
+    replicas.registrar(app)
+    conexoes.monitorar_pool(app)
+    instrumentacao.configurar(app)
+    if app.config["MIGRACOES"]:
+        _registrar_migracoes(app)
+    cache.init_app(app)
+    eventos.configurar(app)
+    app.cli.add_command(banco.cli)
+    app.cli.add_command(resumos.cli)
+    app.cli.add_command(importacao.cli)
 
     # Registrar blueprints
-    with app.app_context():
-        from app.routes import auth, veiculos, servicos, dashboard, usuarios, views
-
-        app.register_blueprint(views.bp)  # Frontend (HTML)
-        app.register_blueprint(auth.bp)  # API
-        app.register_blueprint(usuarios.bp, url_prefix="/api/usuarios")
-        app.register_blueprint(veiculos.bp, url_prefix="/api/veiculos")
-        app.register_blueprint(servicos.bp, url_prefix="/api/servicos")
-        app.register_blueprint(dashboard.bp, url_prefix="/api/dashboard")
-
-        # Criar tabelas
-        db.create_all()
+    for nome, prefixo in BLUEPRINTS:
+        modulo = importlib.import_module(f"app.routes.{nome}")
+        app.register_blueprint(modulo.bp, url_prefix=prefixo)
 
     @app.route("/")
     def index():
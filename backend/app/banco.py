@@ -0,0 +1,40 @@
+"""Criação do esquema do banco (fora do create_app)
+
+As migrações do Alembic partem de um esquema já existente, então um banco
+novo é criado a partir dos modelos e marcado com a última revisão:
+
+    flask banco criar
+
+Em um banco que já tem tabelas, o comando só aplica as migrações pendentes
+(``flask db upgrade``). Bancos criados pelo antigo ``db.create_all()`` do
+create_app, sem ``alembic_version``, já estão no esquema atual e só são
+marcados.
+"""
+import click
+from flask.cli import AppGroup
+from sqlalchemy import inspect
+from app.models import db
+
+cli = AppGroup("banco", help="Esquema do banco de dados")
+
+
+def criar_esquema():
+    """Cria ou atualiza o esquema; devolve o que foi feito"""
+    from flask_migrate import stamp, upgrade
+
+    tabelas = set(inspect(db.engine).get_table_names())
+    if not tabelas - {"alembic_version"}:
+        db.create_all()
+        stamp()
+        return "criado"
+    if "alembic_version" not in tabelas:
+        stamp()
+        return "marcado"
+    upgrade()
+    return "atualizado"
+
+
+@cli.command("criar")
+def criar():
+    """Cria as tabelas (banco vazio) ou aplica as migrações pendentes"""
+    click.echo(f"Esquema {criar_esquema()}")
@@ -0,0 +1,276 @@
+"""Cache dos dashboards com invalidação disparada pelos commits
+
+As chaves seguem o formato ``dashboard:<tipo>:<usuario_id>:<formato>``. Ao
+confirmar uma transação, os objetos ``Servico``, ``Orcamento``, ``Veiculo`` e
+``Usuario`` alterados determinam quais prefixos de chave ficaram obsoletos, e
+apenas esses são removidos.
+
+Backends disponíveis (config ``DASHBOARD_CACHE``):
+
+* ``memoria`` (padrão): LRU com TTL no próprio processo;
+* ``sqlite``: arquivo SQLite compartilhado entre processos
+  (``DASHBOARD_CACHE_PATH``), útil como backend comum a vários workers;
+  guarda também as revogações de tokens (ver ``app.utils.registro_tokens``);
+* ``nenhum``: desativa o cache.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from app.models import db, Usuario, Veiculo, Servico, Orcamento, StatusServico
+
+
+class CacheMemoria:
+    """LRU com expiração por item, seguro para uso com threads"""
+
+    compartilhado = False
+
+    def __init__(self, max_itens=1024):
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            valor, expira_em = item
+            if expira_em < time.monotonic():
+                del self._itens[chave]
+                return None
+            self._itens.move_to_end(chave)
+            return valor
+
+    def set(self, chave, valor, ttl):
+        with self._lock:
+            self._itens[chave] = (valor, time.monotonic() + ttl)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def delete_prefix(self, prefixo):
+        with self._lock:
+            for chave in [c for c in self._itens if c.startswith(prefixo)]:
+                del self._itens[chave]
+
+    def clear(self):
+        with self._lock:
+            self._itens.clear()
+
+
+class CacheSQLite:
+    """Cache compartilhado em um arquivo SQLite (valores serializados em JSON)"""
+
+    compartilhado = True
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._local = threading.local()
+        with self._conectar() as conexao:
+            # WAL: leituras dos workers não esperam as escritas
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(chave TEXT PRIMARY KEY, valor TEXT NOT NULL, expira_em REAL NOT NULL)"
+            )
+
+    def _conectar(self):
+        """Conexão da thread atual, reaberta após um fork (workers do Gunicorn)"""
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            local.conexao = sqlite3.connect(self.caminho, timeout=5, isolation_level=None)
+            local.pid = os.getpid()
+        return local.conexao
+
+    def get(self, chave):
+        with self._conectar() as conexao:
+            linha = conexao.execute(
+                "SELECT valor, expira_em FROM cache WHERE chave = ?", (chave,)
+            ).fetchone()
+        if linha is None or linha[1] < time.time():
+            return None
+        return json.loads(linha[0])
+
+    def set(self, chave, valor, ttl):
+        with self._conectar() as conexao:
+            conexao.execute(
+                "INSERT OR REPLACE INTO cache (chave, valor, expira_em) VALUES (?, ?, ?)",
+                (chave, json.dumps(valor), time.time() + ttl),
+            )
+
+    def delete_prefix(self, prefixo):
+        prefixo = prefixo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._conectar() as conexao:
+            conexao.execute("DELETE FROM cache WHERE chave LIKE ? ESCAPE '\\'", (prefixo + "%",))
+
+    def clear(self):
+        with self._conectar() as conexao:
+            conexao.execute("DELETE FROM cache")
+
+
+def chave_dashboard(tipo=None, usuario_id=None, formato=None):
+    """Monta a chave (ou o prefixo, se faltarem partes) do dashboard"""
+    partes = ["dashboard"]
+    for parte in (tipo, usuario_id, formato):
+        if parte is None:
+            break
+        partes.append(str(parte))
+    return ":".join(partes) + ":"
+
+
+class CacheDashboard:
+    """Extensão Flask que expõe o backend de cache configurado"""
+
+    def init_app(self, app):
+        app.config.setdefault("DASHBOARD_CACHE", os.getenv("DASHBOARD_CACHE", "memoria"))
+        app.config.setdefault("DASHBOARD_CACHE_TTL", int(os.getenv("DASHBOARD_CACHE_TTL", "60")))
+        app.config.setdefault("DASHBOARD_CACHE_MAX", 1024)
+        app.config.setdefault(
+            "DASHBOARD_CACHE_PATH",
+            os.getenv(
+                "DASHBOARD_CACHE_PATH",
+                os.path.join(tempfile.gettempdir(), "mecanica_cache.db"),
+            ),
+        )
+
+        tipo = app.config["DASHBOARD_CACHE"]
+        if tipo == "memoria":
+            backend = CacheMemoria(app.config["DASHBOARD_CACHE_MAX"])
+        elif tipo == "sqlite":
+            backend = CacheSQLite(app.config["DASHBOARD_CACHE_PATH"])
+        elif tipo == "nenhum":
+            backend = None
+        else:
+            raise ValueError(f"Backend de cache desconhecido: {tipo}")
+
+        app.extensions["cache_dashboard"] = backend
+        _registrar_eventos()
+
+    @property
+    def backend(self):
+        return current_app.extensions.get("cache_dashboard")
+
+    def obter_ou_calcular(self, chave, calcular):
+        """Retorna o valor em cache ou calcula, armazena e retorna"""
+        backend = self.backend
+        if backend is None:
+            return calcular()
+        valor = backend.get(chave)
+        if valor is None:
+            valor = calcular()
+            backend.set(chave, valor, current_app.config["DASHBOARD_CACHE_TTL"])
+        return valor
+
+    def invalidar(self, prefixos):
+        backend = self.backend
+        if backend is None:
+            return
+        for prefixo in prefixos:
+            backend.delete_prefix(prefixo)
+
+
+cache = CacheDashboard()
+
+
+# ============= Invalidação por eventos da sessão =============
+
+
+def _valores(objeto, atributo):
+    """Valor atual e anterior (se alterado) de um atributo"""
+    historico = inspect(objeto).attrs[atributo].history
+    return {getattr(objeto, atributo), *historico.added, *historico.deleted}
+
+
+def prefixos_servico(mecanicos, status, clientes):
+    """Prefixos afetados por um serviço, dados os valores antes/depois
+
+    ``mecanicos`` (pode conter None), ``status`` e ``clientes`` (donos do
+    veículo) são conjuntos com os valores anteriores e atuais.
+    """
+    prefixos = {chave_dashboard("gerente")}
+    for mecanico_id in mecanicos - {None}:
+        prefixos.add(chave_dashboard("mecanico", mecanico_id))
+    # Serviços aguardando orçamento sem mecânico contam para todos os mecânicos
+    if None in mecanicos and StatusServico.AGUARDANDO_ORCAMENTO in status:
+        prefixos.add(chave_dashboard("mecanico"))
+    for usuario_id in clientes - {None}:
+        prefixos.add(chave_dashboard("cliente", usuario_id))
+    return prefixos
+
+
+def _prefixos_servico(sessao, servico):
+    clientes = set()
+    for veiculo_id in _valores(servico, "veiculo_id") - {None}:
+        with sessao.no_autoflush:
+            veiculo = sessao.get(Veiculo, veiculo_id)
+        if veiculo is not None:
+            clientes.add(veiculo.usuario_id)
+    return prefixos_servico(_valores(servico, "mecanico_id"), _valores(servico, "status"), clientes)
+
+
+def _prefixos_afetados(sessao, objeto):
+    if isinstance(objeto, Servico):
+        return _prefixos_servico(sessao, objeto)
+    if isinstance(objeto, Orcamento):
+        with sessao.no_autoflush:
+            servico = objeto.servico or sessao.get(Servico, objeto.servico_id)
+        return _prefixos_servico(sessao, servico) if servico else set()
+    if isinstance(objeto, Veiculo):
+        return {chave_dashboard("gerente")} | {
+            chave_dashboard("cliente", usuario_id)
+            for usuario_id in _valores(objeto, "usuario_id") - {None}
+        }
+    if isinstance(objeto, Usuario):
+        if objeto.id is None:
+            return {chave_dashboard("gerente")}
+        return {chave_dashboard("gerente")} | {
+            chave_dashboard(tipo.value, objeto.id) for tipo in _valores(objeto, "tipo") - {None}
+        }
+    return set()
+
+
+def _antes_do_flush(sessao, contexto, instancias):
+    if not has_app_context() or current_app.extensions.get("cache_dashboard") is None:
+        return
+    pendentes = sessao.info.setdefault("cache_invalidar", set())
+    for objeto in list(sessao.new) + list(sessao.dirty) + list(sessao.deleted):
+        pendentes |= _prefixos_afetados(sessao, objeto)
+
+
+def invalidar_apos_commit(prefixos):
+    """Agenda a invalidação de ``prefixos`` para o próximo commit
+
+    Para escritas que não passam pelo flush do ORM (INSERT/UPDATE em massa).
+    """
+    if not has_app_context() or current_app.extensions.get("cache_dashboard") is None:
+        return
+    db.session.info.setdefault("cache_invalidar", set()).update(prefixos)
+
+
+def _apos_commit(sessao):
+    pendentes = sessao.info.pop("cache_invalidar", None)
+    if pendentes and has_app_context():
+        cache.invalidar(pendentes)
+
+
+def _apos_rollback(sessao, transacao):
+    sessao.info.pop("cache_invalidar", None)
+
+
+_eventos_registrados = False
+
+
+def _registrar_eventos():
+    global _eventos_registrados
+    if _eventos_registrados:
+        return
+    event.listen(db.session, "before_flush", _antes_do_flush)
+    event.listen(db.session, "after_commit", _apos_commit)
+    event.listen(db.session, "after_soft_rollback", _apos_rollback)
+    _eventos_registrados = True
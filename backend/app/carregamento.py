@@ -0,0 +1,67 @@
+"""Estratégias de carregamento (eager loading) reutilizáveis para listagens
+
+Os relacionamentos dos modelos usam ``lazy=True``; em listagens isso gera uma
+consulta extra por linha para cada relacionamento acessado. As funções abaixo
+retornam opções para ``Query.options`` que carregam tudo com um número fixo de
+consultas, independentemente da quantidade de linhas.
+"""
+from sqlalchemy import func
+from sqlalchemy.orm import configure_mappers, joinedload, selectinload
+from app.models import db, Usuario, Servico, Veiculo
+
+# Os relacionamentos criados por ``backref`` (ex. ``Veiculo.proprietario``) só
+# existem como atributos da classe depois da configuração dos mappers; feita
+# uma vez aqui, com todos os modelos já importados
+configure_mappers()
+
+
+def servicos_com_orcamentos():
+    """Serviços com orçamentos (usado por ``to_dict(include_orcamentos=True)``)"""
+    return (selectinload(Servico.orcamentos),)
+
+
+def servicos_para_listagem():
+    """Serviços com veículo, proprietário e mecânico
+
+    Atende os templates de listagem e dashboards, que exibem
+    ``servico.veiculo.proprietario.nome`` e ``servico.mecanico.nome``; os
+    relacionamentos muitos-para-um vão no mesmo SELECT (JOIN). O
+    ``valor_total`` é coluna do próprio serviço e dispensa os orçamentos.
+    """
+    return (
+        joinedload(Servico.veiculo).joinedload(Veiculo.proprietario),
+        joinedload(Servico.mecanico),
+    )
+
+
+def veiculos_com_servicos():
+    """Veículos com a coleção de serviços (contagem exibida nos cards)"""
+    return (selectinload(Veiculo.servicos),)
+
+
+def clientes_com_veiculos():
+    """Clientes com seus veículos
+
+    Usado na listagem agrupada por cliente: uma consulta ``IN`` para os
+    veículos da página, em vez de uma por cliente. A quantidade de serviços
+    de cada veículo vem de ``servicos_por_veiculo``.
+    """
+    return (selectinload(Usuario.veiculos),)
+
+
+def servicos_por_veiculo(usuario_ids):
+    """Quantidade de serviços de cada veículo dos usuários, em uma consulta
+
+    ``COUNT`` agrupado por veículo, restrito aos veículos dos usuários da
+    página, em vez de carregar os serviços só para contá-los. Veículos sem
+    serviços ficam de fora (contagem 0).
+    """
+    if not usuario_ids:
+        return {}
+    linhas = db.session.execute(
+        db.select(Servico.veiculo_id, func.count(Servico.id))
+        .join(Veiculo, Veiculo.id == Servico.veiculo_id)
+        .where(Veiculo.usuario_id.in_(usuario_ids))
+        .group_by(Servico.veiculo_id)
+    )
+    return dict(linhas.all())
@@ -0,0 +1,87 @@
+"""GET condicional (ETag e Last-Modified) para os recursos da API
+
+Cada rota monta a versão da resposta com uma consulta barata (chave primária
+e índices, sem carregar objetos nem serializar), que também traz os dados de
+permissão. A versão resume o que a resposta mostraria: o ``atualizado_em``
+do registro e, para coleções (registros filhos e páginas das listagens), a
+quantidade, a soma dos ids e o maior timestamp; uma exclusão ou troca de item
+muda a quantidade ou a soma mesmo sem mudar o maior timestamp.
+
+``If-None-Match`` com a ETag atual é respondido com 304 antes de carregar os
+registros. ``If-Modified-Since`` (só considerado sem ``If-None-Match``) é
+aceito apenas em versões ``exatas``, em que nenhum item sai da resposta sem
+mudar o maior timestamp; nas demais o cabeçalho é ignorado e a resposta vem
+completa.
+"""
+import hashlib
+from datetime import datetime, timezone
+from flask import current_app, request
+from sqlalchemy import func
+
+
+def resumo(coluna_id, coluna_data):
+    """Colunas agregadas de uma coleção: quantidade, soma dos ids e maior data
+
+    ``DISTINCT`` porque as coleções entram por LEFT JOIN e as linhas se repetem
+    com os filhos de outros níveis.
+    """
+    return (
+        func.count(coluna_id.distinct()),
+        func.coalesce(func.sum(coluna_id.distinct()), 0),
+        func.max(coluna_data),
+    )
+
+
+class Versao:
+    """ETag e data da última modificação de uma resposta"""
+
+    def __init__(self, partes, exata=False):
+        # O usuário entra na ETag: a mesma URL lista coisas diferentes por usuário
+        bruto = repr((getattr(request, "usuario_id", None), tuple(partes)))
+        self.etag = hashlib.blake2b(bruto.encode("utf-8"), digest_size=16).hexdigest()
+        datas = [parte for parte in partes if isinstance(parte, datetime)]
+        self.ultima = max(datas) if datas else None
+        self.exata = exata
+
+    @property
+    def ultima_modificacao(self):
+        """Maior timestamp em UTC, truncado ao segundo do cabeçalho HTTP
+
+        None enquanto o segundo não terminou: outra alteração no mesmo segundo
+        teria a mesma data.
+        """
+        if self.ultima is None:
+            return None
+        ultima = self.ultima.replace(microsecond=0, tzinfo=timezone.utc)
+        agora = datetime.now(timezone.utc).replace(microsecond=0)
+        return ultima if ultima < agora else None
+
+    def nao_modificada(self):
+        """Se o cliente já tem esta versão (cabeçalhos da requisição atual)"""
+        if request.if_none_match:
+            return request.if_none_match.contains_weak(self.etag)
+        desde = request.if_modified_since
+        ultima = self.ultima_modificacao
+        if self.exata and desde is not None and ultima is not None:
+            return ultima <= desde
+        return False
+
+
+def responder(versao, gerar):
+    """304 se o cliente já tem ``versao``; senão a resposta de ``gerar()``
+
+    ``gerar`` só é chamado quando o corpo é necessário. As duas respostas levam
+    ETag, Last-Modified e ``Cache-Control: private, no-cache`` (o cliente
+    guarda, mas revalida a cada uso).
+    """
+    if versao.nao_modificada():
+        resposta = current_app.response_class(status=304)
+    else:
+        resposta = current_app.make_response(gerar())
+    resposta.set_etag(versao.etag)
+    ultima = versao.ultima_modificacao
+    if ultima is not None:
+        resposta.last_modified = ultima
+    resposta.cache_control.private = True
+    resposta.cache_control.no_cache = True
+    return resposta
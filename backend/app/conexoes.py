@@ -0,0 +1,103 @@
+"""Pool de conexões do banco: opções a partir do ambiente e estatísticas
+
+Variáveis de ambiente (valores padrão entre parênteses):
+
+* ``DB_POOL_SIZE`` (5) e ``DB_MAX_OVERFLOW`` (10): conexões mantidas e extras
+  por processo. Com N workers o banco recebe até
+  N * (pool_size + max_overflow) conexões;
+* ``DB_POOL_TIMEOUT`` (30): segundos esperando uma conexão livre;
+* ``DB_POOL_RECYCLE`` (1800): segundos até reabrir uma conexão;
+* ``DB_POOL_PRE_PING`` (1): testa a conexão antes do uso (evita erros de
+  conexão morta depois de um restart do PostgreSQL);
+* ``DB_STATEMENT_TIMEOUT_MS`` (0 = sem limite): ``statement_timeout`` das
+  sessões do PostgreSQL.
+"""
+import logging
+import os
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from app.models import db
+
+logger = logging.getLogger(__name__)
+
+
+def _inteiro(ambiente, nome, padrao):
+    return int(ambiente.get(nome, padrao))
+
+
+def _booleano(ambiente, nome, padrao):
+    return str(ambiente.get(nome, padrao)).lower() not in ("0", "false", "nao", "não", "")
+
+
+def opcoes_engine(uri, ambiente=None):
+    """SQLALCHEMY_ENGINE_OPTIONS para a URI, lidas das variáveis de ambiente"""
+    ambiente = os.environ if ambiente is None else ambiente
+    opcoes = {
+        "pool_pre_ping": _booleano(ambiente, "DB_POOL_PRE_PING", "1"),
+        "pool_recycle": _inteiro(ambiente, "DB_POOL_RECYCLE", 1800),
+    }
+    url = make_url(uri)
+    if url.get_backend_name() == "sqlite":
+        # SQLite usa pools próprios (sem tamanho/overflow configuráveis)
+        return opcoes
+
+    opcoes.update(
+        pool_size=_inteiro(ambiente, "DB_POOL_SIZE", 5),
+        max_overflow=_inteiro(ambiente, "DB_MAX_OVERFLOW", 10),
+        pool_timeout=_inteiro(ambiente, "DB_POOL_TIMEOUT", 30),
+    )
+    statement_timeout = _inteiro(ambiente, "DB_STATEMENT_TIMEOUT_MS", 0)
+    if statement_timeout and url.get_backend_name() == "postgresql":
+        opcoes["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+    return opcoes
+
+
+def estatisticas_pool(engine=None):
+    """Estado atual do pool de conexões do processo"""
+    pool = (engine or db.engine).pool
+    dados = {"classe": type(pool).__name__}
+    for nome, metodo in (
+        ("tamanho", "size"),
+        ("em_uso", "checkedout"),
+        ("livres", "checkedin"),
+        ("overflow", "overflow"),
+    ):
+        if hasattr(pool, metodo):
+            dados[nome] = getattr(pool, metodo)()
+    maximo = getattr(pool, "_max_overflow", None)
+    if "tamanho" in dados and maximo is not None and maximo >= 0:
+        dados["maximo"] = dados["tamanho"] + maximo
+    return dados
+
+
+def _ao_emprestar(conexao_dbapi, registro, proxy):
+    """Avisa quando o pool fica sem conexões livres (pool subdimensionado)"""
+    pool = proxy._pool
+    overflow = getattr(pool, "_max_overflow", -1)
+    if overflow < 0:  # pools sem limite (ou sem contagem, como os do SQLite em memória)
+        return
+    maximo = pool.size() + overflow
+    if pool.checkedout() >= maximo:
+        logger.warning(
+            "Pool de conexões esgotado: %d em uso de %d (pid %d)",
+            pool.checkedout(),
+            maximo,
+            os.getpid(),
+        )
+
+
+def monitorar_pool(app):
+    """Registra o aviso de pool esgotado nos engines da aplicação (primário e réplica)"""
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        if not event.contains(engine.pool, "checkout", _ao_emprestar):
+            event.listen(engine.pool, "checkout", _ao_emprestar)
+
+
+def configurar(app):
+    """Define SQLALCHEMY_ENGINE_OPTIONS (se não informado) antes do db.init_app"""
+    app.config.setdefault(
+        "SQLALCHEMY_ENGINE_OPTIONS",
+        opcoes_engine(app.config["SQLALCHEMY_DATABASE_URI"]),
+    )
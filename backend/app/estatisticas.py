@@ -0,0 +1,202 @@
+"""Agregações dos dashboards calculadas com um número fixo de consultas
+
+Contagens e receitas por status/mecânico/período vêm de ``resumos_diarios``
+(ver app/resumos.py): o custo depende da quantidade de dias com movimento, não
+da quantidade de serviços.
+"""
+from datetime import datetime
+from sqlalchemy import func, case
+from app.models import (
+    db,
+    Usuario,
+    Veiculo,
+    ResumoDiario,
+    StatusServico,
+    TipoUsuario,
+)
+
+STATUS_ATIVOS = (
+    StatusServico.AGUARDANDO_ORCAMENTO,
+    StatusServico.ORCAMENTO_APROVADO,
+    StatusServico.EM_ANDAMENTO,
+)
+
+
+def inicio_do_mes(referencia=None):
+    """Retorna o primeiro instante do mês de referência e do mês seguinte
+
+    Sem referência, usa o mês corrente em UTC, o mesmo relógio de ``criado_em``
+    e ``data_conclusao``.
+    """
+    referencia = referencia or datetime.utcnow()
+    inicio = referencia.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if inicio.month == 12:
+        proximo = inicio.replace(year=inicio.year + 1, month=1)
+    else:
+        proximo = inicio.replace(month=inicio.month + 1)
+    return inicio, proximo
+
+
+def _somar_se(condicao):
+    """Soma condicional das quantidades (SUM(CASE WHEN ... THEN quantidade))"""
+    return func.coalesce(func.sum(case((condicao, ResumoDiario.quantidade), else_=0)), 0)
+
+
+def histograma_status():
+    """Quantidade de serviços e receita por status em uma única consulta
+
+    Retorna um dicionário {StatusServico: {"quantidade": int, "receita": float}}
+    com todos os status presentes, inclusive os que não têm serviços.
+    """
+    linhas = (
+        db.session.query(
+            ResumoDiario.status,
+            func.sum(ResumoDiario.quantidade),
+            func.coalesce(func.sum(ResumoDiario.receita), 0),
+        )
+        .group_by(ResumoDiario.status)
+        .all()
+    )
+    histograma = {status: {"quantidade": 0, "receita": 0.0} for status in StatusServico}
+    for status, quantidade, receita in linhas:
+        histograma[status] = {"quantidade": int(quantidade), "receita": float(receita)}
+    return histograma
+
+
+def receita_do_periodo(inicio, fim):
+    """Receita dos serviços concluídos entre as datas ``inicio`` e ``fim`` (exclusiva)"""
+    receita = (
+        db.session.query(func.coalesce(func.sum(ResumoDiario.receita), 0))
+        .filter(
+            ResumoDiario.status == StatusServico.CONCLUIDO,
+            ResumoDiario.dia >= inicio,
+            ResumoDiario.dia < fim,
+        )
+        .scalar()
+    )
+    return float(receita)
+
+
+def serie_diaria(inicio, fim, mecanico_id=None):
+    """Quantidade e receita por dia e status entre ``inicio`` e ``fim`` (inclusivo)
+
+    Retorna uma lista ordenada de (dia, StatusServico, quantidade, receita).
+    """
+    consulta = db.session.query(
+        ResumoDiario.dia,
+        ResumoDiario.status,
+        func.sum(ResumoDiario.quantidade),
+        func.sum(ResumoDiario.receita),
+    ).filter(ResumoDiario.dia >= inicio, ResumoDiario.dia <= fim)
+    if mecanico_id is not None:
+        consulta = consulta.filter(ResumoDiario.mecanico_id == mecanico_id)
+    linhas = (
+        consulta.group_by(ResumoDiario.dia, ResumoDiario.status).order_by(ResumoDiario.dia).all()
+    )
+    return [
+        (dia, status, int(quantidade), float(receita))
+        for dia, status, quantidade, receita in linhas
+    ]
+
+
+def contagem_usuarios_por_tipo():
+    """Quantidade de usuários por tipo em uma única consulta"""
+    linhas = db.session.query(Usuario.tipo, func.count(Usuario.id)).group_by(Usuario.tipo).all()
+    contagem = {tipo: 0 for tipo in TipoUsuario}
+    contagem.update(dict(linhas))
+    return contagem
+
+
+def estatisticas_mecanicos(referencia=None):
+    """Resumo por mecânico (aguardando / em andamento / concluídos no mês / total)
+
+    Usa um único LEFT JOIN de usuarios com resumos_diarios agrupado por
+    mecânico, com somas condicionais, em vez de quatro COUNTs por mecânico.
+    """
+    inicio, proximo = inicio_do_mes(referencia)
+    linhas = (
+        db.session.query(
+            Usuario.id,
+            Usuario.nome,
+            _somar_se(ResumoDiario.status == StatusServico.AGUARDANDO_ORCAMENTO),
+            _somar_se(ResumoDiario.status == StatusServico.EM_ANDAMENTO),
+            _somar_se(
+                db.and_(
+                    ResumoDiario.status == StatusServico.CONCLUIDO,
+                    ResumoDiario.dia >= inicio.date(),
+                    ResumoDiario.dia < proximo.date(),
+                )
+            ),
+            func.coalesce(func.sum(ResumoDiario.quantidade), 0),
+        )
+        .outerjoin(ResumoDiario, ResumoDiario.mecanico_id == Usuario.id)
+        .filter(Usuario.tipo == TipoUsuario.MECANICO)
+        .group_by(Usuario.id, Usuario.nome)
+        .order_by(Usuario.id)
+        .all()
+    )
+    return [
+        {
+            "id": mecanico_id,
+            "nome": nome,
+            "aguardando": int(aguardando),
+            "em_andamento": int(em_andamento),
+            "concluidos": int(concluidos),
+            "total": int(total),
+        }
+        for mecanico_id, nome, aguardando, em_andamento, concluidos, total in linhas
+    ]
+
+
+def resumo_mecanico(mecanico_id):
+    """Estatísticas do dashboard do mecânico em uma única consulta
+
+    ``aguardando_orcamento`` inclui os serviços sem mecânico (``mecanico_id``
+    0 no resumo), que qualquer mecânico pode assumir; as demais contagens são
+    só as do mecânico. Lê apenas as linhas dos dois ``mecanico_id`` pelo
+    índice (mecanico_id, status, dia).
+    """
+    do_mecanico = ResumoDiario.mecanico_id == mecanico_id
+    aguardando, em_andamento, concluidos, total = (
+        db.session.query(
+            _somar_se(ResumoDiario.status == StatusServico.AGUARDANDO_ORCAMENTO),
+            _somar_se(db.and_(do_mecanico, ResumoDiario.status == StatusServico.EM_ANDAMENTO)),
+            _somar_se(db.and_(do_mecanico, ResumoDiario.status == StatusServico.CONCLUIDO)),
+            _somar_se(do_mecanico),
+        )
+        .filter(ResumoDiario.mecanico_id.in_([0, mecanico_id]))
+        .one()
+    )
+    return {
+        "aguardando_orcamento": int(aguardando),
+        "em_andamento": int(em_andamento),
+        "concluidos_mes": int(concluidos),
+        "total_servicos": int(total),
+    }
+
+
+def resumo_gerente(referencia=None):
+    """Estatísticas gerais do dashboard do gerente
+
+    O número de consultas é constante: usuários por tipo, veículos,
+    histograma de status, receita do mês e resumo por mecânico,
+    independentemente da quantidade de mecânicos ou serviços.
+
+    ``receita`` é a receita de todos os concluídos; ``receita_mensal`` apenas
+    a dos concluídos no mês de referência.
+    """
+    usuarios = contagem_usuarios_por_tipo()
+    histograma = histograma_status()
+    inicio, proximo = inicio_do_mes(referencia)
+
+    return {
+        "total_clientes": usuarios[TipoUsuario.CLIENTE],
+        "total_mecanicos": usuarios[TipoUsuario.MECANICO],
+        "total_veiculos": db.session.query(func.count(Veiculo.id)).scalar(),
+        "total_servicos": sum(h["quantidade"] for h in histograma.values()),
+        "receita": histograma[StatusServico.CONCLUIDO]["receita"],
+        "receita_mensal": receita_do_periodo(inicio.date(), proximo.date()),
+        "servicos_ativos": sum(histograma[s]["quantidade"] for s in STATUS_ATIVOS),
+        "por_status": {s.value: h["quantidade"] for s, h in histograma.items()},
+        "mecanicos": estatisticas_mecanicos(referencia),
+    }
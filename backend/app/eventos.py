@@ -0,0 +1,384 @@
+"""Eventos de serviços e orçamentos para os usuários afetados (``/api/eventos``)
+
+Depois de cada commit, as mudanças de status de ``Servico`` (inclusive a
+aprovação de orçamento e a criação do serviço) e os novos ``Orcamento`` viram
+eventos, publicados para:
+
+* o cliente dono do veículo (canal ``usuario:<id>``);
+* o mecânico atual e o anterior (``usuario:<id>``), ou todos os mecânicos
+  (``mecanicos``) quando o serviço aguarda orçamento sem mecânico;
+* os gerentes (``gerentes``).
+
+Os eventos são capturados no ``after_flush`` da sessão (ids já atribuídos e o
+histórico dos atributos ainda disponível) e só saem no ``after_commit``; um
+rollback os descarta. Escritas fora do flush do ORM (UPDATE em massa) usam
+``publicar_apos_commit``.
+
+Cada processo tem um ``Corretor`` com as inscrições abertas (uma fila por
+conexão SSE), no máximo ``EVENTOS_MAX_CONEXOES``: cada conexão ocupa uma
+thread do worker, e o limite deixa threads livres para as outras rotas.
+Backends de publicação (config ``EVENTOS_BACKEND``):
+
+* ``local`` (padrão): entrega direto no corretor do processo; serve a um
+  processo só (servidor de desenvolvimento, testes). Sem inscrições abertas,
+  nada é capturado;
+* ``postgres``: ``NOTIFY`` no canal ``oficina_eventos``; cada worker com
+  inscritos mantém uma conexão em ``LISTEN`` e entrega aos seus;
+* ``nenhum``: desliga os eventos (sem hooks na sessão).
+"""
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import time
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, text
+from app.models import db, Veiculo, Servico, Orcamento, StatusServico
+
+logger = logging.getLogger(__name__)
+
+CANAL_POSTGRES = "oficina_eventos"
+CANAL_GERENTES = "gerentes"
+CANAL_MECANICOS = "mecanicos"
+
+
+def canal_usuario(usuario_id):
+    return f"usuario:{usuario_id}"
+
+
+def canais_inscricao(usuario_id, tipo_usuario):
+    """Canais que um usuário recebe, de acordo com o tipo"""
+    canais = {canal_usuario(usuario_id)}
+    if tipo_usuario == "gerente":
+        canais.add(CANAL_GERENTES)
+    elif tipo_usuario == "mecanico":
+        canais.add(CANAL_MECANICOS)
+    return canais
+
+
+# ============= Pub/sub no processo =============
+
+
+class Inscricao:
+    """Fila de eventos de uma conexão; ``transbordou`` se o cliente não acompanha"""
+
+    def __init__(self, canais, max_fila):
+        self.canais = frozenset(canais)
+        self.fila = queue.Queue(max_fila)
+        self.transbordou = False
+
+
+class Corretor:
+    """Inscrições abertas no processo, seguro para threads"""
+
+    def __init__(self, max_fila=100):
+        self.max_fila = max_fila
+        self._inscricoes = set()
+        self._lock = threading.Lock()
+
+    def inscrever(self, canais, limite=None):
+        """Nova inscrição; None se já há ``limite`` inscrições abertas"""
+        inscricao = Inscricao(canais, self.max_fila)
+        with self._lock:
+            if limite is not None and len(self._inscricoes) >= limite:
+                return None
+            self._inscricoes.add(inscricao)
+        return inscricao
+
+    def cancelar(self, inscricao):
+        with self._lock:
+            self._inscricoes.discard(inscricao)
+
+    def __len__(self):
+        return len(self._inscricoes)
+
+    def entregar(self, evento):
+        """Coloca o evento na fila das inscrições de algum dos seus destinos"""
+        destinos = set(evento["destinos"])
+        with self._lock:
+            inscricoes = [i for i in self._inscricoes if i.canais & destinos]
+        for inscricao in inscricoes:
+            try:
+                inscricao.fila.put_nowait(evento)
+            except queue.Full:
+                inscricao.transbordou = True
+
+
+# ============= Backends de publicação =============
+
+
+class BackendLocal:
+    """Entrega no corretor do próprio processo"""
+
+    compartilhado = False
+
+    def __init__(self, corretor):
+        self.corretor = corretor
+
+    def publicar(self, eventos):
+        for evento in eventos:
+            self.corretor.entregar(evento)
+
+    def preparar(self):
+        pass
+
+
+class BackendPostgres:
+    """LISTEN/NOTIFY do PostgreSQL, para entregar os eventos a todos os workers
+
+    A publicação usa uma conexão do pool (``pg_notify``). A escuta abre uma
+    conexão própria, fora do pool, em uma thread iniciada na primeira
+    inscrição do processo (depois do fork dos workers do Gunicorn).
+    """
+
+    compartilhado = True
+
+    def __init__(self, corretor, engine):
+        self.corretor = corretor
+        self.engine = engine
+        self._pid = None
+        self._pronto = threading.Event()
+        self._lock = threading.Lock()
+
+    def publicar(self, eventos):
+        with self.engine.begin() as conexao:
+            for evento in eventos:
+                conexao.execute(
+                    text("SELECT pg_notify(:canal, :dados)"),
+                    {"canal": CANAL_POSTGRES, "dados": json.dumps(evento)},
+                )
+
+    def preparar(self):
+        """Garante a thread de escuta do processo atual"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._pronto = threading.Event()
+            threading.Thread(target=self._escutar, name="eventos-listen", daemon=True).start()
+        # Eventos publicados antes do LISTEN não chegam: espera a escuta começar
+        self._pronto.wait(5)
+
+    def _escutar(self):
+        while True:
+            conexao = None
+            try:
+                conexao = self.engine.raw_connection()
+                conexao.detach()  # não volta ao pool
+                pg = conexao.driver_connection
+                pg.autocommit = True
+                with pg.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CANAL_POSTGRES}")
+                self._pronto.set()
+                while True:
+                    if select.select([pg], [], [], 5) == ([], [], []):
+                        continue
+                    pg.poll()
+                    while pg.notifies:
+                        notificacao = pg.notifies.pop(0)
+                        self.corretor.entregar(json.loads(notificacao.payload))
+            except Exception:
+                logger.exception("Escuta de eventos interrompida; reconectando")
+                time.sleep(1)
+            finally:
+                if conexao is not None:
+                    conexao.close()
+
+
+class Eventos:
+    """Corretor e backend da aplicação (``app.extensions["eventos"]``)"""
+
+    def __init__(self, backend, heartbeat, duracao_max, max_conexoes=None):
+        self.corretor = backend.corretor
+        self.backend = backend
+        self.heartbeat = heartbeat
+        self.duracao_max = duracao_max
+        self.max_conexoes = max_conexoes
+
+    @property
+    def ativo(self):
+        """Se vale capturar eventos: há inscritos aqui ou em outro processo"""
+        return self.backend.compartilhado or len(self.corretor) > 0
+
+    def inscrever(self, canais):
+        """Inscrição no corretor; None se o processo está no limite de conexões"""
+        self.backend.preparar()
+        return self.corretor.inscrever(canais, self.max_conexoes)
+
+    def cancelar(self, inscricao):
+        self.corretor.cancelar(inscricao)
+
+    def publicar(self, eventos):
+        try:
+            self.backend.publicar(eventos)
+        except Exception:
+            # O commit já aconteceu: a falha na notificação não desfaz a escrita
+            logger.exception("Falha ao publicar %d eventos", len(eventos))
+
+
+def configurar(app):
+    """Cria o corretor e registra os hooks da sessão (depois do db.init_app)"""
+    app.config.setdefault("EVENTOS_BACKEND", os.getenv("EVENTOS_BACKEND", "local"))
+    app.config.setdefault("EVENTOS_HEARTBEAT", int(os.getenv("EVENTOS_HEARTBEAT", "15")))
+    app.config.setdefault("EVENTOS_DURACAO_MAX", int(os.getenv("EVENTOS_DURACAO_MAX", "60")))
+    app.config.setdefault("EVENTOS_MAX_CONEXOES", int(os.getenv("EVENTOS_MAX_CONEXOES", "10")))
+    app.config.setdefault("EVENTOS_MAX_FILA", 100)
+    app.config.setdefault(
+        "EVENTOS_TICKET_VALIDADE", int(os.getenv("EVENTOS_TICKET_VALIDADE", "30"))
+    )
+
+    tipo = app.config["EVENTOS_BACKEND"]
+    corretor = Corretor(app.config["EVENTOS_MAX_FILA"])
+    if tipo == "local":
+        backend = BackendLocal(corretor)
+    elif tipo == "postgres":
+        with app.app_context():
+            backend = BackendPostgres(corretor, db.engine)
+    elif tipo == "nenhum":
+        app.extensions["eventos"] = None
+        return
+    else:
+        raise ValueError(f"Backend de eventos desconhecido: {tipo}")
+
+    app.extensions["eventos"] = Eventos(
+        backend,
+        app.config["EVENTOS_HEARTBEAT"],
+        app.config["EVENTOS_DURACAO_MAX"],
+        app.config["EVENTOS_MAX_CONEXOES"],
+    )
+    _registrar_eventos()
+
+
+# ============= Captura pelos eventos da sessão =============
+
+
+def _valor(status):
+    return status.value if isinstance(status, StatusServico) else status
+
+
+def evento_servico(servico_id, de, para, cliente_id, mecanicos):
+    """Evento de mudança de status (``de`` None: serviço criado)
+
+    ``mecanicos`` tem o mecânico anterior e o atual (pode conter None).
+    """
+    destinos = {CANAL_GERENTES}
+    if cliente_id is not None:
+        destinos.add(canal_usuario(cliente_id))
+    for mecanico_id in set(mecanicos) - {None}:
+        destinos.add(canal_usuario(mecanico_id))
+    para = _valor(para)
+    if None in mecanicos and para == StatusServico.AGUARDANDO_ORCAMENTO.value:
+        destinos.add(CANAL_MECANICOS)
+    tipo = (
+        "orcamento_aprovado" if para == StatusServico.ORCAMENTO_APROVADO.value else "servico_status"
+    )
+    return {
+        "tipo": tipo,
+        "destinos": sorted(destinos),
+        "dados": {"servico_id": servico_id, "de": _valor(de), "para": para},
+    }
+
+
+def _ativos():
+    if not has_app_context():
+        return False
+    gerenciador = current_app.extensions.get("eventos")
+    return gerenciador is not None and gerenciador.ativo
+
+
+def publicar_apos_commit(eventos):
+    """Agenda ``eventos`` para o próximo commit (escritas fora do flush do ORM)"""
+    if not _ativos():
+        return
+    db.session.info.setdefault("eventos", []).extend(eventos)
+
+
+def _dono(sessao, veiculo_id):
+    with sessao.no_autoflush:
+        veiculo = sessao.get(Veiculo, veiculo_id)
+    return veiculo.usuario_id if veiculo is not None else None
+
+
+def _mecanicos(servico):
+    historico = inspect(servico).attrs.mecanico_id.history
+    return {servico.mecanico_id, *historico.deleted}
+
+
+def _depois_do_flush(sessao, contexto):
+    # Sem ninguém escutando (backend local sem inscrições), nada a capturar: o
+    # dono do veículo custaria uma consulta a mais por escrita
+    if not _ativos():
+        return
+    eventos = []
+    for objeto in sessao.new:
+        if isinstance(objeto, Servico):
+            eventos.append(
+                evento_servico(
+                    objeto.id,
+                    None,
+                    objeto.status,
+                    _dono(sessao, objeto.veiculo_id),
+                    {objeto.mecanico_id},
+                )
+            )
+        elif isinstance(objeto, Orcamento):
+            with sessao.no_autoflush:
+                servico = objeto.servico or sessao.get(Servico, objeto.servico_id)
+            if servico is None:
+                continue
+            evento = evento_servico(
+                servico.id,
+                None,
+                servico.status,
+                _dono(sessao, servico.veiculo_id),
+                {servico.mecanico_id},
+            )
+            evento["tipo"] = "orcamento_criado"
+            evento["dados"] = {
+                "servico_id": servico.id,
+                "orcamento_id": objeto.id,
+                "valor": float(objeto.valor),
+            }
+            eventos.append(evento)
+    for objeto in sessao.dirty:
+        if not isinstance(objeto, Servico):
+            continue
+        historico = inspect(objeto).attrs.status.history
+        if not historico.added or not historico.deleted:
+            continue
+        de, para = historico.deleted[0], historico.added[0]
+        if _valor(de) != _valor(para):
+            eventos.append(
+                evento_servico(
+                    objeto.id, de, para, _dono(sessao, objeto.veiculo_id), _mecanicos(objeto)
+                )
+            )
+    if eventos:
+        sessao.info.setdefault("eventos", []).extend(eventos)
+
+
+def _apos_commit(sessao):
+    eventos = sessao.info.pop("eventos", None)
+    if eventos and has_app_context():
+        gerenciador = current_app.extensions.get("eventos")
+        if gerenciador is not None:
+            gerenciador.publicar(eventos)
+
+
+def _apos_rollback(sessao, transacao):
+    sessao.info.pop("eventos", None)
+
+
+_eventos_registrados = False
+
+
+def _registrar_eventos():
+    global _eventos_registrados
+    if _eventos_registrados:
+        return
+    event.listen(db.session, "after_flush", _depois_do_flush)
+    event.listen(db.session, "after_commit", _apos_commit)
+    event.listen(db.session, "after_soft_rollback", _apos_rollback)
+    _eventos_registrados = True
@@ -0,0 +1,243 @@
+"""Importação de veículos em lote (CSV ou JSON)
+
+Todas as linhas são validadas antes de qualquer escrita: placas repetidas no
+próprio arquivo, placas já cadastradas e donos informados por ``usuario_id``
+ou ``email_cliente`` são conferidos com uma consulta ``IN`` por lote de
+``TAMANHO_LOTE`` valores, em vez de uma consulta por veículo. A inserção usa
+um único ``INSERT`` executado com a lista de linhas (executemany, que o
+SQLAlchemy agrupa em INSERTs de várias linhas).
+
+Colunas aceitas: ``placa``, ``modelo``, ``marca``, ``ano`` (obrigatórias),
+``cor``, ``usuario_id`` e ``email_cliente`` (o dono precisa ser um cliente).
+"""
+import csv
+import io
+import json
+from datetime import datetime
+import click
+from flask.cli import AppGroup
+from app.models import db, Usuario, Veiculo, TipoUsuario
+from app.cache import chave_dashboard, invalidar_apos_commit
+
+# Valores por consulta IN (abaixo do limite de parâmetros do SQLite)
+TAMANHO_LOTE = 1000
+
+CAMPOS_OBRIGATORIOS = ("placa", "modelo", "marca", "ano")
+TAMANHOS = {"placa": 10, "modelo": 50, "marca": 50, "cor": 30}
+
+
+class ErroImportacao(ValueError):
+    """Arquivo que não pôde ser lido como CSV ou lista JSON"""
+
+
+def ler_registros(conteudo, formato):
+    """Retorna [(linha, dict)] a partir de um CSV ou de uma lista JSON
+
+    No CSV ``linha`` é a linha do arquivo (o cabeçalho é a linha 1); no JSON,
+    a posição na lista começando em 1.
+    """
+    if isinstance(conteudo, bytes):
+        conteudo = conteudo.decode("utf-8-sig")
+    if formato == "csv":
+        leitor = csv.DictReader(io.StringIO(conteudo))
+        if not leitor.fieldnames:
+            raise ErroImportacao("CSV vazio")
+        return [(leitor.line_num, registro) for registro in leitor]
+
+    try:
+        dados = json.loads(conteudo) if isinstance(conteudo, str) else conteudo
+    except ValueError as e:
+        raise ErroImportacao("JSON inválido") from e
+    if isinstance(dados, dict):
+        dados = dados.get("veiculos")
+    if not isinstance(dados, list):
+        raise ErroImportacao("Envie uma lista de veículos")
+    return list(enumerate(dados, start=1))
+
+
+def _em_lotes(valores):
+    valores = list(valores)
+    for inicio in range(0, len(valores), TAMANHO_LOTE):
+        yield valores[inicio : inicio + TAMANHO_LOTE]
+
+
+def _texto(registro, campo):
+    valor = registro.get(campo)
+    if valor is None:
+        return ""
+    return str(valor).strip()
+
+
+def _validar(registro):
+    """Normaliza um registro; retorna (dados, erros)"""
+    if not isinstance(registro, dict):
+        return None, ["Registro deve ser um objeto"]
+
+    erros = []
+    dados = {campo: _texto(registro, campo) for campo in (*CAMPOS_OBRIGATORIOS, "cor")}
+    for campo in CAMPOS_OBRIGATORIOS:
+        if not dados[campo]:
+            erros.append(f"Campo {campo} é obrigatório")
+    for campo, tamanho in TAMANHOS.items():
+        if len(dados[campo]) > tamanho:
+            erros.append(f"Campo {campo} excede {tamanho} caracteres")
+
+    dados["placa"] = dados["placa"].upper()
+    dados["cor"] = dados["cor"] or None
+    if dados["ano"]:
+        try:
+            dados["ano"] = int(dados["ano"])
+        except ValueError:
+            erros.append("Ano inválido")
+
+    usuario_id = _texto(registro, "usuario_id")
+    if usuario_id:
+        try:
+            dados["usuario_id"] = int(usuario_id)
+        except ValueError:
+            erros.append("usuario_id inválido")
+    email = _texto(registro, "email_cliente")
+    if email:
+        dados["email_cliente"] = email
+    return dados, erros
+
+
+def importar_veiculos(registros, usuario_padrao, permitir_outros_donos=True, parcial=False):
+    """Valida e insere os veículos de ``registros`` ([(linha, dict)])
+
+    ``usuario_padrao`` é o dono dos veículos sem ``usuario_id``/``email_cliente``
+    (que só são aceitos com ``permitir_outros_donos``). Sem ``parcial`` nada é
+    inserido se alguma linha tiver erro. Não faz commit.
+
+    Retorna {"total", "importados", "erros": [{"linha", "placa", "erros"}]}.
+    """
+    validos = []
+    erros = []
+
+    def rejeitar(linha, dados, mensagens):
+        placa = dados.get("placa") if dados else None
+        erros.append({"linha": linha, "placa": placa, "erros": mensagens})
+
+    placas = set()
+    for linha, registro in registros:
+        dados, mensagens = _validar(registro)
+        if (
+            dados
+            and not permitir_outros_donos
+            and ("usuario_id" in dados or "email_cliente" in dados)
+        ):
+            mensagens.append("Apenas o gerente pode informar o dono do veículo")
+        if dados and dados["placa"] in placas:
+            mensagens.append("Placa repetida no arquivo")
+        if mensagens:
+            rejeitar(linha, dados, mensagens)
+            continue
+        placas.add(dados["placa"])
+        validos.append((linha, dados))
+
+    # Placas já cadastradas: uma consulta IN por lote
+    cadastradas = set()
+    for lote in _em_lotes(placas):
+        cadastradas.update(
+            db.session.execute(db.select(Veiculo.placa).where(Veiculo.placa.in_(lote))).scalars()
+        )
+
+    # Donos informados por id ou email (só clientes): idem
+    ids = {d["usuario_id"] for _, d in validos if "usuario_id" in d}
+    emails = {d["email_cliente"] for _, d in validos if "email_cliente" in d}
+    clientes_por_id = set()
+    for lote in _em_lotes(ids):
+        clientes_por_id.update(
+            db.session.execute(
+                db.select(Usuario.id).where(
+                    Usuario.id.in_(lote), Usuario.tipo == TipoUsuario.CLIENTE
+                )
+            ).scalars()
+        )
+    clientes_por_email = {}
+    for lote in _em_lotes(emails):
+        clientes_por_email.update(
+            db.session.execute(
+                db.select(Usuario.email, Usuario.id).where(
+                    Usuario.email.in_(lote), Usuario.tipo == TipoUsuario.CLIENTE
+                )
+            ).all()
+        )
+
+    agora = datetime.utcnow()
+    linhas = []
+    for linha, dados in validos:
+        mensagens = []
+        if dados["placa"] in cadastradas:
+            mensagens.append("Placa já cadastrada")
+        usuario_id = usuario_padrao
+        if "usuario_id" in dados:
+            usuario_id = dados["usuario_id"]
+            if usuario_id not in clientes_por_id:
+                mensagens.append("Cliente não encontrado")
+        elif "email_cliente" in dados:
+            usuario_id = clientes_por_email.get(dados["email_cliente"])
+            if usuario_id is None:
+                mensagens.append("Cliente não encontrado")
+        if mensagens:
+            rejeitar(linha, dados, mensagens)
+            continue
+        linhas.append(
+            {
+                "placa": dados["placa"],
+                "modelo": dados["modelo"],
+                "marca": dados["marca"],
+                "ano": dados["ano"],
+                "cor": dados["cor"],
+                "usuario_id": usuario_id,
+                "criado_em": agora,
+            }
+        )
+
+    erros.sort(key=lambda erro: erro["linha"])
+    resultado = {"total": len(registros), "importados": 0, "erros": erros}
+    if not linhas or (erros and not parcial):
+        return resultado
+
+    db.session.execute(db.insert(Veiculo), linhas)
+    # O INSERT em massa não passa pelo flush que invalida os dashboards
+    invalidar_apos_commit(
+        {chave_dashboard("gerente")} | {chave_dashboard("cliente", d["usuario_id"]) for d in linhas}
+    )
+    resultado["importados"] = len(linhas)
+    return resultado
+
+
+# ============= Comandos =============
+
+cli = AppGroup("veiculos", help="Veículos")
+
+
+@cli.command("importar")
+@click.argument("arquivo", type=click.File("rb"))
+@click.option("--formato", type=click.Choice(["csv", "json"]), default=None)
+@click.option(
+    "--email-dono",
+    required=True,
+    help="Dono dos veículos sem usuario_id/email_cliente",
+)
+@click.option("--parcial", is_flag=True, help="Importa as linhas válidas mesmo com erros")
+def importar(arquivo, formato, email_dono, parcial):
+    """Importa veículos de um arquivo CSV ou JSON"""
+    formato = formato or ("json" if arquivo.name.endswith(".json") else "csv")
+    dono = Usuario.query.filter_by(email=email_dono).first()
+    if dono is None:
+        raise click.ClickException(f"Usuário {email_dono} não encontrado")
+    try:
+        registros = ler_registros(arquivo.read(), formato)
+    except ErroImportacao as e:
+        raise click.ClickException(str(e))
+
+    resultado = importar_veiculos(registros, dono.id, parcial=parcial)
+    db.session.commit()
+
+    for erro in resultado["erros"]:
+        click.echo(f"linha {erro['linha']}: {'; '.join(erro['erros'])}", err=True)
+    click.echo(f"{resultado['importados']} de {resultado['total']} veículos importados")
+    if resultado["erros"] and not resultado["importados"]:
+        raise click.exceptions.Exit(1)
@@ -0,0 +1,243 @@
+"""Tempo, consultas SQL e tamanho das respostas por requisição
+
+Ativada com ``INSTRUMENTACAO=1`` (desligada por padrão). Desligada, nada é
+registrado: sem hooks de requisição, sem eventos no engine e sem ``/metrics``.
+
+Ligada, cada requisição recebe:
+
+* o cabeçalho ``Server-Timing`` (``app``: tempo total; ``db``: tempo no
+  banco, com o número de consultas), visível nas ferramentas do navegador;
+* uma linha de log JSON no logger ``app.instrumentacao`` (nível INFO);
+* amostras nos histogramas por endpoint expostos em ``GET /metrics``, no
+  formato texto do Prometheus.
+
+O tempo de banco soma os intervalos entre ``before_cursor_execute`` e
+``after_cursor_execute`` dos engines da aplicação (primário e réplica). As
+métricas são do processo: com vários workers do Gunicorn, cada um tem as suas
+(o ``pid`` vai em cada resposta de ``/metrics``).
+"""
+import logging
+import os
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from app.models import db
+from app.serializacao import codificar
+
+logger = logging.getLogger(__name__)
+
+# Limites superiores dos buckets (segundos e número de consultas)
+BUCKETS_DURACAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BUCKETS_CONSULTAS = (1, 2, 5, 10, 20, 50, 100)
+
+
+class _Histograma:
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)  # último: acima de todos (+Inf)
+        self.soma = 0
+        self.total = 0
+
+    def observar(self, valor):
+        indice = len(self.limites)
+        for i, limite in enumerate(self.limites):
+            if valor <= limite:
+                indice = i
+                break
+        self.contagens[indice] += 1
+        self.soma += valor
+        self.total += 1
+
+
+def _rotulos(rotulos):
+    return ",".join(f'{nome}="{valor}"' for nome, valor in rotulos)
+
+
+class Metricas:
+    """Agregados por (endpoint, método) no processo, seguros para threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def registrar(self, endpoint, metodo, status, duracao, banco, consultas, tamanho):
+        with self._lock:
+            serie = self._series.get((endpoint, metodo))
+            if serie is None:
+                serie = self._series[(endpoint, metodo)] = {
+                    "duracao": _Histograma(BUCKETS_DURACAO),
+                    "consultas": _Histograma(BUCKETS_CONSULTAS),
+                    "banco": 0.0,
+                    "bytes": 0,
+                    "status": {},
+                }
+            serie["duracao"].observar(duracao)
+            serie["consultas"].observar(consultas)
+            serie["banco"] += banco
+            serie["bytes"] += tamanho or 0
+            serie["status"][status] = serie["status"].get(status, 0) + 1
+
+    def exportar(self):
+        """Texto no formato de exposição do Prometheus"""
+        linhas = []
+
+        def histograma(nome, ajuda, chave):
+            linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} histogram")
+            for (endpoint, metodo), serie in sorted(self._series.items()):
+                h = serie[chave]
+                base = (("endpoint", endpoint), ("metodo", metodo))
+                acumulado = 0
+                for limite, contagem in zip(h.limites + ("+Inf",), h.contagens):
+                    acumulado += contagem
+                    rotulos = _rotulos(base + (("le", limite),))
+                    linhas.append(f"{nome}_bucket{{{rotulos}}} {acumulado}")
+                linhas.append(f"{nome}_sum{{{_rotulos(base)}}} {h.soma}")
+                linhas.append(f"{nome}_count{{{_rotulos(base)}}} {h.total}")
+
+        def contador(nome, ajuda, valores):
+            linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} counter")
+            for rotulos, valor in valores:
+                linhas.append(f"{nome}{{{_rotulos(rotulos)}}} {valor}")
+
+        with self._lock:
+            histograma(
+                "oficina_requisicao_duracao_segundos",
+                "Tempo total da requisicao",
+                "duracao",
+            )
+            histograma(
+                "oficina_requisicao_consultas",
+                "Consultas SQL por requisicao",
+                "consultas",
+            )
+            series = sorted(self._series.items())
+            contador(
+                "oficina_requisicao_banco_segundos_total",
+                "Tempo gasto no banco",
+                [((("endpoint", e), ("metodo", m)), s["banco"]) for (e, m), s in series],
+            )
+            contador(
+                "oficina_resposta_bytes_total",
+                "Bytes enviados no corpo das respostas",
+                [((("endpoint", e), ("metodo", m)), s["bytes"]) for (e, m), s in series],
+            )
+            contador(
+                "oficina_requisicoes_total",
+                "Requisicoes por status",
+                [
+                    ((("endpoint", e), ("metodo", m), ("status", status)), quantidade)
+                    for (e, m), s in series
+                    for status, quantidade in sorted(s["status"].items())
+                ],
+            )
+        return "\n".join(linhas) + "\n"
+
+
+class _Medicao:
+    __slots__ = ("inicio", "banco", "consultas")
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.banco = 0.0
+        self.consultas = 0
+
+
+# ============= Eventos do banco =============
+
+
+def _antes_da_consulta(conexao, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "_medicao" in g:
+        conexao.info.setdefault("_inicio_consultas", []).append(time.perf_counter())
+
+
+def _depois_da_consulta(conexao, cursor, statement, parameters, context, executemany):
+    inicios = conexao.info.get("_inicio_consultas")
+    if inicios:
+        duracao = time.perf_counter() - inicios.pop()
+        medicao = g.get("_medicao") if has_request_context() else None
+        if medicao is not None:
+            medicao.banco += duracao
+            medicao.consultas += 1
+
+
+# ============= Requisições =============
+
+
+def _iniciar():
+    if request.endpoint != "metricas":
+        g._medicao = _Medicao()
+
+
+def _finalizar(response):
+    medicao = g.pop("_medicao", None)
+    if medicao is None:
+        return response
+
+    duracao = time.perf_counter() - medicao.inicio
+    tamanho = response.calculate_content_length()  # None em respostas em streaming
+    response.headers["Server-Timing"] = (
+        f"app;dur={duracao * 1000:.1f}, "
+        f'db;dur={medicao.banco * 1000:.1f};desc="{medicao.consultas} consultas"'
+    )
+
+    endpoint = request.endpoint or "sem_rota"
+    metodo, status = request.method, response.status_code
+    current_app.extensions["metricas"].registrar(
+        endpoint, metodo, status, duracao, medicao.banco, medicao.consultas, tamanho
+    )
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            codificar(
+                {
+                    "metodo": metodo,
+                    "caminho": request.path,
+                    "endpoint": endpoint,
+                    "status": status,
+                    "duracao_ms": round(duracao * 1000, 2),
+                    "banco_ms": round(medicao.banco * 1000, 2),
+                    "consultas": medicao.consultas,
+                    "bytes": tamanho,
+                }
+            ).decode("utf-8")
+        )
+    return response
+
+
+def configurar(app):
+    """Liga a instrumentação se ``INSTRUMENTACAO`` estiver ativa (depois do db.init_app)"""
+    app.config.setdefault(
+        "INSTRUMENTACAO",
+        os.getenv("INSTRUMENTACAO", "0").lower() in ("1", "true", "sim"),
+    )
+    if not app.config["INSTRUMENTACAO"]:
+        return
+
+    metricas = app.extensions["metricas"] = Metricas()
+    app.before_request(_iniciar)
+    app.after_request(_finalizar)
+
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        if not event.contains(engine, "before_cursor_execute", _antes_da_consulta):
+            event.listen(engine, "before_cursor_execute", _antes_da_consulta)
+            event.listen(engine, "after_cursor_execute", _depois_da_consulta)
+
+    # Uma linha JSON por requisição no stderr (capturado pelo Gunicorn), salvo
+    # configuração de logging própria
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    if logger.level == logging.NOTSET:
+        logger.setLevel(logging.INFO)
+
+    def exportar_metricas():
+        corpo = f"# pid {os.getpid()}\n" + metricas.exportar()
+        return app.response_class(corpo, mimetype="text/plain; version=0.0.4")
+
+    app.add_url_rule("/metrics", "metricas", exportar_metricas)
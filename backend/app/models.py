@@ -1,9 +1,36 @@
 from datetime import datetime
 from enum import Enum
+from flask import current_app, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect
 import bcrypt
+from app.replicas import SessaoRoteada
 
-db = SQLAlchemy()
+# Leituras de requisições GET podem ir para a réplica (ver app/replicas.py)
+db = SQLAlchemy(session_options={"class_": SessaoRoteada})
+
+# Custo padrão do bcrypt (log2 das rodadas); configurável via BCRYPT_LOG_ROUNDS
+BCRYPT_LOG_ROUNDS_PADRAO = 12
+
+# Hash fictício por custo, usado para gastar o mesmo tempo com emails inexistentes
+_hashes_ficticios = {}
+
+
+def custo_bcrypt():
+    """Custo configurado na aplicação atual (ou o padrão fora de contexto)"""
+    if has_app_context():
+        return int(
+            current_app.config.get("BCRYPT_LOG_ROUNDS", BCRYPT_LOG_ROUNDS_PADRAO)
+        )
+    return BCRYPT_LOG_ROUNDS_PADRAO
+
+
+def _hash_ficticio(custo):
+    if custo not in _hashes_ficticios:
+        _hashes_ficticios[custo] = bcrypt.hashpw(
+            b"senha-ficticia", bcrypt.gensalt(custo)
+        )
+    return _hashes_ficticios[custo]
 
 
 class TipoUsuario(str, Enum):
@@ -33,6 +60,15 @@ class Usuario(db.Model):
     tipo = db.Column(db.Enum(TipoUsuario), nullable=False, default=TipoUsuario.CLIENTE)
     criado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     data_cadastro = db.Column(db.DateTime, default=datetime.utcnow, nullable=True)
+    # Versão do registro para o GET condicional (app/condicional.py)
+    atualizado_em = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    __table_args__ = (
+        # Listagens de clientes/mecânicos ordenadas por nome
+        db.Index("ix_usuarios_tipo_nome", tipo, nome),
+    )
 
     @property
     def tipo_usuario(self):
@@ -47,15 +83,45 @@ class Usuario(db.Model):
     )
 
     def set_senha(self, senha):
-        """Hash da senha usando bcrypt"""
-        self.senha_hash = bcrypt.hashpw(senha.encode("utf-8"), bcrypt.gensalt()).decode(
-            "utf-8"
-        )
+        """Hash da senha usando bcrypt com o custo configurado"""
+        self.senha_hash = bcrypt.hashpw(
+            senha.encode("utf-8"), bcrypt.gensalt(custo_bcrypt())
+        ).decode("utf-8")
 
     def verificar_senha(self, senha):
         """Verifica se a senha está correta"""
         return bcrypt.checkpw(senha.encode("utf-8"), self.senha_hash.encode("utf-8"))
 
+    def precisa_rehash(self):
+        """Indica se o hash foi gerado com um custo diferente do configurado"""
+        # Formato do bcrypt: $2b$<custo>$<salt+hash>
+        partes = self.senha_hash.split("$")
+        return len(partes) < 4 or partes[2] != f"{custo_bcrypt():02d}"
+
+    @classmethod
+    def autenticar(cls, email, senha):
+        """Retorna o usuário se email e senha conferem, senão None
+
+        Emails inexistentes também pagam uma verificação bcrypt (com um hash
+        fictício de mesmo custo), para que o tempo de resposta não revele quais
+        emails estão cadastrados. Senhas corretas com hash de custo diferente
+        do configurado são recalculadas e salvas.
+        """
+        usuario = cls.query.filter_by(email=email).first()
+        if not usuario or not senha:
+            bcrypt.checkpw(
+                (senha or "").encode("utf-8"), _hash_ficticio(custo_bcrypt())
+            )
+            return None
+
+        if not usuario.verificar_senha(senha):
+            return None
+
+        if usuario.precisa_rehash():
+            usuario.set_senha(senha)
+            db.session.commit()
+        return usuario
+
     def to_dict(self, include_veiculos=False):
         data = {
             "id": self.id,
@@ -83,8 +149,14 @@ class Veiculo(db.Model):
     marca = db.Column(db.String(50), nullable=False)
     ano = db.Column(db.Integer, nullable=False)
     cor = db.Column(db.String(30), nullable=True)
-    usuario_id = db.Column(db.Integer, db.ForeignKey("usuarios.id"), nullable=False)
+    usuario_id = db.Column(
+        db.Integer, db.ForeignKey("usuarios.id"), nullable=False, index=True
+    )
     criado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # Versão do registro para o GET condicional (app/condicional.py)
+    atualizado_em = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
 
     # Relacionamentos
     servicos = db.relationship(
@@ -120,6 +192,16 @@ class Servico(db.Model):
         db.Enum(StatusServico), nullable=False, default=StatusServico.PENDENTE
     )
     valor = db.Column(db.Numeric(10, 2), nullable=True)
+    # valor, ou a soma dos orçamentos quando não há valor; mantido por
+    # _sincronizar_valor_total a cada flush (lido como float, como a antiga
+    # propriedade)
+    valor_total = db.Column(
+        db.Numeric(10, 2, asdecimal=False),
+        nullable=False,
+        default=0,
+        server_default="0",
+        index=True,
+    )
     veiculo_id = db.Column(db.Integer, db.ForeignKey("veiculos.id"), nullable=False)
     mecanico_id = db.Column(db.Integer, db.ForeignKey("usuarios.id"), nullable=True)
     criado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -129,21 +211,33 @@ class Servico(db.Model):
     data_previsao = db.Column(db.DateTime, nullable=True)
     data_conclusao = db.Column(db.DateTime, nullable=True)
 
+    __table_args__ = (
+        # Dashboards e listagens do mecânico: WHERE mecanico_id = ? AND status = ?
+        db.Index("ix_servicos_mecanico_status", mecanico_id, status),
+        # Filtro por status com ordenação pelos mais recentes
+        db.Index("ix_servicos_status_criado_em", status, criado_em.desc()),
+        # Histórico do veículo e listagens do cliente
+        db.Index("ix_servicos_veiculo_criado_em", veiculo_id, criado_em),
+        # Ordenação padrão e paginação por cursor (criado_em, id)
+        db.Index("ix_servicos_criado_em_id", criado_em, id),
+        # Fila de serviços aguardando orçamento sem mecânico atribuído
+        db.Index(
+            "ix_servicos_aguardando_sem_mecanico",
+            criado_em,
+            postgresql_where=db.and_(
+                status == StatusServico.AGUARDANDO_ORCAMENTO, mecanico_id.is_(None)
+            ),
+            sqlite_where=db.and_(
+                status == StatusServico.AGUARDANDO_ORCAMENTO, mecanico_id.is_(None)
+            ),
+        ),
+    )
+
     # Relacionamentos
     orcamentos = db.relationship(
         "Orcamento", backref="servico", lazy=True, cascade="all, delete-orphan"
     )
 
-    @property
-    def valor_total(self):
-        """Retorna o valor total do serviço incluindo orçamentos"""
-        if self.valor:
-            return float(self.valor)
-        # Soma valores dos orçamentos se não houver valor definido
-        if self.orcamentos:
-            return sum(float(o.valor) for o in self.orcamentos)
-        return 0.0
-
     @property
     def status_display(self):
         """Retorna o status formatado para exibição"""
@@ -177,7 +271,7 @@ class Servico(db.Model):
             "observacoes": self.observacoes,
             "status": self.status.value,
             "valor": float(self.valor) if self.valor else None,
-            "valor_total": self.valor_total,
+            "valor_total": self.valor_total or 0.0,
             "veiculo_id": self.veiculo_id,
             "mecanico_id": self.mecanico_id,
             "criado_em": self.criado_em.isoformat(),
@@ -203,7 +297,9 @@ class Orcamento(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     descricao = db.Column(db.Text, nullable=False)
     valor = db.Column(db.Numeric(10, 2), nullable=False)
-    servico_id = db.Column(db.Integer, db.ForeignKey("servicos.id"), nullable=False)
+    servico_id = db.Column(
+        db.Integer, db.ForeignKey("servicos.id"), nullable=False, index=True
+    )
     criado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
     @property
@@ -223,3 +319,100 @@ class Orcamento(db.Model):
 
     def __repr__(self):
         return f"<Orcamento {self.id} - R$ {self.valor}>"
+
+
+class ResumoDiario(db.Model):
+    """Quantidade e receita dos serviços por dia, mecânico e status
+
+    Tabela derivada de ``servicos``, mantida por app/resumos.py. Cada serviço
+    conta uma vez, no dia da conclusão (concluídos) ou da criação (demais).
+    ``mecanico_id`` 0 agrupa os serviços sem mecânico.
+    """
+
+    __tablename__ = "resumos_diarios"
+
+    dia = db.Column(db.Date, primary_key=True)
+    mecanico_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    status = db.Column(db.Enum(StatusServico), primary_key=True)
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+    receita = db.Column(db.Numeric(12, 2, asdecimal=False), nullable=False, default=0)
+
+    __table_args__ = (
+        # Resumo por mecânico (dashboards) sem varrer todos os dias
+        db.Index("ix_resumos_diarios_mecanico_status_dia", mecanico_id, status, dia),
+    )
+
+    def __repr__(self):
+        return f"<ResumoDiario {self.dia} {self.mecanico_id} {self.status.value}>"
+
+
+# ============= Sincronização de Servico.valor_total =============
+
+# valor quando preenchido (e diferente de zero), senão a soma dos orçamentos
+_orcamentos = Orcamento.__table__
+_servicos = Servico.__table__
+EXPRESSAO_VALOR_TOTAL = db.func.coalesce(
+    db.func.nullif(_servicos.c.valor, 0),
+    db.select(db.func.sum(_orcamentos.c.valor))
+    .where(_orcamentos.c.servico_id == _servicos.c.id)
+    .scalar_subquery(),
+    0,
+)
+
+
+def atualizar_valor_total(conexao, servico_ids=None):
+    """Recalcula valor_total no banco (todos os serviços se ``servico_ids`` for None)"""
+    comando = db.update(_servicos).values(
+        valor_total=EXPRESSAO_VALOR_TOTAL,
+        # Não conta como alteração do serviço
+        atualizado_em=_servicos.c.atualizado_em,
+    )
+    if servico_ids is not None:
+        comando = comando.where(_servicos.c.id.in_(servico_ids))
+    conexao.execute(comando)
+
+
+def _servicos_afetados(sessao):
+    ids = set()
+    for objeto in sessao.new | sessao.dirty | sessao.deleted:
+        if isinstance(objeto, Orcamento):
+            historico = inspect(objeto).attrs.servico_id.history
+            ids.update(historico.added, historico.deleted, historico.unchanged)
+            ids.add(objeto.servico_id)
+        elif isinstance(objeto, Servico) and objeto not in sessao.deleted:
+            if (
+                objeto in sessao.new
+                or inspect(objeto).attrs.valor.history.has_changes()
+            ):
+                ids.add(objeto.id)
+    ids.discard(None)
+    return ids
+
+
+@event.listens_for(db.session, "after_flush")
+def _sincronizar_valor_total(sessao, contexto):
+    ids = _servicos_afetados(sessao)
+    if ids:
+        atualizar_valor_total(sessao.connection(), ids)
+        sessao.info.setdefault("valor_total_expirar", set()).update(ids)
+
+
+@event.listens_for(db.session, "after_flush_postexec")
+def _expirar_valor_total(sessao, contexto):
+    # Objetos já carregados passam a ler o total recalculado no banco
+    for servico_id in sessao.info.pop("valor_total_expirar", ()):
+        servico = sessao.identity_map.get(sessao.identity_key(Servico, servico_id))
+        if servico is not None:
+            sessao.expire(servico, ["valor_total"])
+
+
+@event.listens_for(db.session, "before_flush")
+def _registrar_conclusao(sessao, contexto, instancias):
+    # Serviços que passam a concluído sem data de conclusão recebem a atual
+    for objeto in sessao.new | sessao.dirty:
+        if (
+            isinstance(objeto, Servico)
+            and objeto.status == StatusServico.CONCLUIDO
+            and objeto.data_conclusao is None
+        ):
+            objeto.data_conclusao = datetime.utcnow()
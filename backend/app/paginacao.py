@@ -0,0 +1,140 @@
+"""Paginação por cursor (keyset) para as listagens da API
+
+As páginas são ordenadas por ``(criado_em, id)`` e o cursor codifica a chave
+do último item retornado. A próxima página é obtida com
+``WHERE (criado_em, id) > (:criado_em, :id)``, que usa índice e tem custo
+constante, ao contrário de ``OFFSET``.
+"""
+import base64
+from datetime import datetime
+from flask import request
+from sqlalchemy import func, tuple_
+from app.models import db
+from app.condicional import Versao, resumo
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 200
+
+
+def codificar_cursor(criado_em, item_id):
+    """Gera um cursor opaco a partir da chave de ordenação"""
+    bruto = f"{criado_em.isoformat()}|{item_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(bruto).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(cursor):
+    """Recupera ``(criado_em, id)`` de um cursor; levanta ValueError se inválido"""
+    try:
+        preenchimento = "=" * (-len(cursor) % 4)
+        bruto = base64.urlsafe_b64decode(cursor + preenchimento).decode("utf-8")
+        criado_em, item_id = bruto.split("|")
+        return datetime.fromisoformat(criado_em), int(item_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Cursor inválido") from e
+
+
+def ler_parametros():
+    """Lê ``limit``, ``after`` e ``total`` da query string
+
+    Retorna ``(limite, apos, incluir_total)``. Sem ``limit`` usa
+    ``LIMITE_PADRAO``; valores acima de ``LIMITE_MAXIMO`` são truncados.
+    Levanta ValueError para parâmetros inválidos.
+    """
+    limite = request.args.get("limit", LIMITE_PADRAO)
+    try:
+        limite = int(limite)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Parâmetro limit inválido") from e
+    if limite < 1:
+        raise ValueError("Parâmetro limit inválido")
+
+    apos = request.args.get("after")
+    incluir_total = request.args.get("total", "").lower() in ("1", "true", "sim")
+
+    return (
+        min(limite, LIMITE_MAXIMO),
+        decodificar_cursor(apos) if apos else None,
+        incluir_total,
+    )
+
+
+def contar(query):
+    """COUNT dos registros da query, sem ordenação"""
+    subconsulta = query.order_by(None).subquery()
+    return db.session.query(func.count()).select_from(subconsulta).scalar()
+
+
+def _janela(query, modelo, limite, apos):
+    # Busca um item a mais para saber se existe próxima página
+    if apos:
+        query = query.filter(tuple_(modelo.criado_em, modelo.id) > tuple_(*apos))
+    return query.order_by(modelo.criado_em, modelo.id).limit(limite + 1)
+
+
+def paginar(query, modelo, limite, apos=None, incluir_total=False, total_registros=None):
+    """Aplica a paginação por cursor a uma query do modelo
+
+    Retorna um dicionário com ``itens``, ``proximo_cursor`` (None na última
+    página) e, se solicitado, ``total_registros`` (COUNT sem ordenação, ou o
+    valor já contado em ``versao_pagina``).
+    """
+    if incluir_total and total_registros is None:
+        total_registros = contar(query)
+
+    itens = _janela(query, modelo, limite, apos).all()
+
+    proximo_cursor = None
+    if len(itens) > limite:
+        itens = itens[:limite]
+        proximo_cursor = codificar_cursor(itens[-1].criado_em, itens[-1].id)
+
+    pagina = {"itens": itens, "proximo_cursor": proximo_cursor}
+    if incluir_total:
+        pagina["total_registros"] = total_registros
+    return pagina
+
+
+def resposta_paginada(chave, pagina, serializar):
+    """Monta o corpo JSON de uma listagem paginada
+
+    ``serializar`` recebe a lista de itens da página e devolve a lista de
+    dicionários (ver ``app.serializacao``).
+    """
+    corpo = {
+        chave: serializar(pagina["itens"]),
+        "total": len(pagina["itens"]),
+        "proximo_cursor": pagina["proximo_cursor"],
+    }
+    if "total_registros" in pagina:
+        corpo["total_registros"] = pagina["total_registros"]
+    return corpo
+
+
+def versao_pagina(query, modelo, limite, apos=None, incluir_total=False, filho=None):
+    """Versão da página que ``paginar`` devolveria (ver ``app.condicional``)
+
+    Resume os ids e o ``atualizado_em`` da mesma janela (inclusive o item extra
+    que define o próximo cursor) em uma consulta; ``filho`` é
+    ``(modelo, chave_estrangeira, coluna_data)`` de uma coleção embutida nos
+    itens. Com ``incluir_total`` o COUNT entra na versão e é devolvido para
+    ser repassado a ``paginar``. Retorna ``(versao, total_registros)``.
+    """
+    janela = _janela(
+        query.with_entities(modelo.id.label("id"), modelo.atualizado_em.label("atualizado_em")),
+        modelo,
+        limite,
+        apos,
+    ).subquery()
+    consulta = db.select(*resumo(janela.c.id, janela.c.atualizado_em)).select_from(janela)
+    if filho is not None:
+        modelo_filho, chave, data = filho
+        consulta = consulta.outerjoin(modelo_filho, chave == janela.c.id).add_columns(
+            *resumo(modelo_filho.id, data)
+        )
+    partes = list(db.session.execute(consulta).one())
+
+    total_registros = None
+    if incluir_total:
+        total_registros = contar(query)
+        partes.append(total_registros)
+    return Versao(partes), total_registros
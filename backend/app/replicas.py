@@ -0,0 +1,137 @@
+"""Leituras em uma réplica do banco, com leitura das próprias escritas
+
+Com ``DATABASE_REPLICA_URL`` (config ``SQLALCHEMY_REPLICA_URI``) definida, as
+consultas de requisições de leitura (GET/HEAD/OPTIONS) vão para a réplica e
+todo o resto para o primário:
+
+* flush, INSERT/UPDATE/DELETE e ``SELECT ... FOR UPDATE`` usam sempre o
+  primário, e a partir da primeira escrita a transação inteira fica nele;
+* depois de um commit com escritas, o usuário (token da API ou sessão das
+  páginas) lê do primário por ``REPLICA_JANELA_ESCRITA`` segundos (5), o
+  suficiente para a réplica alcançar as próprias alterações. A marca fica no
+  backend de cache compartilhado quando houver (``DASHBOARD_CACHE=sqlite``),
+  senão no processo.
+
+Sem réplica configurada, nada muda: ``get_bind`` devolve o primário.
+"""
+import os
+import threading
+import time
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+BIND_REPLICA = "replica"
+METODOS_LEITURA = frozenset(("GET", "HEAD", "OPTIONS"))
+
+
+def configurar(app):
+    """Registra a réplica como bind do Flask-SQLAlchemy (antes do db.init_app)"""
+    from app.conexoes import opcoes_engine
+
+    app.config.setdefault("SQLALCHEMY_REPLICA_URI", os.getenv("DATABASE_REPLICA_URL"))
+    app.config.setdefault("REPLICA_JANELA_ESCRITA", float(os.getenv("REPLICA_JANELA_ESCRITA", "5")))
+    uri = app.config["SQLALCHEMY_REPLICA_URI"]
+    if uri:
+        binds = app.config.setdefault("SQLALCHEMY_BINDS", {})
+        binds.setdefault(BIND_REPLICA, {"url": uri, **opcoes_engine(uri)})
+
+
+def registrar(app):
+    """Ajustes depois do db.init_app
+
+    O Flask-SQLAlchemy cria um MetaData (vazio) para cada bind, e ele fica no
+    ``db`` global. A réplica não tem tabelas próprias: sem esse MetaData,
+    ``create_all``/``drop_all`` continuam atuando só no primário, inclusive em
+    aplicações criadas depois sem réplica.
+    """
+    db = app.extensions["sqlalchemy"]
+    db.metadatas.pop(BIND_REPLICA, None)
+
+
+def _usuario_atual():
+    usuario_id = getattr(request, "usuario_id", None)
+    if usuario_id is None:
+        usuario_id = session.get("user_id")
+    return usuario_id
+
+
+class _EscritasRecentes:
+    """Usuários que escreveram há menos de ``janela`` segundos (no processo)"""
+
+    def __init__(self):
+        self._expira_em = {}
+        self._lock = threading.Lock()
+
+    def get(self, chave):
+        with self._lock:
+            expira_em = self._expira_em.get(chave)
+            if expira_em is None or expira_em < time.monotonic():
+                self._expira_em.pop(chave, None)
+                return None
+            return True
+
+    def set(self, chave, valor, ttl):
+        with self._lock:
+            agora = time.monotonic()
+            for antiga in [c for c, e in self._expira_em.items() if e < agora]:
+                del self._expira_em[antiga]
+            self._expira_em[chave] = agora + ttl
+
+
+def _escritas_recentes():
+    backend = current_app.extensions.get("cache_dashboard")
+    if getattr(backend, "compartilhado", False):
+        return backend
+    return current_app.extensions.setdefault("replica_escritas", _EscritasRecentes())
+
+
+def _chave_escrita(usuario_id):
+    return f"replica:escrita:{usuario_id}"
+
+
+def _ler_da_replica():
+    """Decide uma vez por requisição se as leituras podem ir para a réplica"""
+    if not has_request_context() or request.method not in METODOS_LEITURA:
+        return False
+    decisao = g.get("_ler_da_replica")
+    if decisao is None:
+        usuario_id = _usuario_atual()
+        decisao = usuario_id is None or not _escritas_recentes().get(_chave_escrita(usuario_id))
+        g._ler_da_replica = decisao
+    return decisao
+
+
+def _escreve(clause):
+    return clause is not None and (
+        getattr(clause, "is_dml", False) or getattr(clause, "_for_update_arg", None) is not None
+    )
+
+
+class SessaoRoteada(Session):
+    """Sessão que envia as leituras das requisições GET para a réplica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and BIND_REPLICA in self._db.engines:
+            if self._flushing or _escreve(clause):
+                self.info["primario"] = True
+            elif not self.info.get("primario") and _ler_da_replica():
+                return self._db.engines[BIND_REPLICA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(SessaoRoteada, "after_commit")
+def _marcar_escrita(sessao):
+    if not sessao.info.get("primario") or not has_request_context():
+        return
+    usuario_id = _usuario_atual()
+    if usuario_id is not None:
+        _escritas_recentes().set(
+            _chave_escrita(usuario_id), True, current_app.config["REPLICA_JANELA_ESCRITA"]
+        )
+
+
+@event.listens_for(SessaoRoteada, "after_transaction_end")
+def _fim_da_transacao(sessao, transacao):
+    if transacao.parent is None:
+        sessao.info.pop("primario", None)
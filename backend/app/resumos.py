@@ -0,0 +1,229 @@
+"""Resumos diários (quantidade e receita por dia, mecânico e status)
+
+A tabela ``resumos_diarios`` guarda, para cada combinação (dia, mecânico,
+status), quantos serviços existem e a soma de seus ``valor_total``. Os
+dashboards e os relatórios leem essas linhas (uma por dia com movimento) em
+vez de agregar ``servicos`` inteira.
+
+Manutenção incremental: a cada flush que inclui, altera ou remove serviços
+(ou orçamentos, que mudam o ``valor_total``), os serviços tocados são lidos
+antes e depois da alteração e a diferença (quantidade e receita, com sinal) é
+somada às chaves com ``INSERT ... ON CONFLICT DO UPDATE``. Assim escritas
+concorrentes na mesma chave não conflitam. UPDATE/DELETE em massa sobre
+``Servico`` (``Query.update``, ``db.update(Servico)``) também são acompanhados.
+A reconstrução completa fica no comando ``flask resumos reconstruir``.
+"""
+from collections import defaultdict
+from decimal import Decimal
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event
+from app.models import (
+    db,
+    Servico,
+    ResumoDiario,
+    StatusServico,
+    atualizar_valor_total,
+    _servicos_afetados,
+)
+
+_servicos = Servico.__table__
+_resumos = ResumoDiario.__table__
+
+# Dia em que o serviço é contado: conclusão para concluídos, criação para os demais
+DATA_REFERENCIA = db.case(
+    (
+        db.and_(
+            _servicos.c.status == StatusServico.CONCLUIDO,
+            _servicos.c.data_conclusao.is_not(None),
+        ),
+        _servicos.c.data_conclusao,
+    ),
+    else_=_servicos.c.criado_em,
+)
+DIA = db.func.date(DATA_REFERENCIA, type_=db.Date)
+MECANICO = db.func.coalesce(_servicos.c.mecanico_id, 0)
+
+
+def _estado_servicos(conexao, servico_ids, bloquear=False):
+    """Chave (dia, mecânico, status) e valor_total atuais dos serviços no banco
+
+    Com ``bloquear``, trava as linhas (``SELECT ... FOR UPDATE``): uma transação
+    concorrente que altere os mesmos serviços espera o commit desta e só então
+    lê o estado anterior, evitando diferenças calculadas sobre dados velhos.
+    """
+    if not servico_ids:
+        return {}
+    consulta = db.select(
+        _servicos.c.id, DIA, MECANICO, _servicos.c.status, _servicos.c.valor_total
+    ).where(_servicos.c.id.in_(servico_ids))
+    if bloquear:
+        consulta = consulta.with_for_update()
+    return {
+        servico_id: ((dia, mecanico_id, status), valor_total or 0)
+        for servico_id, dia, mecanico_id, status, valor_total in conexao.execute(consulta)
+    }
+
+
+def _insert_ou_soma(conexao):
+    """INSERT ... ON CONFLICT DO UPDATE somando as diferenças à linha existente"""
+    if conexao.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    comando = insert(_resumos)
+    return comando.on_conflict_do_update(
+        index_elements=[_resumos.c.dia, _resumos.c.mecanico_id, _resumos.c.status],
+        set_={
+            "quantidade": _resumos.c.quantidade + comando.excluded.quantidade,
+            "receita": db.func.round(_resumos.c.receita + comando.excluded.receita, 2),
+        },
+    )
+
+
+def aplicar_diferencas(conexao, anteriores, atuais):
+    """Soma aos resumos a diferença entre dois estados de ``_estado_servicos``
+
+    Cada serviço do estado anterior subtrai 1 e seu valor da sua chave antiga;
+    cada serviço do estado atual soma na chave nova. O upsert é atômico por
+    linha, então transações concorrentes sobre a mesma chave (ex.: serviços
+    novos no mesmo dia) apenas se somam. Linhas que chegam a zero são removidas.
+    """
+    diferencas = defaultdict(lambda: [0, Decimal(0)])
+    for estados, sinal in ((anteriores, -1), (atuais, 1)):
+        for chave, valor in estados.values():
+            diferenca = diferencas[chave]
+            diferenca[0] += sinal
+            diferenca[1] += sinal * Decimal(str(valor))
+    linhas = [
+        {
+            "dia": dia,
+            "mecanico_id": mecanico_id,
+            "status": status,
+            "quantidade": quantidade,
+            "receita": float(receita),
+        }
+        for (dia, mecanico_id, status), (quantidade, receita) in diferencas.items()
+        if quantidade or receita
+    ]
+    if not linhas:
+        return
+    conexao.execute(_insert_ou_soma(conexao), linhas)
+    chaves = [(linha["dia"], linha["mecanico_id"], linha["status"]) for linha in linhas]
+    conexao.execute(
+        db.delete(_resumos).where(
+            _resumos.c.quantidade <= 0,
+            db.tuple_(_resumos.c.dia, _resumos.c.mecanico_id, _resumos.c.status).in_(chaves),
+        )
+    )
+
+
+def recalcular_resumos(conexao):
+    """Reconstrói todos os resumos a partir de ``servicos``"""
+    linhas = db.select(
+        DIA.label("dia"),
+        MECANICO.label("mecanico_id"),
+        _servicos.c.status,
+        _servicos.c.valor_total,
+    ).subquery()
+    # Agrupa em uma subconsulta: GROUP BY sobre as colunas e não sobre as
+    # expressões, que o PostgreSQL não reconhece como iguais às do SELECT
+    agrupado = db.select(
+        linhas.c.dia,
+        linhas.c.mecanico_id,
+        linhas.c.status,
+        db.func.count(),
+        db.func.coalesce(db.func.sum(linhas.c.valor_total), 0),
+    ).group_by(linhas.c.dia, linhas.c.mecanico_id, linhas.c.status)
+
+    conexao.execute(db.delete(_resumos))
+    conexao.execute(
+        db.insert(_resumos).from_select(
+            ["dia", "mecanico_id", "status", "quantidade", "receita"], agrupado
+        )
+    )
+
+
+# ============= Manutenção pelos eventos da sessão =============
+
+
+@event.listens_for(db.session, "before_flush")
+def _estado_anterior(sessao, contexto, instancias):
+    ids = _servicos_afetados(sessao) | {
+        objeto.id
+        for objeto in sessao.dirty | sessao.deleted
+        if isinstance(objeto, Servico)
+        and objeto.id is not None
+        and (objeto in sessao.deleted or sessao.is_modified(objeto))
+    }
+    if ids:
+        anteriores = _estado_servicos(sessao.connection(), ids, bloquear=True)
+        sessao.info.setdefault("resumos_anteriores", {}).update(anteriores)
+
+
+@event.listens_for(db.session, "after_flush")
+def _atualizar_resumos(sessao, contexto):
+    # Registrado depois de _sincronizar_valor_total: a receita já é a nova
+    anteriores = sessao.info.pop("resumos_anteriores", {})
+    ids = (
+        set(anteriores)
+        | _servicos_afetados(sessao)
+        | {
+            objeto.id
+            for objeto in sessao.new | sessao.dirty
+            if isinstance(objeto, Servico) and objeto not in sessao.deleted
+        }
+    )
+    conexao = sessao.connection()
+    aplicar_diferencas(conexao, anteriores, _estado_servicos(conexao, ids - {None}))
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _descartar_estado(sessao, transacao):
+    sessao.info.pop("resumos_anteriores", None)
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def _acompanhar_em_massa(estado):
+    """UPDATE/DELETE em massa sobre Servico não passam pelo flush
+
+    Além dos resumos, recalcula ``valor_total`` dos serviços alterados por
+    UPDATE (antes dos resumos, que somam esse valor).
+    """
+    if not (estado.is_update or estado.is_delete):
+        return None
+    mapper = estado.bind_mapper
+    if mapper is None or mapper.class_ is not Servico:
+        return None
+
+    conexao = estado.session.connection()
+    if isinstance(estado.parameters, list):
+        # UPDATE em massa por chave primária (lista de dicionários com "id")
+        ids = {parametros["id"] for parametros in estado.parameters}
+    else:
+        consulta = db.select(_servicos.c.id)
+        if estado.statement.whereclause is not None:
+            consulta = consulta.where(estado.statement.whereclause)
+        ids = set(conexao.execute(consulta).scalars())
+    anteriores = _estado_servicos(conexao, ids, bloquear=True)
+
+    resultado = estado.invoke_statement()
+
+    if estado.is_update and ids:
+        atualizar_valor_total(conexao, ids)
+    aplicar_diferencas(conexao, anteriores, _estado_servicos(conexao, ids))
+    return resultado
+
+
+# ============= Comandos =============
+
+cli = AppGroup("resumos", help="Resumos diários dos serviços")
+
+
+@cli.command("reconstruir")
+def reconstruir():
+    """Recalcula todos os resumos diários a partir de servicos"""
+    recalcular_resumos(db.session.connection())
+    db.session.commit()
+    linhas = db.session.query(db.func.count()).select_from(ResumoDiario).scalar()
+    click.echo(f"Resumos diários reconstruídos: {linhas} linhas")
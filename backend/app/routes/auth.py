@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from app.models import db, Usuario, TipoUsuario
-from app.utils import gerar_token
+from app.utils import gerar_token, token_required, revogar_token
 
 bp = Blueprint("auth", __name__, url_prefix="/auth")
 
@@ -70,10 +70,10 @@ def login():
     if not data or "email" not in data or "senha" not in data:
         return jsonify({"message": "Email e senha são obrigatórios"}), 400
 
-    # Buscar usuário
-    usuario = Usuario.query.filter_by(email=data["email"]).first()
+    # Buscar usuário e conferir a senha
+    usuario = Usuario.autenticar(data["email"], data["senha"])
 
-    if not usuario or not usuario.verificar_senha(data["senha"]):
+    if not usuario:
         return jsonify({"message": "Email ou senha incorretos"}), 401
 
     # Gerar token
@@ -91,6 +91,14 @@ def login():
     )
 
 
+@bp.route("/logout", methods=["POST"])
+@token_required
+def logout():
+    """Revoga o token usado na requisição"""
+    revogar_token(request.headers["Authorization"].split(" ")[1])
+    return jsonify({"message": "Logout realizado com sucesso"}), 200
+
+
 @bp.route("/perfil", methods=["GET"])
 def perfil():
     """Retorna informações do perfil do usuário autenticado"""
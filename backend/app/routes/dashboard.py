@@ -1,6 +1,8 @@
 from flask import Blueprint, jsonify, request
-from app.models import Servico, Veiculo, Usuario, StatusServico
+from app.models import Servico, Veiculo, StatusServico
 from app.utils import token_required
+from app.estatisticas import resumo_gerente
+from app.cache import cache, chave_dashboard
 
 bp = Blueprint("dashboard", __name__)
 
@@ -11,25 +13,22 @@ def dashboard():
     """Retorna dashboard baseado no tipo de usuário"""
 
     if request.tipo_usuario == "gerente":
-        return dashboard_gerente()
+        calcular = dashboard_gerente
     elif request.tipo_usuario == "mecanico":
-        return dashboard_mecanico()
+        calcular = dashboard_mecanico
     else:  # cliente
-        return dashboard_cliente()
+        calcular = dashboard_cliente
+
+    # Invalidado pelos commits que alteram os dados exibidos (ver app/cache.py)
+    chave = chave_dashboard(request.tipo_usuario, request.usuario_id, "api")
+    return jsonify(cache.obter_ou_calcular(chave, calcular)), 200
 
 
 def dashboard_gerente():
     """Dashboard para gerente"""
-    # Estatísticas gerais
-    total_clientes = Usuario.query.filter_by(tipo="cliente").count()
-    total_mecanicos = Usuario.query.filter_by(tipo="mecanico").count()
-    total_veiculos = Veiculo.query.count()
-    total_servicos = Servico.query.count()
-
-    # Serviços por status
-    pendentes = Servico.query.filter_by(status=StatusServico.PENDENTE).count()
-    em_andamento = Servico.query.filter_by(status=StatusServico.EM_ANDAMENTO).count()
-    concluidos = Servico.query.filter_by(status=StatusServico.CONCLUIDO).count()
+    # Estatísticas gerais com número fixo de consultas
+    resumo = resumo_gerente()
+    por_status = resumo["por_status"]
 
     # Serviços ativos (últimos 10)
     servicos_ativos = (
@@ -41,24 +40,22 @@ def dashboard_gerente():
         .all()
     )
 
-    return (
-        jsonify(
-            {
-                "tipo_usuario": "gerente",
-                "estatisticas": {
-                    "total_clientes": total_clientes,
-                    "total_mecanicos": total_mecanicos,
-                    "total_veiculos": total_veiculos,
-                    "total_servicos": total_servicos,
-                    "servicos_pendentes": pendentes,
-                    "servicos_em_andamento": em_andamento,
-                    "servicos_concluidos": concluidos,
-                },
-                "servicos_ativos": [s.to_dict() for s in servicos_ativos],
-            }
-        ),
-        200,
-    )
+    return {
+        "tipo_usuario": "gerente",
+        "estatisticas": {
+            "total_clientes": resumo["total_clientes"],
+            "total_mecanicos": resumo["total_mecanicos"],
+            "total_veiculos": resumo["total_veiculos"],
+            "total_servicos": resumo["total_servicos"],
+            "servicos_pendentes": por_status["pendente"],
+            "servicos_em_andamento": por_status["em_andamento"],
+            "servicos_concluidos": por_status["concluido"],
+            "receita": resumo["receita"],
+            "receita_mensal": resumo["receita_mensal"],
+        },
+        "mecanicos": resumo["mecanicos"],
+        "servicos_ativos": [s.to_dict() for s in servicos_ativos],
+    }
 
 
 def dashboard_mecanico():
@@ -71,21 +68,16 @@ def dashboard_mecanico():
     em_andamento = [s for s in meus_servicos if s.status == StatusServico.EM_ANDAMENTO]
     concluidos = [s for s in meus_servicos if s.status == StatusServico.CONCLUIDO]
 
-    return (
-        jsonify(
-            {
-                "tipo_usuario": "mecanico",
-                "estatisticas": {
-                    "total_servicos": len(meus_servicos),
-                    "pendentes": len(pendentes),
-                    "em_andamento": len(em_andamento),
-                    "concluidos": len(concluidos),
-                },
-                "servicos_atribuidos": [s.to_dict() for s in meus_servicos],
-            }
-        ),
-        200,
-    )
+    return {
+        "tipo_usuario": "mecanico",
+        "estatisticas": {
+            "total_servicos": len(meus_servicos),
+            "pendentes": len(pendentes),
+            "em_andamento": len(em_andamento),
+            "concluidos": len(concluidos),
+        },
+        "servicos_atribuidos": [s.to_dict() for s in meus_servicos],
+    }
 
 
 def dashboard_cliente():
@@ -102,20 +94,15 @@ def dashboard_cliente():
     em_andamento = [s for s in meus_servicos if s.status == StatusServico.EM_ANDAMENTO]
     concluidos = [s for s in meus_servicos if s.status == StatusServico.CONCLUIDO]
 
-    return (
-        jsonify(
-            {
-                "tipo_usuario": "cliente",
-                "estatisticas": {
-                    "total_veiculos": len(meus_veiculos),
-                    "total_servicos": len(meus_servicos),
-                    "servicos_pendentes": len(pendentes),
-                    "servicos_em_andamento": len(em_andamento),
-                    "servicos_concluidos": len(concluidos),
-                },
-                "meus_veiculos": [v.to_dict() for v in meus_veiculos],
-                "meus_servicos": [s.to_dict() for s in meus_servicos],
-            }
-        ),
-        200,
-    )
+    return {
+        "tipo_usuario": "cliente",
+        "estatisticas": {
+            "total_veiculos": len(meus_veiculos),
+            "total_servicos": len(meus_servicos),
+            "servicos_pendentes": len(pendentes),
+            "servicos_em_andamento": len(em_andamento),
+            "servicos_concluidos": len(concluidos),
+        },
+        "meus_veiculos": [v.to_dict() for v in meus_veiculos],
+        "meus_servicos": [s.to_dict() for s in meus_servicos],
+    }
@@ -0,0 +1,107 @@
+"""Fluxo Server-Sent Events com as mudanças dos serviços (ver app/eventos.py)"""
+import json
+import queue
+import time
+from flask import Blueprint, Response, current_app, jsonify, request, session
+from app.eventos import canais_inscricao
+from app.utils import gerar_token, token_required, validar_token
+
+bp = Blueprint("eventos", __name__)
+
+# Espera sugerida ao EventSource antes de reconectar (ms)
+RECONEXAO_MS = 3000
+
+# Espera sugerida (Retry-After, segundos) quando o processo está no limite
+ESPERA_LOTADO = 30
+
+# Finalidade do ticket de conexão (não vale como token da API)
+FINALIDADE_TICKET = "eventos"
+
+
+def _usuario():
+    """(usuario_id, tipo) do token ou da sessão das páginas; (None, erro) sem login
+
+    O ``EventSource`` do navegador não envia cabeçalhos próprios: as páginas
+    usam o cookie de sessão, e os clientes da API, além do ``Authorization``,
+    podem passar em ``?ticket=`` um ticket de ``POST /api/eventos/ticket``. O
+    token da API nunca vai na URL (que acaba nos logs de acesso).
+    """
+    token, finalidade = request.args.get("ticket"), FINALIDADE_TICKET
+    if "Authorization" in request.headers:
+        token, finalidade = request.headers["Authorization"].partition(" ")[2], None
+    if token:
+        payload, erro = validar_token(token, finalidade)
+        if erro:
+            return None, erro
+        return (payload["usuario_id"], payload["tipo"]), None
+    if "user_id" in session:
+        return (session["user_id"], session.get("tipo_usuario")), None
+    return None, "Token não fornecido"
+
+
+def _mensagem(evento):
+    dados = json.dumps(evento["dados"], ensure_ascii=False)
+    return f"event: {evento['tipo']}\ndata: {dados}\n\n"
+
+
+def _fluxo(eventos, inscricao):
+    """Eventos da inscrição, comentários de keep-alive e fim após ``duracao_max``
+
+    O fim periódico libera a thread do worker; o navegador reconecta sozinho.
+    """
+    try:
+        yield f"retry: {RECONEXAO_MS}\n: conectado\n\n"
+        fim = time.monotonic() + eventos.duracao_max
+        while True:
+            if inscricao.transbordou:
+                # Eventos perdidos (fila cheia): o cliente deve recarregar os dados
+                yield "event: recarregar\ndata: {}\n\n"
+                return
+            restante = fim - time.monotonic()
+            if restante <= 0:
+                return
+            try:
+                evento = inscricao.fila.get(timeout=min(eventos.heartbeat, restante))
+            except queue.Empty:
+                yield ": ping\n\n"
+                continue
+            yield _mensagem(evento)
+    finally:
+        eventos.cancelar(inscricao)
+
+
+@bp.route("/ticket", methods=["POST"])
+@token_required
+def gerar_ticket():
+    """Ticket curto para abrir o fluxo com ``?ticket=`` (vale só para isso)"""
+    if current_app.extensions.get("eventos") is None:
+        return jsonify({"message": "Eventos desativados"}), 404
+    validade = current_app.config["EVENTOS_TICKET_VALIDADE"]
+    ticket = gerar_token(
+        request.usuario_id, request.tipo_usuario, FINALIDADE_TICKET, validade=validade
+    )
+    return jsonify({"ticket": ticket, "validade": validade}), 200
+
+
+@bp.route("", methods=["GET"])
+def fluxo_eventos():
+    """Abre o fluxo de eventos do usuário (text/event-stream)"""
+    eventos = current_app.extensions.get("eventos")
+    if eventos is None:
+        return jsonify({"message": "Eventos desativados"}), 404
+
+    usuario, erro = _usuario()
+    if erro:
+        return jsonify({"message": erro}), 401
+
+    # Inscreve antes de responder: nada escrito depois disto se perde
+    inscricao = eventos.inscrever(canais_inscricao(*usuario))
+    if inscricao is None:
+        resposta = jsonify({"message": "Limite de conexões de eventos atingido"})
+        resposta.headers["Retry-After"] = str(ESPERA_LOTADO)
+        return resposta, 503
+    return Response(
+        _fluxo(eventos, inscricao),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,196 @@
+"""Exportação em streaming (NDJSON ou CSV) de serviços, orçamentos e veículos
+
+As linhas são lidas em lotes com ``yield_per`` (cursor no servidor no
+PostgreSQL) e escritas na resposta à medida que chegam, então a memória usada
+não depende da quantidade de registros exportados.
+
+Parâmetros da query string:
+
+* ``formato``: ``ndjson`` (padrão) ou ``csv``;
+* ``data_inicio`` / ``data_fim``: ``AAAA-MM-DD``, sobre ``criado_em``
+  (``data_fim`` inclusiva);
+* ``status``: status do serviço (serviços e orçamentos).
+"""
+import csv
+import io
+from datetime import datetime, timedelta
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from sqlalchemy import select
+from app.models import db, Servico, Veiculo, Orcamento, StatusServico
+from app.utils import token_required
+from app.serializacao import (
+    COLUNAS_SERVICO,
+    COLUNAS_VEICULO,
+    COLUNAS_ORCAMENTO,
+    servicos_json,
+    veiculos_json,
+    orcamentos_json,
+    codificar,
+)
+
+bp = Blueprint("exportacao", __name__)
+
+# Linhas buscadas do banco por lote
+TAMANHO_LOTE = 1000
+
+FORMATOS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+CAMPOS_SERVICO = (
+    "id",
+    "descricao",
+    "observacoes",
+    "status",
+    "valor",
+    "valor_total",
+    "veiculo_id",
+    "mecanico_id",
+    "criado_em",
+    "atualizado_em",
+    "data_previsao",
+    "data_conclusao",
+)
+CAMPOS_VEICULO = (
+    "id",
+    "placa",
+    "modelo",
+    "marca",
+    "ano",
+    "cor",
+    "usuario_id",
+    "criado_em",
+)
+CAMPOS_ORCAMENTO = (
+    "id",
+    "descricao",
+    "valor",
+    "valor_total",
+    "servico_id",
+    "criado_em",
+)
+
+
+def ler_filtros(modelo, consulta, com_status=False):
+    """Aplica os filtros de período (e status) da query string
+
+    Levanta ValueError para valores inválidos.
+    """
+    data_inicio = request.args.get("data_inicio")
+    data_fim = request.args.get("data_fim")
+    try:
+        if data_inicio:
+            inicio = datetime.strptime(data_inicio, "%Y-%m-%d")
+            consulta = consulta.where(modelo.criado_em >= inicio)
+        if data_fim:
+            fim = datetime.strptime(data_fim, "%Y-%m-%d")
+            consulta = consulta.where(modelo.criado_em < fim + timedelta(days=1))
+    except ValueError as e:
+        raise ValueError("Data inválida. Use o formato AAAA-MM-DD") from e
+
+    status = request.args.get("status")
+    if status and com_status:
+        try:
+            consulta = consulta.where(Servico.status == StatusServico(status))
+        except ValueError as e:
+            raise ValueError("Status inválido") from e
+    return consulta
+
+
+def _celula(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return valor
+
+
+def _gerar(consulta, serializar, campos, formato):
+    """Gera o corpo da resposta, um lote por vez"""
+    resultado = db.session.execute(consulta.execution_options(yield_per=TAMANHO_LOTE))
+    if formato == "csv":
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        escritor.writerow(campos)
+        for lote in resultado.partitions():
+            for dados in serializar(lote):
+                escritor.writerow([_celula(dados[campo]) for campo in campos])
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue().encode("utf-8")
+    else:
+        for lote in resultado.partitions():
+            yield b"".join(codificar(dados) + b"\n" for dados in serializar(lote))
+
+
+def exportar(nome, consulta, serializar, campos):
+    formato = request.args.get("formato", "ndjson")
+    if formato not in FORMATOS:
+        return jsonify({"message": "Formato inválido. Use ndjson ou csv"}), 400
+
+    extensao = "ndjson" if formato == "ndjson" else "csv"
+    return Response(
+        stream_with_context(_gerar(consulta, serializar, campos, formato)),
+        mimetype=FORMATOS[formato],
+        headers={"Content-Disposition": f"attachment; filename={nome}.{extensao}"},
+    )
+
+
+def _servicos_visiveis(consulta):
+    """Restringe aos serviços que o usuário pode ver (mesma regra da listagem)"""
+    if request.tipo_usuario == "mecanico":
+        return consulta.where(Servico.mecanico_id == request.usuario_id)
+    if request.tipo_usuario != "gerente":
+        return consulta.join(Veiculo, Servico.veiculo_id == Veiculo.id).where(
+            Veiculo.usuario_id == request.usuario_id
+        )
+    return consulta
+
+
+@bp.route("/servicos", methods=["GET"])
+@token_required
+def exportar_servicos():
+    """Exporta os serviços visíveis ao usuário"""
+    consulta = _servicos_visiveis(select(*COLUNAS_SERVICO))
+    try:
+        consulta = ler_filtros(Servico, consulta, com_status=True)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    consulta = consulta.order_by(Servico.criado_em, Servico.id)
+    return exportar(
+        "servicos",
+        consulta,
+        lambda lote: servicos_json(lote, include_orcamentos=False),
+        CAMPOS_SERVICO,
+    )
+
+
+@bp.route("/orcamentos", methods=["GET"])
+@token_required
+def exportar_orcamentos():
+    """Exporta os orçamentos dos serviços visíveis ao usuário"""
+    consulta = select(*COLUNAS_ORCAMENTO).join(Servico, Orcamento.servico_id == Servico.id)
+    consulta = _servicos_visiveis(consulta)
+    try:
+        consulta = ler_filtros(Orcamento, consulta, com_status=True)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    consulta = consulta.order_by(Orcamento.criado_em, Orcamento.id)
+    return exportar("orcamentos", consulta, orcamentos_json, CAMPOS_ORCAMENTO)
+
+
+@bp.route("/veiculos", methods=["GET"])
+@token_required
+def exportar_veiculos():
+    """Exporta os veículos (gerente vê todos, demais apenas os seus)"""
+    consulta = select(*COLUNAS_VEICULO)
+    if request.tipo_usuario != "gerente":
+        consulta = consulta.where(Veiculo.usuario_id == request.usuario_id)
+    try:
+        consulta = ler_filtros(Veiculo, consulta)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    consulta = consulta.order_by(Veiculo.criado_em, Veiculo.id)
+    return exportar("veiculos", consulta, veiculos_json, CAMPOS_VEICULO)
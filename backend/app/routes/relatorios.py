@@ -0,0 +1,88 @@
+"""Relatórios de movimento e receita lidos dos resumos diários
+
+Parâmetros da query string:
+
+* ``data_inicio`` / ``data_fim``: ``AAAA-MM-DD`` (padrão: últimos 30 dias,
+  ``data_fim`` inclusiva);
+* ``agrupar``: ``dia`` (padrão) ou ``mes``;
+* ``mecanico_id``: restringe a um mecânico.
+
+Cada período traz a quantidade de serviços por status (concluídos contam no
+dia da conclusão, os demais no dia da criação) e a receita dos concluídos.
+"""
+from datetime import datetime, timedelta
+from flask import Blueprint, jsonify, request
+from app.models import StatusServico
+from app.utils import token_required, requer_tipo_usuario
+from app.estatisticas import serie_diaria
+
+bp = Blueprint("relatorios", __name__)
+
+PERIODO_PADRAO_DIAS = 30
+AGRUPAMENTOS = {
+    "dia": lambda dia: dia.isoformat(),
+    "mes": lambda dia: dia.strftime("%Y-%m"),
+}
+
+
+def _ler_data(nome, padrao):
+    valor = request.args.get(nome)
+    if not valor:
+        return padrao
+    return datetime.strptime(valor, "%Y-%m-%d").date()
+
+
+@bp.route("", methods=["GET"])
+@token_required
+@requer_tipo_usuario("gerente")
+def relatorio():
+    """Série de quantidade por status e receita por dia ou mês (apenas gerente)"""
+    agrupar = request.args.get("agrupar", "dia")
+    if agrupar not in AGRUPAMENTOS:
+        return jsonify({"message": "Agrupamento inválido. Use dia ou mes"}), 400
+    try:
+        fim = _ler_data("data_fim", datetime.utcnow().date())
+        inicio = _ler_data("data_inicio", fim - timedelta(days=PERIODO_PADRAO_DIAS - 1))
+    except ValueError:
+        return jsonify({"message": "Data inválida. Use o formato AAAA-MM-DD"}), 400
+    if inicio > fim:
+        return jsonify({"message": "data_inicio deve ser anterior a data_fim"}), 400
+    mecanico_id = request.args.get("mecanico_id", type=int)
+
+    rotulo = AGRUPAMENTOS[agrupar]
+    periodos = {}
+    for dia, status, quantidade, receita in serie_diaria(inicio, fim, mecanico_id):
+        periodo = periodos.setdefault(
+            rotulo(dia),
+            {
+                "periodo": rotulo(dia),
+                "total": 0,
+                "concluidos": 0,
+                "receita": 0.0,
+                "por_status": {s.value: 0 for s in StatusServico},
+            },
+        )
+        periodo["total"] += quantidade
+        periodo["por_status"][status.value] += quantidade
+        if status == StatusServico.CONCLUIDO:
+            periodo["concluidos"] += quantidade
+            periodo["receita"] += receita
+
+    series = list(periodos.values())
+    return (
+        jsonify(
+            {
+                "data_inicio": inicio.isoformat(),
+                "data_fim": fim.isoformat(),
+                "agrupar": agrupar,
+                "mecanico_id": mecanico_id,
+                "series": series,
+                "totais": {
+                    "total": sum(p["total"] for p in series),
+                    "concluidos": sum(p["concluidos"] for p in series),
+                    "receita": round(sum(p["receita"] for p in series), 2),
+                },
+            }
+        ),
+        200,
+    )
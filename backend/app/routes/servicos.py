@@ -1,6 +1,21 @@
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
 from flask import Blueprint, request, jsonify
-from app.models import db, Servico, Veiculo, Usuario, Orcamento, StatusServico
+from app.models import (
+    db,
+    Servico,
+    Veiculo,
+    Usuario,
+    Orcamento,
+    StatusServico,
+    TipoUsuario,
+)
 from app.utils import token_required, requer_tipo_usuario
+from app.cache import prefixos_servico, invalidar_apos_commit
+from app.condicional import Versao, responder, resumo
+from app.eventos import evento_servico, publicar_apos_commit
+from app.paginacao import ler_parametros, paginar, resposta_paginada, versao_pagina
+from app.serializacao import consulta_servicos, servicos_json, resposta_json
 
 bp = Blueprint("servicos", __name__)
 
@@ -8,49 +23,75 @@ bp = Blueprint("servicos", __name__)
 @bp.route("", methods=["GET"])
 @token_required
 def listar_servicos():
-    """Lista serviços baseado no tipo de usuário"""
-    if request.tipo_usuario == "gerente":
-        # Gerente vê todos
-        servicos = Servico.query.all()
-    elif request.tipo_usuario == "mecanico":
+    """Lista serviços baseado no tipo de usuário (paginado por cursor)"""
+    try:
+        limite, apos, incluir_total = ler_parametros()
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # Gerente vê todos (apenas as colunas da resposta, sem objetos do ORM)
+    query = consulta_servicos()
+
+    if request.tipo_usuario == "mecanico":
         # Mecânico vê apenas os atribuídos a ele
-        servicos = Servico.query.filter_by(mecanico_id=request.usuario_id).all()
-    else:
+        query = query.filter(Servico.mecanico_id == request.usuario_id)
+    elif request.tipo_usuario != "gerente":
         # Cliente vê apenas dos seus veículos
-        veiculos_ids = [
-            v.id for v in Veiculo.query.filter_by(usuario_id=request.usuario_id).all()
-        ]
-        servicos = Servico.query.filter(Servico.veiculo_id.in_(veiculos_ids)).all()
-
-    return (
-        jsonify(
-            {
-                "servicos": [s.to_dict(include_orcamentos=True) for s in servicos],
-                "total": len(servicos),
-            }
-        ),
-        200,
+        query = query.join(Veiculo, Servico.veiculo_id == Veiculo.id).filter(
+            Veiculo.usuario_id == request.usuario_id
+        )
+
+    # Os orçamentos dos itens também mudam valor_total
+    versao, total_registros = versao_pagina(
+        query,
+        Servico,
+        limite,
+        apos,
+        incluir_total,
+        filho=(Orcamento, Orcamento.servico_id, Orcamento.criado_em),
     )
 
+    def gerar():
+        pagina = paginar(query, Servico, limite, apos, incluir_total, total_registros)
+        return resposta_json(resposta_paginada("servicos", pagina, servicos_json))
+
+    return responder(versao, gerar)
+
 
 @bp.route("/<int:servico_id>", methods=["GET"])
 @token_required
 def obter_servico(servico_id):
-    """Obtém um serviço específico"""
-    servico = db.session.get(Servico, servico_id)
-    if not servico:
+    """Obtém um serviço específico (GET condicional, ver app/condicional.py)"""
+    # Permissão e versão em uma consulta, sem carregar o serviço
+    linha = db.session.execute(
+        db.select(
+            Servico.mecanico_id,
+            Veiculo.usuario_id,
+            Servico.atualizado_em,
+            *resumo(Orcamento.id, Orcamento.criado_em),
+        )
+        .join(Veiculo, Servico.veiculo_id == Veiculo.id)
+        .outerjoin(Orcamento, Orcamento.servico_id == Servico.id)
+        .where(Servico.id == servico_id)
+        .group_by(Servico.id, Veiculo.id)
+    ).first()
+    if not linha:
         return jsonify({"message": "Serviço não encontrado"}), 404
 
     # Verificar permissão
     if request.tipo_usuario == "cliente":
-        veiculo = db.session.get(Veiculo, servico.veiculo_id)
-        if veiculo.usuario_id != request.usuario_id:
+        if linha.usuario_id != request.usuario_id:
             return jsonify({"message": "Acesso negado"}), 403
     elif request.tipo_usuario == "mecanico":
-        if servico.mecanico_id != request.usuario_id:
+        if linha.mecanico_id != request.usuario_id:
             return jsonify({"message": "Acesso negado"}), 403
 
-    return jsonify(servico.to_dict(include_orcamentos=True)), 200
+    # Orçamentos não são alterados nem excluídos: o maior timestamp basta
+    def gerar():
+        servico = db.session.get(Servico, servico_id)
+        return jsonify(servico.to_dict(include_orcamentos=True)), 200
+
+    return responder(Versao(linha, exata=True), gerar)
 
 
 @bp.route("", methods=["POST"])
@@ -157,6 +198,209 @@ def atualizar_servico(servico_id):
         return jsonify({"message": f"Erro ao atualizar serviço: {str(e)}"}), 500
 
 
+# Itens aceitos por chamada de /batch
+MAX_ITENS_LOTE = 500
+
+
+def _erro_item(servico_id, mensagem, codigo):
+    return {"id": servico_id, "ok": False, "message": mensagem, "status_code": codigo}
+
+
+def _ler_valor(valor):
+    """Decimal que cabe em servicos.valor; InvalidOperation para NaN, infinito ou overflow
+
+    Um valor fora do Numeric(10, 2) faria o UPDATE do lote inteiro falhar no
+    PostgreSQL, então é recusado no item.
+    """
+    tipo = Servico.__table__.c.valor.type
+    decimal = Decimal(str(valor))
+    if not decimal.is_finite():
+        raise InvalidOperation(valor)
+    decimal = decimal.quantize(Decimal(1).scaleb(-tipo.scale))
+    if abs(decimal) >= Decimal(10) ** (tipo.precision - tipo.scale):
+        raise InvalidOperation(valor)
+    return decimal
+
+
+def _id_valido(valor):
+    """Ids do JSON: inteiros (bool é subclasse de int e não conta)"""
+    return isinstance(valor, int) and not isinstance(valor, bool)
+
+
+def _validar_item(item, atual, mecanicos_validos):
+    """Aplica as regras de atualizar_servico a um item do lote
+
+    Retorna (novos_valores, erro); ``atual`` é a linha do serviço no banco.
+    """
+    servico_id = item["id"]
+    if atual is None:
+        return None, _erro_item(servico_id, "Serviço não encontrado", 404)
+
+    novos = {
+        "status": atual.status,
+        "mecanico_id": atual.mecanico_id,
+        "valor": atual.valor,
+        "data_conclusao": atual.data_conclusao,
+    }
+    if request.tipo_usuario == "mecanico" and atual.mecanico_id != request.usuario_id:
+        return None, _erro_item(servico_id, "Acesso negado", 403)
+
+    if "status" in item:
+        try:
+            novos["status"] = StatusServico(item["status"])
+        except ValueError:
+            return None, _erro_item(servico_id, "Status inválido", 400)
+
+    # Mecânico altera apenas o status (demais campos são ignorados, como no PUT)
+    if request.tipo_usuario == "gerente":
+        if "valor" in item:
+            try:
+                valor = item["valor"]
+                novos["valor"] = None if valor is None else _ler_valor(valor)
+            except InvalidOperation:
+                return None, _erro_item(servico_id, "Valor inválido", 400)
+        if "mecanico_id" in item:
+            # null remove a atribuição; demais valores precisam ser um mecânico
+            mecanico_id = item["mecanico_id"]
+            if mecanico_id is not None and (
+                not _id_valido(mecanico_id) or mecanico_id not in mecanicos_validos
+            ):
+                return None, _erro_item(servico_id, "Mecânico inválido", 400)
+            novos["mecanico_id"] = mecanico_id
+
+    if novos["status"] == StatusServico.CONCLUIDO and novos["data_conclusao"] is None:
+        novos["data_conclusao"] = datetime.utcnow()
+    return novos, None
+
+
+@bp.route("/batch", methods=["POST"])
+@token_required
+@requer_tipo_usuario("gerente", "mecanico")
+def atualizar_servicos_em_lote():
+    """Atualiza status, mecânico e valor de vários serviços em uma transação
+
+    Recebe uma lista de ``{id, status, mecanico_id, valor}`` e aplica as mesmas
+    regras do PUT por item: o gerente altera tudo, o mecânico apenas o status
+    dos serviços atribuídos a ele; ``mecanico_id: null`` remove a atribuição.
+    Itens inválidos são reportados e não impedem os demais. Custo fixo em
+    consultas: uma leitura dos serviços, uma dos mecânicos, um UPDATE em massa
+    e uma leitura para a resposta.
+    """
+    itens = request.get_json(silent=True)
+    if isinstance(itens, dict):
+        itens = itens.get("servicos")
+    if not isinstance(itens, list) or not itens:
+        return jsonify({"message": "Envie uma lista de atualizações"}), 400
+    if len(itens) > MAX_ITENS_LOTE:
+        return (
+            jsonify({"message": f"Máximo de {MAX_ITENS_LOTE} itens por lote"}),
+            400,
+        )
+
+    resultados = [None] * len(itens)
+    validos = {}
+    for posicao, item in enumerate(itens):
+        servico_id = item.get("id") if isinstance(item, dict) else None
+        if not _id_valido(servico_id):
+            resultados[posicao] = _erro_item(servico_id, "Campo id é obrigatório", 400)
+        elif servico_id in validos:
+            resultados[posicao] = _erro_item(
+                servico_id, "Serviço repetido no lote", 400
+            )
+        else:
+            validos[servico_id] = posicao
+
+    # Estado atual dos serviços e donos dos veículos: uma consulta
+    atuais = {
+        linha.id: linha
+        for linha in db.session.execute(
+            db.select(
+                Servico.id,
+                Servico.status,
+                Servico.mecanico_id,
+                Servico.valor,
+                Servico.data_conclusao,
+                Veiculo.usuario_id,
+            )
+            .join(Veiculo, Servico.veiculo_id == Veiculo.id)
+            .where(Servico.id.in_(validos))
+        )
+    }
+
+    # Mecânicos informados: uma consulta
+    # (valores que não são ids viram erro do item em _validar_item)
+    pedidos = {
+        itens[posicao]["mecanico_id"]
+        for posicao in validos.values()
+        if _id_valido(itens[posicao].get("mecanico_id"))
+    }
+    mecanicos_validos = set()
+    if pedidos and request.tipo_usuario == "gerente":
+        mecanicos_validos = set(
+            db.session.execute(
+                db.select(Usuario.id).where(
+                    Usuario.id.in_(pedidos),
+                    Usuario.tipo == TipoUsuario.MECANICO,
+                )
+            ).scalars()
+        )
+
+    parametros = []
+    prefixos = set()
+    eventos = []
+    for servico_id, posicao in validos.items():
+        atual = atuais.get(servico_id)
+        novos, erro = _validar_item(itens[posicao], atual, mecanicos_validos)
+        if erro:
+            resultados[posicao] = erro
+            continue
+        parametros.append({"id": servico_id, **novos})
+        prefixos |= prefixos_servico(
+            {atual.mecanico_id, novos["mecanico_id"]},
+            {atual.status, novos["status"]},
+            {atual.usuario_id},
+        )
+        if novos["status"] != atual.status:
+            eventos.append(
+                evento_servico(
+                    servico_id,
+                    atual.status,
+                    novos["status"],
+                    atual.usuario_id,
+                    {atual.mecanico_id, novos["mecanico_id"]},
+                )
+            )
+
+    if parametros:
+        try:
+            # UPDATE em massa por chave primária (executemany)
+            db.session.execute(db.update(Servico), parametros)
+            invalidar_apos_commit(prefixos)
+            publicar_apos_commit(eventos)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({"message": f"Erro ao atualizar serviços: {str(e)}"}), 500
+
+        atualizados = consulta_servicos().filter(
+            Servico.id.in_([p["id"] for p in parametros])
+        )
+        for dados in servicos_json(atualizados, include_orcamentos=False):
+            resultados[validos[dados["id"]]] = {
+                "id": dados["id"],
+                "ok": True,
+                "servico": dados,
+            }
+
+    return resposta_json(
+        {
+            "atualizados": len(parametros),
+            "erros": len(itens) - len(parametros),
+            "resultados": resultados,
+        }
+    )
+
+
 @bp.route("/<int:servico_id>/orcamento", methods=["POST"])
 @token_required
 @requer_tipo_usuario("gerente")
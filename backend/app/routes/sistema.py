@@ -0,0 +1,43 @@
+"""Informações operacionais do processo (apenas gerente)"""
+import os
+from flask import Blueprint, jsonify, current_app
+from app.utils import token_required, requer_tipo_usuario
+from app.conexoes import estatisticas_pool
+from app.models import db
+from app.replicas import BIND_REPLICA
+
+bp = Blueprint("sistema", __name__)
+
+
+@bp.route("/pool", methods=["GET"])
+@token_required
+@requer_tipo_usuario("gerente")
+def pool():
+    """Conexões do pool do worker que atendeu a requisição
+
+    Cada processo tem o seu pool: com N workers o banco recebe até N vezes
+    ``maximo`` conexões.
+    """
+    opcoes = current_app.config["SQLALCHEMY_ENGINE_OPTIONS"]
+    replica = db.engines.get(BIND_REPLICA)
+    return (
+        jsonify(
+            {
+                "pid": os.getpid(),
+                "pool": estatisticas_pool(),
+                "pool_replica": estatisticas_pool(replica) if replica else None,
+                "configuracao": {
+                    chave: opcoes[chave]
+                    for chave in (
+                        "pool_size",
+                        "max_overflow",
+                        "pool_timeout",
+                        "pool_recycle",
+                        "pool_pre_ping",
+                    )
+                    if chave in opcoes
+                },
+            }
+        ),
+        200,
+    )
@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
-from app.models import db, Usuario, TipoUsuario
-from app.utils import token_required, requer_tipo_usuario
+from app.models import db, Usuario, Veiculo, TipoUsuario
+from app.utils import token_required, requer_tipo_usuario, revogar_tokens_usuario
+from app.condicional import Versao, responder, resumo
+from app.paginacao import ler_parametros, paginar, resposta_paginada, versao_pagina
+from app.serializacao import consulta_usuarios, usuarios_json, resposta_json
 
 bp = Blueprint("usuarios", __name__)
 
@@ -9,39 +12,55 @@ bp = Blueprint("usuarios", __name__)
 @token_required
 @requer_tipo_usuario("gerente")
 def listar_usuarios():
-    """Lista todos os usuários (apenas gerente)"""
+    """Lista todos os usuários (apenas gerente, paginado por cursor)"""
+    try:
+        limite, apos, incluir_total = ler_parametros()
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
     tipo_filtro = request.args.get("tipo")
 
-    query = Usuario.query
+    query = consulta_usuarios()
 
     if tipo_filtro:
         try:
             tipo = TipoUsuario(tipo_filtro)
-            query = query.filter_by(tipo=tipo)
+            query = query.filter(Usuario.tipo == tipo)
         except ValueError:
             return jsonify({"message": "Tipo de usuário inválido"}), 400
 
-    usuarios = query.all()
+    versao, total_registros = versao_pagina(query, Usuario, limite, apos, incluir_total)
+
+    def gerar():
+        pagina = paginar(query, Usuario, limite, apos, incluir_total, total_registros)
+        return resposta_json(resposta_paginada("usuarios", pagina, usuarios_json))
 
-    return (
-        jsonify({"usuarios": [u.to_dict() for u in usuarios], "total": len(usuarios)}),
-        200,
-    )
+    return responder(versao, gerar)
 
 
 @bp.route("/<int:usuario_id>", methods=["GET"])
 @token_required
 def obter_usuario(usuario_id):
-    """Obtém um usuário específico"""
+    """Obtém um usuário específico (GET condicional, ver app/condicional.py)"""
     # Gerente pode ver todos, outros apenas o próprio perfil
     if request.tipo_usuario != "gerente" and request.usuario_id != usuario_id:
         return jsonify({"message": "Acesso negado"}), 403
 
-    usuario = db.session.get(Usuario, usuario_id)
-    if not usuario:
+    linha = db.session.execute(
+        db.select(Usuario.atualizado_em, *resumo(Veiculo.id, Veiculo.atualizado_em))
+        .outerjoin(Veiculo, Veiculo.usuario_id == Usuario.id)
+        .where(Usuario.id == usuario_id)
+        .group_by(Usuario.id)
+    ).first()
+    if not linha:
         return jsonify({"message": "Usuário não encontrado"}), 404
 
-    return jsonify(usuario.to_dict(include_veiculos=True)), 200
+    # Veículos podem ser excluídos: só a ETag identifica a versão
+    def gerar():
+        usuario = db.session.get(Usuario, usuario_id)
+        return jsonify(usuario.to_dict(include_veiculos=True)), 200
+
+    return responder(Versao(linha), gerar)
 
 
 @bp.route("/<int:usuario_id>", methods=["PUT"])
@@ -75,6 +94,7 @@ def atualizar_usuario(usuario_id):
         usuario.set_senha(data["senha"])
 
     # Apenas gerente pode mudar tipo
+    tipo_anterior = usuario.tipo
     if "tipo" in data and request.tipo_usuario == "gerente":
         try:
             usuario.tipo = TipoUsuario(data["tipo"])
@@ -83,6 +103,9 @@ def atualizar_usuario(usuario_id):
 
     try:
         db.session.commit()
+        # Os tokens emitidos carregam o tipo antigo
+        if usuario.tipo != tipo_anterior:
+            revogar_tokens_usuario(usuario.id)
         return (
             jsonify(
                 {
@@ -109,6 +132,7 @@ def deletar_usuario(usuario_id):
     try:
         db.session.delete(usuario)
         db.session.commit()
+        revogar_tokens_usuario(usuario_id)
         return jsonify({"message": "Usuário deletado com sucesso"}), 200
     except Exception as e:
         db.session.rollback()
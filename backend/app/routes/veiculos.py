@@ -1,6 +1,11 @@
 from flask import Blueprint, request, jsonify
-from app.models import db, Veiculo, Usuario
+from sqlalchemy.exc import IntegrityError
+from app.models import db, Veiculo, Usuario, Servico, Orcamento
 from app.utils import token_required, requer_tipo_usuario
+from app.condicional import Versao, responder, resumo
+from app.paginacao import ler_parametros, paginar, resposta_paginada, versao_pagina
+from app.serializacao import consulta_veiculos, veiculos_json, resposta_json
+from app.importacao import ErroImportacao, ler_registros, importar_veiculos
 
 bp = Blueprint("veiculos", __name__)
 
@@ -8,31 +13,56 @@ bp = Blueprint("veiculos", __name__)
 @bp.route("", methods=["GET"])
 @token_required
 def listar_veiculos():
-    """Lista veículos - cliente vê apenas os seus, gerente vê todos"""
-    if request.tipo_usuario == "gerente":
-        veiculos = Veiculo.query.all()
-    else:
-        veiculos = Veiculo.query.filter_by(usuario_id=request.usuario_id).all()
+    """Lista veículos - cliente vê apenas os seus, gerente vê todos (paginado)"""
+    try:
+        limite, apos, incluir_total = ler_parametros()
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
 
-    return (
-        jsonify({"veiculos": [v.to_dict() for v in veiculos], "total": len(veiculos)}),
-        200,
-    )
+    query = consulta_veiculos()
+    if request.tipo_usuario != "gerente":
+        query = query.filter(Veiculo.usuario_id == request.usuario_id)
+
+    versao, total_registros = versao_pagina(query, Veiculo, limite, apos, incluir_total)
+
+    def gerar():
+        pagina = paginar(query, Veiculo, limite, apos, incluir_total, total_registros)
+        return resposta_json(resposta_paginada("veiculos", pagina, veiculos_json))
+
+    return responder(versao, gerar)
 
 
 @bp.route("/<int:veiculo_id>", methods=["GET"])
 @token_required
 def obter_veiculo(veiculo_id):
-    """Obtém um veículo específico"""
-    veiculo = db.session.get(Veiculo, veiculo_id)
-    if not veiculo:
+    """Obtém um veículo específico (GET condicional, ver app/condicional.py)"""
+    # Permissão e versão em uma consulta; os orçamentos mudam o valor_total
+    # dos serviços sem mudar o atualizado_em deles
+    linha = db.session.execute(
+        db.select(
+            Veiculo.usuario_id,
+            Veiculo.atualizado_em,
+            *resumo(Servico.id, Servico.atualizado_em),
+            *resumo(Orcamento.id, Orcamento.criado_em),
+        )
+        .outerjoin(Servico, Servico.veiculo_id == Veiculo.id)
+        .outerjoin(Orcamento, Orcamento.servico_id == Servico.id)
+        .where(Veiculo.id == veiculo_id)
+        .group_by(Veiculo.id)
+    ).first()
+    if not linha:
         return jsonify({"message": "Veículo não encontrado"}), 404
 
     # Verificar permissão
-    if request.tipo_usuario != "gerente" and veiculo.usuario_id != request.usuario_id:
+    if request.tipo_usuario != "gerente" and linha.usuario_id != request.usuario_id:
         return jsonify({"message": "Acesso negado"}), 403
 
-    return jsonify(veiculo.to_dict(include_servicos=True)), 200
+    # Serviços e orçamentos só são excluídos junto com o veículo
+    def gerar():
+        veiculo = db.session.get(Veiculo, veiculo_id)
+        return jsonify(veiculo.to_dict(include_servicos=True)), 200
+
+    return responder(Versao(linha, exata=True), gerar)
 
 
 @bp.route("", methods=["POST"])
@@ -91,6 +121,55 @@ def criar_veiculo():
         return jsonify({"message": f"Erro ao cadastrar veículo: {str(e)}"}), 500
 
 
+@bp.route("/bulk", methods=["POST"])
+@token_required
+@requer_tipo_usuario("cliente", "gerente")
+def importar_veiculos_em_lote():
+    """Cadastra vários veículos de uma vez (lista JSON ou CSV)
+
+    O CSV pode vir no corpo (Content-Type text/csv) ou no campo ``arquivo`` de
+    um formulário multipart. Com ``?parcial=1`` as linhas válidas são
+    importadas mesmo que outras tenham erro; sem ele, nada é importado.
+    """
+    parcial = request.args.get("parcial", "").lower() in ("1", "true", "sim")
+    try:
+        if "arquivo" in request.files:
+            arquivo = request.files["arquivo"]
+            formato = "json" if arquivo.filename.endswith(".json") else "csv"
+            registros = ler_registros(arquivo.read(), formato)
+        elif request.mimetype == "text/csv":
+            registros = ler_registros(request.get_data(), "csv")
+        elif request.is_json:
+            registros = ler_registros(request.get_json(silent=True), "json")
+        else:
+            return jsonify({"message": "Envie uma lista JSON ou um arquivo CSV"}), 400
+    except ErroImportacao as e:
+        return jsonify({"message": str(e)}), 400
+
+    if not registros:
+        return jsonify({"message": "Nenhum veículo informado"}), 400
+
+    try:
+        resultado = importar_veiculos(
+            registros,
+            request.usuario_id,
+            permitir_outros_donos=request.tipo_usuario == "gerente",
+            parcial=parcial,
+        )
+        db.session.commit()
+    except IntegrityError:
+        # Placa cadastrada por outra requisição entre a validação e o INSERT
+        db.session.rollback()
+        return jsonify({"message": "Placa já cadastrada"}), 409
+
+    if not resultado["importados"]:
+        return jsonify({"message": "Nenhum veículo importado", **resultado}), 400
+    return (
+        jsonify({"message": "Veículos importados com sucesso", **resultado}),
+        201,
+    )
+
+
 @bp.route("/<int:veiculo_id>", methods=["PUT"])
 @token_required
 def atualizar_veiculo(veiculo_id):
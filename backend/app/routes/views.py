@@ -1,6 +1,5 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
-from sqlalchemy import func, extract
 from app.models import (
     db,
     Usuario,
@@ -10,10 +9,22 @@ from app.models import (
     StatusServico,
     TipoUsuario,
 )
+from app.estatisticas import resumo_gerente, resumo_mecanico, contagem_usuarios_por_tipo
+from app.cache import cache, chave_dashboard
+from app.carregamento import (
+    servicos_para_listagem,
+    veiculos_com_servicos,
+    clientes_com_veiculos,
+    servicos_por_veiculo,
+)
 from functools import wraps
 
 bp = Blueprint("views", __name__)
 
+# Tamanhos de página oferecidos nas listagens HTML
+TAMANHOS_PAGINA = (10, 25, 50, 100)
+TAMANHO_PAGINA_PADRAO = 25
+
 
 # ============= Landing Page =============
 
@@ -55,6 +66,15 @@ def tipo_usuario_required(*tipos_permitidos):
     return decorator
 
 
+def parametros_pagina():
+    """Lê página e itens por página da query string (com valores seguros)"""
+    pagina = max(request.args.get("page", 1, type=int), 1)
+    por_pagina = request.args.get("per_page", TAMANHO_PAGINA_PADRAO, type=int)
+    if por_pagina not in TAMANHOS_PAGINA:
+        por_pagina = TAMANHO_PAGINA_PADRAO
+    return pagina, por_pagina
+
+
 # ============= Autenticação =============
 
 
@@ -67,9 +87,9 @@ def login():
         email = request.form.get("email")
         senha = request.form.get("senha")
 
-        usuario = Usuario.query.filter_by(email=email).first()
+        usuario = Usuario.autenticar(email, senha)
 
-        if usuario and usuario.verificar_senha(senha):
+        if usuario:
             session["user_id"] = usuario.id
             session["nome"] = usuario.nome
             session["email"] = usuario.email
@@ -176,24 +196,34 @@ def dashboard():
 def dashboard_cliente(user_id):
     veiculos = Veiculo.query.filter_by(usuario_id=user_id).all()
 
-    # Estatísticas
+    # Estatísticas (em cache até um commit alterar os dados do cliente)
+    def calcular_stats():
+        return {
+            "servicos_andamento": Servico.query.join(Veiculo)
+            .filter(
+                Veiculo.usuario_id == user_id,
+                Servico.status == StatusServico.EM_ANDAMENTO,
+            )
+            .count(),
+            "servicos_concluidos": Servico.query.join(Veiculo)
+            .filter(
+                Veiculo.usuario_id == user_id,
+                Servico.status == StatusServico.CONCLUIDO,
+            )
+            .count(),
+        }
+
     stats = {
         "total_veiculos": len(veiculos),
-        "servicos_andamento": Servico.query.join(Veiculo)
-        .filter(
-            Veiculo.usuario_id == user_id, Servico.status == StatusServico.EM_ANDAMENTO
-        )
-        .count(),
-        "servicos_concluidos": Servico.query.join(Veiculo)
-        .filter(
-            Veiculo.usuario_id == user_id, Servico.status == StatusServico.CONCLUIDO
-        )
-        .count(),
+        **cache.obter_ou_calcular(
+            chave_dashboard("cliente", user_id, "html"), calcular_stats
+        ),
     }
 
     # Serviços recentes
     servicos = (
-        Servico.query.join(Veiculo)
+        Servico.query.options(*servicos_para_listagem())
+        .join(Veiculo)
         .filter(Veiculo.usuario_id == user_id)
         .order_by(Servico.criado_em.desc())
         .limit(10)
@@ -206,26 +236,16 @@ def dashboard_cliente(user_id):
 
 
 def dashboard_mecanico(user_id):
-    # Estatísticas - Aguardando orçamento: TODOS não atribuídos OU atribuídos a mim
-    aguardando_orcamento = Servico.query.filter(
-        Servico.status == StatusServico.AGUARDANDO_ORCAMENTO,
-        db.or_(Servico.mecanico_id == None, Servico.mecanico_id == user_id),
-    ).count()
-
-    stats = {
-        "aguardando_orcamento": aguardando_orcamento,
-        "em_andamento": Servico.query.filter_by(
-            mecanico_id=user_id, status=StatusServico.EM_ANDAMENTO
-        ).count(),
-        "concluidos_mes": Servico.query.filter_by(
-            mecanico_id=user_id, status=StatusServico.CONCLUIDO
-        ).count(),
-        "total_servicos": Servico.query.filter_by(mecanico_id=user_id).count(),
-    }
+    # Estatísticas (em cache até um commit alterar os serviços do mecânico),
+    # lidas dos resumos diários
+    stats = cache.obter_ou_calcular(
+        chave_dashboard("mecanico", user_id, "html"), lambda: resumo_mecanico(user_id)
+    )
 
     # Serviços: TODOS aguardando orçamento (não atribuídos) + meus serviços em andamento
     servicos = (
-        Servico.query.filter(
+        Servico.query.options(*servicos_para_listagem())
+        .filter(
             db.or_(
                 # Serviços aguardando orçamento sem mecânico atribuído
                 db.and_(
@@ -253,65 +273,32 @@ def dashboard_mecanico(user_id):
 
 
 def dashboard_gerente():
-    # Estatísticas gerais
+    # Estatísticas gerais e por mecânico com número fixo de consultas, em cache
+    # até o próximo commit que altere serviços, orçamentos, veículos ou usuários
+    resumo = cache.obter_ou_calcular(
+        chave_dashboard("gerente", session.get("user_id"), "html"), resumo_gerente
+    )
+    por_status = resumo["por_status"]
     stats = {
-        "total_clientes": Usuario.query.filter_by(tipo=TipoUsuario.CLIENTE).count(),
-        "receita_mensal": db.session.query(func.sum(Servico.valor))
-        .filter(Servico.status == StatusServico.CONCLUIDO)
-        .scalar()
-        or 0,
-        "servicos_ativos": Servico.query.filter(
-            Servico.status.in_(
-                [
-                    StatusServico.AGUARDANDO_ORCAMENTO,
-                    StatusServico.ORCAMENTO_APROVADO,
-                    StatusServico.EM_ANDAMENTO,
-                ]
-            )
-        ).count(),
-        "total_veiculos": Veiculo.query.count(),
-        "total_servicos": Servico.query.count(),
-        "status_aguardando": Servico.query.filter_by(
-            status=StatusServico.AGUARDANDO_ORCAMENTO
-        ).count(),
-        "status_aprovado": Servico.query.filter_by(
-            status=StatusServico.ORCAMENTO_APROVADO
-        ).count(),
-        "status_andamento": Servico.query.filter_by(
-            status=StatusServico.EM_ANDAMENTO
-        ).count(),
-        "status_concluido": Servico.query.filter_by(
-            status=StatusServico.CONCLUIDO
-        ).count(),
+        "total_clientes": resumo["total_clientes"],
+        "receita_mensal": resumo["receita_mensal"],
+        "servicos_ativos": resumo["servicos_ativos"],
+        "total_veiculos": resumo["total_veiculos"],
+        "total_servicos": resumo["total_servicos"],
+        "status_aguardando": por_status[StatusServico.AGUARDANDO_ORCAMENTO.value],
+        "status_aprovado": por_status[StatusServico.ORCAMENTO_APROVADO.value],
+        "status_andamento": por_status[StatusServico.EM_ANDAMENTO.value],
+        "status_concluido": por_status[StatusServico.CONCLUIDO.value],
     }
-
-    # Estatísticas por mecânico
-    mecanicos = Usuario.query.filter_by(tipo=TipoUsuario.MECANICO).all()
-    mecanicos_stats = []
-    for mecanico in mecanicos:
-        mecanicos_stats.append(
-            {
-                "nome": mecanico.nome,
-                "aguardando": Servico.query.filter_by(
-                    mecanico_id=mecanico.id, status=StatusServico.AGUARDANDO_ORCAMENTO
-                ).count(),
-                "em_andamento": Servico.query.filter_by(
-                    mecanico_id=mecanico.id, status=StatusServico.EM_ANDAMENTO
-                ).count(),
-                "concluidos": Servico.query.filter_by(
-                    mecanico_id=mecanico.id, status=StatusServico.CONCLUIDO
-                )
-                .filter(
-                    extract("month", Servico.data_conclusao) == datetime.now().month,
-                    extract("year", Servico.data_conclusao) == datetime.now().year,
-                )
-                .count(),
-                "total": Servico.query.filter_by(mecanico_id=mecanico.id).count(),
-            }
-        )
+    mecanicos_stats = resumo["mecanicos"]
 
     # Serviços recentes
-    servicos = Servico.query.order_by(Servico.criado_em.desc()).limit(15).all()
+    servicos = (
+        Servico.query.options(*servicos_para_listagem())
+        .order_by(Servico.criado_em.desc())
+        .limit(15)
+        .all()
+    )
 
     return render_template(
         "dashboard_gerente.html",
@@ -330,26 +317,52 @@ def veiculos_list():
     tipo_usuario = session.get("tipo_usuario")
 
     if tipo_usuario == "cliente":
-        veiculos = Veiculo.query.filter_by(usuario_id=session.get("user_id")).all()
-        return render_template("veiculos_list.html", veiculos=veiculos, agrupado=False)
+        pagina, por_pagina = parametros_pagina()
+        paginacao = (
+            Veiculo.query.options(*veiculos_com_servicos())
+            .filter_by(usuario_id=session.get("user_id"))
+            .order_by(Veiculo.criado_em.desc(), Veiculo.id.desc())
+            .paginate(
+                page=pagina,
+                per_page=por_pagina,
+                max_per_page=max(TAMANHOS_PAGINA),
+                error_out=False,
+            )
+        )
+        return render_template(
+            "veiculos_list.html",
+            veiculos=paginacao.items,
+            paginacao=paginacao,
+            tamanhos_pagina=TAMANHOS_PAGINA,
+            agrupado=False,
+        )
     else:
-        # Para gerente/mecânico: agrupar veículos por cliente
-        clientes = (
-            Usuario.query.filter_by(tipo=TipoUsuario.CLIENTE)
-            .order_by(Usuario.nome)
-            .all()
+        # Para gerente/mecânico: agrupar veículos por cliente, paginando clientes.
+        # Veículos em uma consulta IN por página (selectinload) e a quantidade
+        # de serviços de cada um em um COUNT agrupado
+        pagina, por_pagina = parametros_pagina()
+        paginacao = (
+            Usuario.query.options(*clientes_com_veiculos())
+            .filter(Usuario.tipo == TipoUsuario.CLIENTE, Usuario.veiculos.any())
+            .order_by(Usuario.nome, Usuario.id)
+            .paginate(
+                page=pagina,
+                per_page=por_pagina,
+                max_per_page=max(TAMANHOS_PAGINA),
+                error_out=False,
+            )
         )
-        veiculos_por_cliente = []
-        for cliente in clientes:
-            veiculos_cliente = Veiculo.query.filter_by(usuario_id=cliente.id).all()
-            if veiculos_cliente:
-                veiculos_por_cliente.append(
-                    {"cliente": cliente, "veiculos": veiculos_cliente}
-                )
+        veiculos_por_cliente = [
+            {"cliente": cliente, "veiculos": cliente.veiculos}
+            for cliente in paginacao.items
+        ]
 
         return render_template(
             "veiculos_list.html",
             veiculos_por_cliente=veiculos_por_cliente,
+            servicos_por_veiculo=servicos_por_veiculo([c.id for c in paginacao.items]),
+            paginacao=paginacao,
+            tamanhos_pagina=TAMANHOS_PAGINA,
             agrupado=True,
         )
 
@@ -462,32 +475,71 @@ def servicos_list():
     tipo_usuario = session.get("tipo_usuario")
     user_id = session.get("user_id")
 
+    query = Servico.query.options(*servicos_para_listagem())
+
     if tipo_usuario == "cliente":
-        servicos = (
-            Servico.query.join(Veiculo)
-            .filter(Veiculo.usuario_id == user_id)
-            .order_by(Servico.criado_em.desc())
-            .all()
-        )
+        query = query.join(Veiculo).filter(Veiculo.usuario_id == user_id)
     elif tipo_usuario == "mecanico":
         # Mecânico vê: serviços aguardando orçamento (sem mecânico) + seus serviços
-        servicos = (
-            Servico.query.filter(
-                db.or_(
-                    db.and_(
-                        Servico.status == StatusServico.AGUARDANDO_ORCAMENTO,
-                        Servico.mecanico_id == None,
-                    ),
-                    Servico.mecanico_id == user_id,
-                )
+        query = query.filter(
+            db.or_(
+                db.and_(
+                    Servico.status == StatusServico.AGUARDANDO_ORCAMENTO,
+                    Servico.mecanico_id == None,
+                ),
+                Servico.mecanico_id == user_id,
             )
-            .order_by(Servico.criado_em.desc())
-            .all()
         )
-    else:  # gerente
-        servicos = Servico.query.order_by(Servico.criado_em.desc()).all()
 
-    return render_template("servicos_list.html", servicos=servicos)
+    # Filtros aplicados no SQL
+    filtros = {
+        "status": request.args.get("status", ""),
+        "mecanico_id": request.args.get("mecanico_id", type=int),
+        "data_inicio": request.args.get("data_inicio", ""),
+        "data_fim": request.args.get("data_fim", ""),
+    }
+
+    if filtros["status"] in [s.value for s in StatusServico]:
+        query = query.filter(Servico.status == StatusServico(filtros["status"]))
+    else:
+        filtros["status"] = ""
+
+    mecanicos = []
+    if tipo_usuario == "gerente":
+        mecanicos = Usuario.query.filter_by(tipo=TipoUsuario.MECANICO).all()
+        if filtros["mecanico_id"]:
+            query = query.filter(Servico.mecanico_id == filtros["mecanico_id"])
+    else:
+        filtros["mecanico_id"] = None
+
+    try:
+        if filtros["data_inicio"]:
+            inicio = datetime.strptime(filtros["data_inicio"], "%Y-%m-%d")
+            query = query.filter(Servico.criado_em >= inicio)
+        if filtros["data_fim"]:
+            fim = datetime.strptime(filtros["data_fim"], "%Y-%m-%d")
+            query = query.filter(Servico.criado_em < fim + timedelta(days=1))
+    except ValueError:
+        flash("Data inválida no filtro", "warning")
+        return redirect(url_for("views.servicos_list"))
+
+    pagina, por_pagina = parametros_pagina()
+    paginacao = query.order_by(Servico.criado_em.desc(), Servico.id.desc()).paginate(
+        page=pagina,
+        per_page=por_pagina,
+        max_per_page=max(TAMANHOS_PAGINA),
+        error_out=False,
+    )
+
+    return render_template(
+        "servicos_list.html",
+        servicos=paginacao.items,
+        paginacao=paginacao,
+        filtros=filtros,
+        mecanicos=mecanicos,
+        status_opcoes=[(s.value, get_status_display(s)) for s in StatusServico],
+        tamanhos_pagina=TAMANHOS_PAGINA,
+    )
 
 
 @bp.route("/servicos/solicitar", methods=["GET", "POST"])
@@ -716,8 +768,33 @@ def orcamento_approve(id):
 @login_required
 @tipo_usuario_required("gerente")
 def usuarios_list():
-    usuarios = Usuario.query.all()
-    return render_template("usuarios_list.html", usuarios=usuarios)
+    query = Usuario.query
+
+    tipo = request.args.get("tipo", "")
+    if tipo in [t.value for t in TipoUsuario]:
+        query = query.filter(Usuario.tipo == TipoUsuario(tipo))
+    else:
+        tipo = ""
+
+    pagina, por_pagina = parametros_pagina()
+    paginacao = query.order_by(Usuario.id).paginate(
+        page=pagina,
+        per_page=por_pagina,
+        max_per_page=max(TAMANHOS_PAGINA),
+        error_out=False,
+    )
+
+    # Totais por tipo em uma única consulta agrupada
+    contagem = {t.value: n for t, n in contagem_usuarios_por_tipo().items()}
+
+    return render_template(
+        "usuarios_list.html",
+        usuarios=paginacao.items,
+        paginacao=paginacao,
+        contagem=contagem,
+        filtros={"tipo": tipo},
+        tamanhos_pagina=TAMANHOS_PAGINA,
+    )
 
 
 @bp.route("/usuarios/novo", methods=["GET", "POST"])
@@ -0,0 +1,219 @@
+"""Serialização rápida das listagens da API
+
+As listagens consultam apenas as colunas usadas na resposta (linhas, sem
+passar pelo identity map do ORM) e montam os dicionários no mesmo formato de
+``to_dict``. Datas ficam como ``datetime`` e são convertidas pelo próprio
+encoder: ``orjson`` quando disponível (ISO 8601 nativo), com fallback para o
+``json`` da biblioteca padrão.
+"""
+import json
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from flask import current_app
+from app.models import db, Usuario, Veiculo, Servico, Orcamento
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+
+def _padrao(valor):
+    """Tipos que o encoder não converte sozinho"""
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def codificar(dados):
+    """Codifica ``dados`` em JSON (bytes UTF-8)"""
+    if orjson is not None:
+        return orjson.dumps(dados, default=_padrao)
+    return json.dumps(dados, default=_padrao, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+def resposta_json(dados, status=200):
+    """Equivalente a ``jsonify`` usando o encoder rápido"""
+    return current_app.response_class(codificar(dados), status=status, mimetype="application/json")
+
+
+# ============= Usuários =============
+
+COLUNAS_USUARIO = (
+    Usuario.id,
+    Usuario.nome,
+    Usuario.email,
+    Usuario.telefone,
+    Usuario.endereco,
+    Usuario.tipo,
+    Usuario.data_cadastro,
+    Usuario.criado_em,
+)
+
+
+def consulta_usuarios():
+    return db.session.query(*COLUNAS_USUARIO)
+
+
+def usuarios_json(linhas):
+    return [
+        {
+            "id": u.id,
+            "nome": u.nome,
+            "email": u.email,
+            "telefone": u.telefone,
+            "endereco": u.endereco,
+            "tipo": u.tipo.value,
+            "data_cadastro": u.data_cadastro,
+        }
+        for u in linhas
+    ]
+
+
+# ============= Veículos =============
+
+COLUNAS_VEICULO = (
+    Veiculo.id,
+    Veiculo.placa,
+    Veiculo.modelo,
+    Veiculo.marca,
+    Veiculo.ano,
+    Veiculo.cor,
+    Veiculo.usuario_id,
+    Veiculo.criado_em,
+)
+
+
+def consulta_veiculos():
+    return db.session.query(*COLUNAS_VEICULO)
+
+
+def veiculos_json(linhas):
+    return [
+        {
+            "id": v.id,
+            "placa": v.placa,
+            "modelo": v.modelo,
+            "marca": v.marca,
+            "ano": v.ano,
+            "cor": v.cor,
+            "usuario_id": v.usuario_id,
+            "criado_em": v.criado_em,
+        }
+        for v in linhas
+    ]
+
+
+# ============= Serviços =============
+
+COLUNAS_SERVICO = (
+    Servico.id,
+    Servico.descricao,
+    Servico.observacoes,
+    Servico.status,
+    Servico.valor,
+    Servico.valor_total,
+    Servico.veiculo_id,
+    Servico.mecanico_id,
+    Servico.criado_em,
+    Servico.atualizado_em,
+    Servico.data_previsao,
+    Servico.data_conclusao,
+)
+
+
+def consulta_servicos():
+    return db.session.query(*COLUNAS_SERVICO)
+
+
+COLUNAS_ORCAMENTO = (
+    Orcamento.id,
+    Orcamento.descricao,
+    Orcamento.valor,
+    Orcamento.servico_id,
+    Orcamento.criado_em,
+)
+
+
+def orcamentos_json(linhas):
+    resultado = []
+    for id_, descricao, valor, servico_id, criado_em in linhas:
+        valor = float(valor)
+        resultado.append(
+            {
+                "id": id_,
+                "descricao": descricao,
+                "valor": valor,
+                "valor_total": valor,
+                "servico_id": servico_id,
+                "criado_em": criado_em,
+            }
+        )
+    return resultado
+
+
+def orcamentos_por_servico(servico_ids):
+    """Orçamentos dos serviços informados, agrupados por serviço (1 consulta)"""
+    grupos = defaultdict(list)
+    if not servico_ids:
+        return grupos
+    linhas = (
+        db.session.query(*COLUNAS_ORCAMENTO)
+        .filter(Orcamento.servico_id.in_(servico_ids))
+        .order_by(Orcamento.id)
+    )
+    for dados in orcamentos_json(linhas):
+        grupos[dados["servico_id"]].append(dados)
+    return grupos
+
+
+def servicos_json(linhas, include_orcamentos=True):
+    """Serviços no formato de ``Servico.to_dict``
+
+    Com ``include_orcamentos`` os orçamentos da página são buscados em uma
+    única consulta adicional.
+    """
+    linhas = list(linhas)
+    orcamentos = {}
+    if include_orcamentos:
+        orcamentos = orcamentos_por_servico([s.id for s in linhas])
+
+    resultado = []
+    # Desempacotar a tupla é bem mais barato que acessar atributos da Row
+    for (
+        id_,
+        descricao,
+        observacoes,
+        status,
+        valor,
+        valor_total,
+        veiculo_id,
+        mecanico_id,
+        criado_em,
+        atualizado_em,
+        data_previsao,
+        data_conclusao,
+    ) in linhas:
+        dados = {
+            "id": id_,
+            "descricao": descricao,
+            "observacoes": observacoes,
+            "status": status.value,
+            "valor": float(valor) if valor else None,
+            "valor_total": float(valor_total),
+            "veiculo_id": veiculo_id,
+            "mecanico_id": mecanico_id,
+            "criado_em": criado_em,
+            "atualizado_em": atualizado_em,
+            "data_previsao": data_previsao,
+            "data_conclusao": data_conclusao,
+        }
+        if include_orcamentos:
+            dados["orcamentos"] = orcamentos.get(id_, [])
+        resultado.append(dados)
+    return resultado
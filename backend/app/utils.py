@@ -1,17 +1,171 @@
 from datetime import datetime, timedelta
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 import jwt
 from functools import wraps
 from flask import request, jsonify, current_app
 
 
-def gerar_token(usuario_id, tipo_usuario):
-    """Gera um token JWT para o usuário"""
+class RegistroTokens:
+    """Cache LRU de payloads já verificados e registro de tokens revogados
+
+    O cache evita repetir a verificação da assinatura a cada requisição com o
+    mesmo token; cada entrada expira junto com o ``exp`` do token.
+
+    As revogações ficam no processo e, se informado, em um armazenamento
+    ``compartilhado`` (backend de cache com ``get``/``set``) que todos os
+    workers consultam antes de aceitar um payload, inclusive os já em cache.
+    Uma consulta sem revogação vale por ``ttl_revogacao`` segundos para o
+    mesmo token: uma revogação feita em outro processo leva até esse tempo
+    para valer aqui (as do próprio processo valem de imediato).
+    """
+
+    def __init__(self, max_itens=4096, compartilhado=None, validade=3600, ttl_revogacao=5):
+        self.max_itens = max_itens
+        self.compartilhado = compartilhado
+        self.validade = validade  # duração máxima de um token, em segundos
+        self.ttl_revogacao = ttl_revogacao
+        self._payloads = OrderedDict()
+        self._revogados = {}  # digest -> exp
+        self._revogados_usuario = {}  # usuario_id -> instante da revogação
+        # digest -> (válido até, revogação do usuário no compartilhado)
+        self._conferidos = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(token):
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def obter(self, digest):
+        with self._lock:
+            payload = self._payloads.get(digest)
+            if payload is None:
+                return None
+            if payload["exp"] <= time.time():
+                del self._payloads[digest]
+                return None
+            self._payloads.move_to_end(digest)
+            return payload
+
+    def guardar(self, digest, payload):
+        if self.max_itens <= 0:
+            return
+        with self._lock:
+            self._payloads[digest] = payload
+            self._payloads.move_to_end(digest)
+            while len(self._payloads) > self.max_itens:
+                self._payloads.popitem(last=False)
+
+    def revogado(self, digest, payload):
+        usuario_id = payload["usuario_id"]
+        agora = time.time()
+        with self._lock:
+            if digest in self._revogados:
+                return True
+            revogado_em = self._revogados_usuario.get(usuario_id) or 0
+            conferido = self._conferidos.get(digest)
+        if self.compartilhado is not None:
+            if conferido is not None and conferido[0] > agora:
+                revogado_em = max(revogado_em, conferido[1])
+            else:
+                if self.compartilhado.get(f"token:revogado:{digest}"):
+                    return True
+                do_usuario = self.compartilhado.get(f"token:usuario:{usuario_id}") or 0
+                self._conferir(digest, agora + self.ttl_revogacao, do_usuario)
+                revogado_em = max(revogado_em, do_usuario)
+        return bool(revogado_em) and payload["iat"] < revogado_em
+
+    def _conferir(self, digest, ate, revogado_em):
+        """Guarda o resultado da consulta ao compartilhado até ``ate``"""
+        if self.ttl_revogacao <= 0 or self.max_itens <= 0:
+            return
+        with self._lock:
+            self._conferidos[digest] = (ate, revogado_em)
+            self._conferidos.move_to_end(digest)
+            while len(self._conferidos) > self.max_itens:
+                self._conferidos.popitem(last=False)
+
+    def revogar(self, digest, exp):
+        agora = time.time()
+        with self._lock:
+            self._payloads.pop(digest, None)
+            # Tokens já expirados são recusados pelo jwt.decode de qualquer forma
+            for chave in [c for c, e in self._revogados.items() if e <= agora]:
+                del self._revogados[chave]
+            self._revogados[digest] = exp
+        if self.compartilhado is not None and exp > agora:
+            self.compartilhado.set(f"token:revogado:{digest}", True, exp - agora)
+
+    def revogar_usuario(self, usuario_id):
+        agora = time.time()
+        if self.compartilhado is not None:
+            # Tokens emitidos antes da revogação expiram em até ``validade``
+            self.compartilhado.set(f"token:usuario:{usuario_id}", agora, self.validade)
+        with self._lock:
+            self._revogados_usuario[usuario_id] = agora
+            for chave in [
+                c for c, p in self._payloads.items() if p["usuario_id"] == usuario_id
+            ]:
+                del self._payloads[chave]
+
+
+def registro_tokens():
+    """Registro de tokens da aplicação atual (criado sob demanda)
+
+    Com um backend de cache compartilhado entre processos (``DASHBOARD_CACHE=sqlite``),
+    as revogações passam a valer para todos os workers, em até
+    ``JWT_REVOGACAO_TTL`` segundos.
+    """
+    registro = current_app.extensions.get("registro_tokens")
+    if registro is None:
+        backend = current_app.extensions.get("cache_dashboard")
+        registro = current_app.extensions.setdefault(
+            "registro_tokens",
+            RegistroTokens(
+                current_app.config.get("JWT_CACHE_MAX", 4096),
+                compartilhado=backend if getattr(backend, "compartilhado", False) else None,
+                validade=current_app.config.get("JWT_ACCESS_TOKEN_EXPIRES", 3600),
+                ttl_revogacao=current_app.config.get("JWT_REVOGACAO_TTL", 5),
+            ),
+        )
+    return registro
+
+
+def revogar_token(token):
+    """Revoga um token (logout); recusado a partir da próxima requisição"""
+    payload = decodificar_token(token)
+    if payload:
+        registro_tokens().revogar(RegistroTokens.digest(token), payload["exp"])
+
+
+def revogar_tokens_usuario(usuario_id):
+    """Revoga todos os tokens emitidos até agora para o usuário
+
+    Usado quando o tipo do usuário muda ou ele é removido, já que o tipo vai
+    dentro do token.
+    """
+    registro_tokens().revogar_usuario(usuario_id)
+
+
+def gerar_token(usuario_id, tipo_usuario, finalidade=None, validade=None):
+    """Gera um token JWT para o usuário
+
+    Com ``finalidade``, o token só vale onde ela é exigida (ex. o ticket de
+    ``/api/eventos``) e não como token da API.
+    """
+    if validade is None:
+        validade = current_app.config.get("JWT_ACCESS_TOKEN_EXPIRES", 3600)
     payload = {
         "usuario_id": usuario_id,
         "tipo": tipo_usuario,
-        "exp": datetime.utcnow() + timedelta(hours=1),
-        "iat": datetime.utcnow(),
+        "exp": datetime.utcnow() + timedelta(seconds=validade),
+        # Com fração de segundo, para comparar com o instante de uma revogação
+        "iat": time.time(),
     }
+    if finalidade is not None:
+        payload["finalidade"] = finalidade
     token = jwt.encode(payload, current_app.config["JWT_SECRET_KEY"], algorithm="HS256")
     return token
 
@@ -29,6 +183,29 @@ def decodificar_token(token):
         return None
 
 
+def validar_token(token, finalidade=None):
+    """Payload de um token válido e não revogado
+
+    Retorna ``(payload, None)`` ou ``(None, mensagem de erro)``. Reaproveita
+    as verificações anteriores do mesmo token (ver ``RegistroTokens``). A
+    ``finalidade`` do token precisa ser a pedida (None: token da API).
+    """
+    registro = registro_tokens()
+    digest = RegistroTokens.digest(token)
+    payload = registro.obter(digest)
+    if payload is None:
+        payload = decodificar_token(token)
+        if not payload:
+            return None, "Token inválido ou expirado"
+        registro.guardar(digest, payload)
+
+    if payload.get("finalidade") != finalidade:
+        return None, "Token inválido ou expirado"
+    if registro.revogado(digest, payload):
+        return None, "Token revogado"
+    return payload, None
+
+
 def token_required(f):
     """Decorator para proteger rotas que requerem autenticação"""
 
@@ -47,10 +224,9 @@ def token_required(f):
         if not token:
             return jsonify({"message": "Token não fornecido"}), 401
 
-        # Decodificar token
-        payload = decodificar_token(token)
-        if not payload:
-            return jsonify({"message": "Token inválido ou expirado"}), 401
+        payload, erro = validar_token(token)
+        if erro:
+            return jsonify({"message": erro}), 401
 
         # Adicionar dados do usuário ao request
         request.usuario_id = payload["usuario_id"]
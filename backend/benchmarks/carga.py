@@ -0,0 +1,540 @@
+"""Teste de carga com perfis de uso reais contra uma instância em execução
+
+Cada usuário virtual faz login em ``/auth/login``, guarda o token e repete as
+ações do seu perfil, com uma pausa aleatória entre elas (``--pausa``, média em
+segundos):
+
+* cliente: consulta o dashboard, os seus serviços e veículos;
+* mecânico: lista os serviços atribuídos a ele e atualiza o status de um;
+* gerente: percorre a listagem de serviços pelo cursor, o dashboard, os
+  usuários e os veículos.
+
+O cliente HTTP é um HTTP/1.1 mínimo sobre ``asyncio.open_connection``
+(keep-alive, ``Content-Length`` ou ``chunked``): só biblioteca padrão, sem
+rede externa. Ao final, imprime a vazão, os percentis e um histograma de
+latência por ação, e a taxa de erros (status >= 400 e falhas de conexão).
+
+As contas são as da oficina sintética do seed.py (``cliente<i>@email.com``,
+``mecanico<i>@oficina.com``, ``gerente@oficina.com``, senha ``senha123``).
+
+Uso (a partir de backend/):
+    # stack do docker-compose (Nginx na porta 80), depois de gerar a massa:
+    #   docker compose exec backend python seed.py --clientes 2000 --servicos 50000
+    python benchmarks/carga.py --url http://localhost --clientes 2000 --usuarios 100
+
+    # aplicação local: gera a massa e sobe o Gunicorn em um SQLite temporário
+    python benchmarks/carga.py --local --workers 3 --usuarios 50 --duracao 30
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote, urlsplit
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+SENHA = "senha123"
+# Limites superiores dos buckets do histograma, em ms
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+MIX_PADRAO = "cliente=70,mecanico=20,gerente=10"
+
+
+# ============= Cliente HTTP =============
+
+
+class ErroConexao(Exception):
+    pass
+
+
+class ConexaoHTTP:
+    """Uma conexão HTTP/1.1 keep-alive, reaberta quando o servidor a fecha"""
+
+    def __init__(self, url, timeout=30):
+        partes = urlsplit(url)
+        self.ssl = partes.scheme == "https"
+        self.host = partes.hostname
+        self.porta = partes.port or (443 if self.ssl else 80)
+        self.cabecalho_host = partes.netloc
+        self.timeout = timeout
+        self.leitor = self.escritor = None
+
+    async def _abrir(self):
+        self.leitor, self.escritor = await asyncio.open_connection(
+            self.host, self.porta, ssl=self.ssl or None
+        )
+
+    def fechar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+        self.leitor = self.escritor = None
+
+    async def requisitar(self, metodo, caminho, dados=None, token=None):
+        """Envia a requisição e devolve ``(status, corpo)``; ``dados`` vai como JSON"""
+        corpo = json.dumps(dados).encode() if dados is not None else b""
+        linhas = [
+            f"{metodo} {caminho} HTTP/1.1",
+            f"Host: {self.cabecalho_host}",
+            "Accept: application/json",
+            f"Content-Length: {len(corpo)}",
+        ]
+        if dados is not None:
+            linhas.append("Content-Type: application/json")
+        if token:
+            linhas.append(f"Authorization: Bearer {token}")
+        pedido = ("\r\n".join(linhas) + "\r\n\r\n").encode() + corpo
+
+        for tentativa in (1, 2):
+            nova = self.escritor is None
+            try:
+                if nova:
+                    await self._abrir()
+                return await asyncio.wait_for(self._trocar(pedido, metodo), self.timeout)
+            except asyncio.TimeoutError as e:
+                self.fechar()
+                raise ErroConexao("timeout") from e
+            except (OSError, asyncio.IncompleteReadError, ErroConexao) as e:
+                self.fechar()
+                # Conexão keep-alive fechada pelo servidor entre requisições (ex.:
+                # worker reciclado): repete uma vez em uma conexão nova
+                if nova or tentativa == 2:
+                    raise ErroConexao(str(e) or type(e).__name__) from e
+
+    async def _trocar(self, pedido, metodo):
+        self.escritor.write(pedido)
+        await self.escritor.drain()
+
+        linha = await self.leitor.readline()
+        if not linha:
+            raise ErroConexao("conexão fechada")
+        versao, status = linha.decode("latin-1").split(" ", 2)[:2]
+        cabecalhos = {}
+        while True:
+            linha = await self.leitor.readline()
+            if linha in (b"\r\n", b"\n", b""):
+                break
+            nome, _, valor = linha.decode("latin-1").partition(":")
+            cabecalhos[nome.strip().lower()] = valor.strip()
+
+        status = int(status)
+        if metodo == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            corpo = b""
+        elif cabecalhos.get("transfer-encoding", "").lower() == "chunked":
+            corpo = await self._ler_chunked()
+        elif "content-length" in cabecalhos:
+            corpo = await self.leitor.readexactly(int(cabecalhos["content-length"]))
+        else:
+            corpo = await self.leitor.read()
+            cabecalhos["connection"] = "close"
+
+        conexao = cabecalhos.get("connection", "").lower()
+        if conexao == "close" or (versao == "HTTP/1.0" and conexao != "keep-alive"):
+            self.fechar()
+        return status, corpo
+
+    async def _ler_chunked(self):
+        partes = []
+        while True:
+            tamanho = int((await self.leitor.readline()).split(b";")[0], 16)
+            if tamanho == 0:
+                while (await self.leitor.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(partes)
+            partes.append(await self.leitor.readexactly(tamanho))
+            await self.leitor.readexactly(2)
+
+
+# ============= Estatísticas =============
+
+
+class Estatisticas:
+    """Latências e erros por ação (``perfil ação``)"""
+
+    def __init__(self):
+        self.latencias = {}
+        self.erros = {}
+
+    def registrar(self, acao, duracao, erro=None):
+        self.latencias.setdefault(acao, []).append(duracao * 1000)
+        if erro is not None:
+            self.erros.setdefault(acao, {})
+            self.erros[acao][erro] = self.erros[acao].get(erro, 0) + 1
+
+    def total(self):
+        return sum(len(valores) for valores in self.latencias.values())
+
+    def total_erros(self):
+        return sum(sum(por_tipo.values()) for por_tipo in self.erros.values())
+
+    def resumo(self, duracao):
+        """Dicionário serializável com vazão, percentis, histograma e erros"""
+        acoes = {}
+        for acao, valores in sorted(self.latencias.items()):
+            erros = sum(self.erros.get(acao, {}).values())
+            acoes[acao] = {
+                "requisicoes": len(valores),
+                "req_s": round(len(valores) / duracao, 2),
+                "erros": erros,
+                "taxa_erros": round(erros / len(valores), 4),
+                "por_erro": {str(k): v for k, v in self.erros.get(acao, {}).items()},
+                **percentis(valores),
+                "histograma_ms": histograma(valores),
+            }
+        total = self.total()
+        return {
+            "duracao_s": round(duracao, 2),
+            "requisicoes": total,
+            "req_s": round(total / duracao, 2) if duracao else 0,
+            "erros": self.total_erros(),
+            "taxa_erros": round(self.total_erros() / total, 4) if total else 0,
+            **percentis([v for valores in self.latencias.values() for v in valores]),
+            "acoes": acoes,
+        }
+
+
+def percentis(valores):
+    if not valores:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    if len(valores) == 1:
+        cortes = valores * 99
+    else:
+        cortes = statistics.quantiles(valores, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cortes[49], 2),
+        "p95_ms": round(cortes[94], 2),
+        "p99_ms": round(cortes[98], 2),
+    }
+
+
+def histograma(valores):
+    """Contagem por bucket (não acumulada), com a chave ``+Inf`` no fim"""
+    contagens = dict.fromkeys([str(limite) for limite in BUCKETS_MS] + ["+Inf"], 0)
+    for valor in valores:
+        chave = next((str(limite) for limite in BUCKETS_MS if valor <= limite), "+Inf")
+        contagens[chave] += 1
+    return contagens
+
+
+# ============= Usuários virtuais =============
+
+
+class UsuarioVirtual:
+    """Um usuário logado do perfil, com a sua conexão e o seu estado"""
+
+    def __init__(self, perfil, email, url, estatisticas, rnd):
+        self.perfil = perfil
+        self.email = email
+        self.http = ConexaoHTTP(url)
+        self.estatisticas = estatisticas
+        self.rnd = rnd
+        self.token = None
+        self.servicos = []  # mecânico: ids dos serviços atribuídos
+        self.cursor = None  # gerente: posição na listagem de serviços
+        self.paginas = 0
+
+    async def chamar(self, acao, metodo, caminho, dados=None):
+        """Executa e registra uma requisição; devolve o JSON da resposta ou None"""
+        inicio = time.perf_counter()
+        try:
+            status, corpo = await self.http.requisitar(metodo, caminho, dados, self.token)
+        except ErroConexao:
+            self.estatisticas.registrar(
+                f"{self.perfil} {acao}", time.perf_counter() - inicio, "conexao"
+            )
+            return None
+        duracao = time.perf_counter() - inicio
+
+        if status >= 400:
+            self.estatisticas.registrar(f"{self.perfil} {acao}", duracao, status)
+            if status == 401:
+                self.token = None  # expirado ou revogado: novo login na próxima ação
+            return None
+        self.estatisticas.registrar(f"{self.perfil} {acao}", duracao)
+        try:
+            return json.loads(corpo) if corpo else {}
+        except ValueError:
+            return {}
+
+    async def login(self):
+        self.token = None
+        resposta = await self.chamar(
+            "login", "POST", "/auth/login", {"email": self.email, "senha": SENHA}
+        )
+        if resposta:
+            self.token = resposta.get("token")
+
+    # ----- cliente -----
+
+    async def cliente_dashboard(self):
+        await self.chamar("dashboard", "GET", "/api/dashboard")
+
+    async def cliente_servicos(self):
+        await self.chamar("servicos", "GET", "/api/servicos?limit=20")
+
+    async def cliente_veiculos(self):
+        await self.chamar("veiculos", "GET", "/api/veiculos")
+
+    # ----- mecânico -----
+
+    async def mecanico_servicos(self):
+        resposta = await self.chamar("servicos", "GET", "/api/servicos?limit=50")
+        if resposta:
+            self.servicos = [servico["id"] for servico in resposta.get("servicos", [])]
+
+    async def mecanico_status(self):
+        if not self.servicos:
+            await self.mecanico_servicos()
+            return
+        servico_id = self.rnd.choice(self.servicos)
+        status = self.rnd.choice(("em_andamento", "concluido"))
+        await self.chamar(
+            "atualizar status", "PUT", f"/api/servicos/{servico_id}", {"status": status}
+        )
+
+    # ----- gerente -----
+
+    async def gerente_servicos(self):
+        # Avança até 10 páginas e volta ao início, como quem rola a listagem
+        caminho = "/api/servicos?limit=50"
+        if self.cursor and self.paginas < 10:
+            caminho += f"&after={quote(self.cursor)}"
+            self.paginas += 1
+        else:
+            self.paginas = 0
+        resposta = await self.chamar("servicos", "GET", caminho)
+        if resposta:
+            self.cursor = resposta.get("proximo_cursor")
+
+    async def gerente_dashboard(self):
+        await self.chamar("dashboard", "GET", "/api/dashboard")
+
+    async def gerente_usuarios(self):
+        await self.chamar("usuarios", "GET", "/api/usuarios?limit=50")
+
+    async def gerente_veiculos(self):
+        await self.chamar("veiculos", "GET", "/api/veiculos?limit=50")
+
+
+# Ações de cada perfil com os seus pesos
+ACOES = {
+    "cliente": (
+        (6, UsuarioVirtual.cliente_dashboard),
+        (3, UsuarioVirtual.cliente_servicos),
+        (1, UsuarioVirtual.cliente_veiculos),
+    ),
+    "mecanico": (
+        (5, UsuarioVirtual.mecanico_servicos),
+        (3, UsuarioVirtual.mecanico_status),
+    ),
+    "gerente": (
+        (5, UsuarioVirtual.gerente_servicos),
+        (3, UsuarioVirtual.gerente_dashboard),
+        (1, UsuarioVirtual.gerente_usuarios),
+        (1, UsuarioVirtual.gerente_veiculos),
+    ),
+}
+
+
+def ler_mix(texto):
+    """``"cliente=70,mecanico=20"`` -> {"cliente": 70, "mecanico": 20}"""
+    mix = {}
+    for parte in texto.split(","):
+        perfil, _, peso = parte.partition("=")
+        perfil = perfil.strip()
+        if perfil not in ACOES or not peso.strip().isdigit():
+            raise ValueError(f"Mix inválido: {parte!r} (perfis: {', '.join(ACOES)})")
+        mix[perfil] = int(peso)
+    if not sum(mix.values()):
+        raise ValueError("Mix sem nenhum perfil")
+    return mix
+
+
+def criar_usuarios(quantidade, mix, clientes, mecanicos, url, estatisticas, semente):
+    """Distribui os usuários virtuais pelos perfis, na proporção do mix"""
+    rnd = random.Random(semente)
+    perfis = rnd.choices(list(mix), weights=list(mix.values()), k=quantidade)
+    usuarios = []
+    for perfil in perfis:
+        if perfil == "cliente":
+            email = f"cliente{rnd.randint(1, clientes)}@email.com"
+        elif perfil == "mecanico":
+            email = f"mecanico{rnd.randint(1, mecanicos)}@oficina.com"
+        else:
+            email = "gerente@oficina.com"
+        usuarios.append(
+            UsuarioVirtual(perfil, email, url, estatisticas, random.Random(rnd.random()))
+        )
+    return usuarios
+
+
+async def simular(usuario, inicio, fim, pausa):
+    await asyncio.sleep(max(inicio - time.monotonic(), 0))
+    pesos, acoes = zip(*ACOES[usuario.perfil])
+    try:
+        while time.monotonic() < fim:
+            if usuario.token is None:
+                await usuario.login()
+                if usuario.token is None:
+                    await asyncio.sleep(pausa)
+                    continue
+            else:
+                acao = usuario.rnd.choices(acoes, weights=pesos)[0]
+                await acao(usuario)
+            if pausa:
+                await asyncio.sleep(min(usuario.rnd.expovariate(1 / pausa), fim - time.monotonic()))
+    finally:
+        usuario.http.fechar()
+
+
+async def executar(usuarios, estatisticas, duracao, pausa=1.0, rampa=0.0):
+    """Roda os usuários virtuais por ``duracao`` segundos e devolve o resumo
+
+    Os usuários entram espaçados ao longo de ``rampa`` segundos.
+    """
+    agora = time.monotonic()
+    fim = agora + rampa + duracao
+    passo = rampa / len(usuarios) if usuarios else 0
+    await asyncio.gather(
+        *(simular(u, agora + i * passo, fim, pausa) for i, u in enumerate(usuarios))
+    )
+    return estatisticas.resumo(time.monotonic() - agora)
+
+
+# ============= Saída =============
+
+
+def imprimir(resumo):
+    print(
+        f"{resumo['requisicoes']} requisições em {resumo['duracao_s']:.1f} s: "
+        f"{resumo['req_s']:.1f} req/s, erros {resumo['taxa_erros']:.2%} "
+        f"(p50 {resumo['p50_ms']} ms, p95 {resumo['p95_ms']} ms, p99 {resumo['p99_ms']} ms)"
+    )
+    print()
+    print(f"{'ação':<28}{'req':>8}{'req/s':>9}{'erros':>8}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for acao, dados in resumo["acoes"].items():
+        print(
+            f"{acao:<28}{dados['requisicoes']:>8}{dados['req_s']:>9.1f}"
+            f"{dados['taxa_erros']:>8.1%}{dados['p50_ms']:>9.1f}"
+            f"{dados['p95_ms']:>9.1f}{dados['p99_ms']:>9.1f}"
+        )
+        if dados["por_erro"]:
+            erros = ", ".join(f"{tipo}: {n}" for tipo, n in dados["por_erro"].items())
+            print(f"{'':<28}erros por tipo: {erros}")
+
+    print()
+    print("Histograma (ms, contagem por faixa)")
+    faixas = [f"<={limite}" for limite in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+    print(f"{'ação':<28}" + "".join(f"{faixa:>8}" for faixa in faixas))
+    for acao, dados in resumo["acoes"].items():
+        print(f"{acao:<28}" + "".join(f"{n:>8}" for n in dados["histograma_ms"].values()))
+
+
+# ============= Aplicação local =============
+
+
+def preparar_banco(caminho, clientes, mecanicos, servicos, semente):
+    from app import create_app
+    from app.models import db
+    from seed import gerar_massa
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{caminho}", "BCRYPT_LOG_ROUNDS": 4})
+    with app.app_context():
+        db.create_all()
+        gerar_massa(
+            db.session.connection(),
+            clientes=clientes,
+            mecanicos=mecanicos,
+            servicos=servicos,
+            semente=semente,
+        )
+        db.session.commit()
+        db.engine.dispose()
+
+
+def subir_local(args, diretorio):
+    """Gera a massa e sobe o Gunicorn (como em servidor_wsgi.py); devolve o processo"""
+    from benchmarks.servidor_wsgi import PORTA, aguardar_porta, comando_servidor
+
+    caminho = os.path.join(diretorio, "carga.db")
+    preparar_banco(caminho, args.clientes, args.mecanicos, args.servicos, args.semente)
+    ambiente = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{caminho}",
+        BCRYPT_LOG_ROUNDS="4",
+        DASHBOARD_CACHE="sqlite",
+        DASHBOARD_CACHE_PATH=os.path.join(diretorio, "cache.db"),
+    )
+    args.servidor = "gunicorn"
+    servidor = subprocess.Popen(
+        comando_servidor(args),
+        cwd=BACKEND,
+        env=ambiente,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    aguardar_porta()
+    args.url = f"http://127.0.0.1:{PORTA}"
+    return servidor
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost", help="Nginx do compose ou backend")
+    parser.add_argument("--local", action="store_true", help="gera a massa e sobe o Gunicorn")
+    parser.add_argument("--workers", type=int, default=3, help="workers do Gunicorn (--local)")
+    parser.add_argument("--usuarios", type=int, default=50, help="usuários virtuais")
+    parser.add_argument("--mix", default=MIX_PADRAO, help="pesos dos perfis")
+    parser.add_argument("--duracao", type=float, default=60, help="segundos de carga")
+    parser.add_argument("--rampa", type=float, default=5, help="segundos até todos entrarem")
+    parser.add_argument("--pausa", type=float, default=1.0, help="pausa média entre ações (s)")
+    parser.add_argument("--clientes", type=int, default=500, help="clientes da massa")
+    parser.add_argument("--mecanicos", type=int, default=10, help="mecânicos da massa")
+    parser.add_argument("--servicos", type=int, default=20000, help="serviços da massa (--local)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--json", help="grava o resumo neste arquivo")
+    args = parser.parse_args(argumentos)
+    try:
+        mix = ler_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        servidor = subir_local(args, diretorio) if args.local else None
+        try:
+            estatisticas = Estatisticas()
+            usuarios = criar_usuarios(
+                args.usuarios,
+                mix,
+                args.clientes,
+                args.mecanicos,
+                args.url,
+                estatisticas,
+                args.semente,
+            )
+            print(
+                f"{args.usuarios} usuários ({args.mix}) contra {args.url} por {args.duracao:.0f} s, "
+                f"pausa média {args.pausa} s"
+            )
+            resumo = asyncio.run(
+                executar(usuarios, estatisticas, args.duracao, args.pausa, args.rampa)
+            )
+        finally:
+            if servidor is not None:
+                servidor.terminate()
+                servidor.wait()
+
+    imprimir(resumo)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump(resumo, arquivo, indent=2, ensure_ascii=False)
+    return 1 if resumo["requisicoes"] == 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,635 @@
+"""Latência (p50/p95/p99) e consultas SQL de cada rota, com baseline e limite de regressão
+
+Gera a oficina sintética de seed.py em um SQLite temporário, cria a aplicação
+com ``create_app`` e chama cada rota dos blueprints ``auth``, ``veiculos``,
+``servicos``, ``usuarios``, ``dashboard`` e ``views`` pelo cliente de teste do
+Flask. Só a chamada ao cliente é cronometrada: a preparação de cada rodada
+(token novo para o logout, veículo a excluir, sessão do painel) fica de fora.
+
+Cada rota é medida com o perfil que a usa no dia a dia (o dashboard, com os
+três). O bcrypt roda com ``BCRYPT_LOG_ROUNDS=4`` e o cache do dashboard fica
+desligado, para que os números reflitam o código e as consultas, não o custo
+do hash nem um acerto de cache.
+
+A baseline (``baseline_endpoints.json``) guarda, por rota, os percentis e o
+número máximo de consultas. Uma rota regride quando o percentil escolhido
+(``--percentil``, p50 por padrão) passa de ``baseline * --limite +
+--folga-ms`` ou quando faz mais consultas que na baseline. Com poucas dezenas
+de amostras o p95 oscila muito em máquinas compartilhadas; a mediana é o
+critério padrão, e o limite padrão (2x) absorve a variação de uma máquina de
+1 vCPU entre execuções. O número de consultas não varia e é comparado
+exatamente. Os tempos dependem da máquina: grave a baseline onde a
+comparação vai rodar.
+
+Uso (a partir de backend/):
+    python benchmarks/endpoints.py --salvar      # mede e grava a baseline
+    python benchmarks/endpoints.py               # mede e compara (sai com 1 se regrediu)
+    python benchmarks/endpoints.py --rota servicos.listar_servicos
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from sqlalchemy import event  # noqa: E402
+from app import create_app  # noqa: E402
+from app.models import db, Usuario, Veiculo, Servico, Orcamento, TipoUsuario  # noqa: E402
+from app.utils import gerar_token  # noqa: E402
+from seed import gerar_massa  # noqa: E402
+
+BLUEPRINTS_MEDIDOS = ("auth", "veiculos", "servicos", "usuarios", "dashboard", "views")
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_endpoints.json")
+SENHA = "senha123"
+
+# (endpoint, método, perfil) -> (função de preparo, status esperado)
+CENARIOS = {}
+
+
+def cenario(endpoint, metodo="GET", perfil="gerente", status=None):
+    """Registra o preparo de uma rota
+
+    A função recebe o contexto e o número da rodada e devolve o caminho e os
+    argumentos extras de ``client.open`` (json, data, headers). ``status``
+    fixa o código esperado; sem ele, qualquer código abaixo de 400 serve.
+    """
+
+    def registrar(funcao):
+        CENARIOS[(endpoint, metodo, perfil)] = (funcao, status)
+        return funcao
+
+    return registrar
+
+
+def nome_cenario(chave):
+    endpoint, metodo, perfil = chave
+    return f"{endpoint} {metodo} ({perfil})"
+
+
+class Contexto:
+    """Ids da massa usados pelas rotas e atalhos para criar registros descartáveis"""
+
+    def __init__(self, mecanicos, clientes):
+        self.mecanico = 1
+        self.cliente = mecanicos + 1
+        self.gerente = mecanicos + clientes + 1
+        self.emails = {
+            "cliente": "cliente1@email.com",
+            "mecanico": "mecanico1@oficina.com",
+            "gerente": "gerente@oficina.com",
+        }
+        self.ids = {"cliente": self.cliente, "mecanico": self.mecanico, "gerente": self.gerente}
+
+        # Serviço do cliente atribuído ao mecânico, com um orçamento
+        self.veiculo = (
+            Veiculo.query.filter_by(usuario_id=self.cliente).order_by(Veiculo.id).first().id
+        )
+        servico = Servico(
+            veiculo_id=self.veiculo, descricao="Revisão dos freios", mecanico_id=self.mecanico
+        )
+        db.session.add(servico)
+        db.session.flush()
+        orcamento = Orcamento(servico_id=servico.id, descricao="Pastilhas", valor=320)
+        db.session.add(orcamento)
+        db.session.commit()
+        self.servico, self.orcamento = servico.id, orcamento.id
+
+    def headers(self, perfil):
+        token = gerar_token(self.ids[perfil], perfil)
+        return {"Authorization": f"Bearer {token}"}
+
+    def sessao(self, perfil):
+        return {
+            "user_id": self.ids[perfil],
+            "nome": perfil.title(),
+            "email": self.emails[perfil],
+            "tipo_usuario": perfil,
+        }
+
+    def veiculo_descartavel(self, i):
+        veiculo = Veiculo(
+            placa=f"DEL{i:05d}", marca="Fiat", modelo="Uno", ano=2010, usuario_id=self.cliente
+        )
+        db.session.add(veiculo)
+        db.session.commit()
+        return veiculo.id
+
+
+# ============= auth =============
+
+
+@cenario("auth.registro", "POST", "anonimo")
+def _(ctx, i):
+    dados = {"nome": "Novo Cliente", "email": f"novo{i}@email.com", "senha": SENHA}
+    return "/auth/registro", {"json": dict(dados, tipo="cliente")}
+
+
+@cenario("auth.login", "POST", "anonimo")
+def _(ctx, i):
+    return "/auth/login", {"json": {"email": ctx.emails["cliente"], "senha": SENHA}}
+
+
+@cenario("auth.logout", "POST", "cliente")
+def _(ctx, i):
+    # O logout revoga o token: cada rodada usa um novo
+    return "/auth/logout", {"headers": ctx.headers("cliente")}
+
+
+@cenario("auth.perfil", "GET", "cliente")
+def _(ctx, i):
+    return "/auth/perfil", {}
+
+
+# ============= dashboard =============
+
+
+for _perfil in ("cliente", "mecanico", "gerente"):
+    cenario("dashboard.dashboard", "GET", _perfil)(lambda ctx, i: ("/api/dashboard", {}))
+    cenario("views.dashboard", "GET", _perfil)(lambda ctx, i: ("/dashboard", {}))
+
+
+# ============= veiculos =============
+
+
+@cenario("veiculos.listar_veiculos", "GET", "gerente")
+def _(ctx, i):
+    return "/api/veiculos?limit=50", {}
+
+
+@cenario("veiculos.obter_veiculo", "GET", "cliente")
+def _(ctx, i):
+    return f"/api/veiculos/{ctx.veiculo}", {}
+
+
+@cenario("veiculos.criar_veiculo", "POST", "cliente", status=201)
+def _(ctx, i):
+    dados = {"placa": f"API{i:05d}", "modelo": "Onix", "marca": "Chevrolet", "ano": 2021}
+    return "/api/veiculos", {"json": dados}
+
+
+@cenario("veiculos.importar_veiculos_em_lote", "POST", "cliente", status=201)
+def _(ctx, i):
+    lote = [
+        {"placa": f"LOT{i:05d}{j}", "modelo": "HB20", "marca": "Hyundai", "ano": 2019}
+        for j in range(10)
+    ]
+    return "/api/veiculos/bulk", {"json": lote}
+
+
+@cenario("veiculos.atualizar_veiculo", "PUT", "cliente", status=200)
+def _(ctx, i):
+    return f"/api/veiculos/{ctx.veiculo}", {"json": {"cor": ("Prata", "Preto")[i % 2]}}
+
+
+@cenario("veiculos.deletar_veiculo", "DELETE", "cliente", status=200)
+def _(ctx, i):
+    return f"/api/veiculos/{ctx.veiculo_descartavel(i)}", {}
+
+
+# ============= servicos =============
+
+
+@cenario("servicos.listar_servicos", "GET", "gerente")
+def _(ctx, i):
+    return "/api/servicos?limit=50", {}
+
+
+@cenario("servicos.obter_servico", "GET", "cliente")
+def _(ctx, i):
+    return f"/api/servicos/{ctx.servico}", {}
+
+
+@cenario("servicos.criar_servico", "POST", "cliente", status=201)
+def _(ctx, i):
+    return "/api/servicos", {"json": {"descricao": "Troca de óleo", "veiculo_id": ctx.veiculo}}
+
+
+@cenario("servicos.atualizar_servico", "PUT", "mecanico", status=200)
+def _(ctx, i):
+    status = ("em_andamento", "orcamento_aprovado")[i % 2]
+    return f"/api/servicos/{ctx.servico}", {"json": {"status": status}}
+
+
+@cenario("servicos.atualizar_servicos_em_lote", "POST", "gerente")
+def _(ctx, i):
+    status = ("em_andamento", "concluido")[i % 2]
+    lote = [{"id": servico_id, "status": status} for servico_id in range(1, 21)]
+    return "/api/servicos/batch", {"json": lote}
+
+
+@cenario("servicos.criar_orcamento", "POST", "gerente", status=201)
+def _(ctx, i):
+    dados = {"descricao": "Discos de freio", "valor": 450.0}
+    return f"/api/servicos/{ctx.servico}/orcamento", {"json": dados}
+
+
+# ============= usuarios =============
+
+
+@cenario("usuarios.listar_usuarios", "GET", "gerente")
+def _(ctx, i):
+    return "/api/usuarios", {}
+
+
+@cenario("usuarios.obter_usuario", "GET", "gerente")
+def _(ctx, i):
+    return f"/api/usuarios/{ctx.cliente}", {}
+
+
+@cenario("usuarios.atualizar_usuario", "PUT", "cliente", status=200)
+def _(ctx, i):
+    return f"/api/usuarios/{ctx.cliente}", {"json": {"nome": f"Cliente {i}"}}
+
+
+@cenario("usuarios.deletar_usuario", "DELETE", "gerente", status=200)
+def _(ctx, i):
+    usuario = Usuario(
+        nome="Descartável", email=f"descartavel{i}@email.com", tipo=TipoUsuario.CLIENTE
+    )
+    usuario.senha_hash = db.session.get(Usuario, ctx.cliente).senha_hash
+    db.session.add(usuario)
+    db.session.commit()
+    return f"/api/usuarios/{usuario.id}", {}
+
+
+# ============= views =============
+
+
+@cenario("views.landing", "GET", "anonimo")
+def _(ctx, i):
+    return "/", {}
+
+
+@cenario("views.login", "GET", "anonimo")
+def _(ctx, i):
+    return "/login", {}
+
+
+@cenario("views.login", "POST", "anonimo", status=302)
+def _(ctx, i):
+    return "/login", {"data": {"email": ctx.emails["cliente"], "senha": SENHA}}
+
+
+@cenario("views.logout", "GET", "cliente", status=302)
+def _(ctx, i):
+    return "/logout", {}
+
+
+@cenario("views.register", "GET", "anonimo")
+def _(ctx, i):
+    return "/register", {}
+
+
+@cenario("views.register", "POST", "anonimo", status=302)
+def _(ctx, i):
+    dados = {
+        "nome": "Cliente Novo",
+        "email": f"cadastro{i}@email.com",
+        "telefone": "61988887777",
+        "senha": SENHA,
+        "senha_confirm": SENHA,
+    }
+    return "/register", {"data": dados}
+
+
+@cenario("views.veiculos_list", "GET", "gerente")
+def _(ctx, i):
+    return "/veiculos", {}
+
+
+@cenario("views.veiculo_create", "GET", "cliente")
+def _(ctx, i):
+    return "/veiculos/novo", {}
+
+
+@cenario("views.veiculo_create", "POST", "cliente", status=302)
+def _(ctx, i):
+    dados = {
+        "placa": f"WEB{i:05d}",
+        "marca": "Fiat",
+        "modelo": "Argo",
+        "ano": "2022",
+        "cor": "Azul",
+    }
+    return "/veiculos/novo", {"data": dados}
+
+
+@cenario("views.veiculo_detail", "GET", "cliente")
+def _(ctx, i):
+    return f"/veiculos/{ctx.veiculo}", {}
+
+
+@cenario("views.veiculo_edit", "GET", "cliente")
+def _(ctx, i):
+    return f"/veiculos/{ctx.veiculo}/editar", {}
+
+
+@cenario("views.veiculo_edit", "POST", "cliente", status=302)
+def _(ctx, i):
+    veiculo = db.session.get(Veiculo, ctx.veiculo)
+    dados = {
+        "placa": veiculo.placa,
+        "marca": veiculo.marca,
+        "modelo": veiculo.modelo,
+        "ano": str(veiculo.ano),
+        "cor": ("Prata", "Preto")[i % 2],
+    }
+    return f"/veiculos/{ctx.veiculo}/editar", {"data": dados}
+
+
+@cenario("views.veiculo_delete", "POST", "cliente", status=302)
+def _(ctx, i):
+    return f"/veiculos/{ctx.veiculo_descartavel(i)}/deletar", {}
+
+
+@cenario("views.servicos_list", "GET", "gerente")
+def _(ctx, i):
+    return "/servicos", {}
+
+
+@cenario("views.servico_solicitar", "GET", "cliente")
+def _(ctx, i):
+    return "/servicos/solicitar", {}
+
+
+@cenario("views.servico_solicitar", "POST", "cliente", status=302)
+def _(ctx, i):
+    return "/servicos/solicitar", {"data": {"veiculo_id": ctx.veiculo, "descricao": "Ruído"}}
+
+
+@cenario("views.servico_create", "GET", "mecanico")
+def _(ctx, i):
+    return "/servicos/novo", {}
+
+
+@cenario("views.servico_create", "POST", "mecanico", status=302)
+def _(ctx, i):
+    dados = {"veiculo_id": ctx.veiculo, "descricao": "Alinhamento", "status": "pendente"}
+    return "/servicos/novo", {"data": dados}
+
+
+@cenario("views.servico_detail", "GET", "cliente")
+def _(ctx, i):
+    return f"/servicos/{ctx.servico}", {}
+
+
+@cenario("views.servico_edit", "GET", "gerente")
+def _(ctx, i):
+    return f"/servicos/{ctx.servico}/editar", {}
+
+
+@cenario("views.servico_edit", "POST", "gerente", status=302)
+def _(ctx, i):
+    dados = {
+        "veiculo_id": ctx.veiculo,
+        "descricao": "Revisão dos freios",
+        "observacoes": f"Rodada {i}",
+        "status": "em_andamento",
+    }
+    return f"/servicos/{ctx.servico}/editar", {"data": dados}
+
+
+@cenario("views.orcamento_create", "POST", "gerente", status=302)
+def _(ctx, i):
+    dados = {"descricao": "Fluido de freio", "valor": "80"}
+    return f"/orcamentos/novo?servico_id={ctx.servico}", {"data": dados}
+
+
+@cenario("views.orcamento_approve", "POST", "cliente", status=302)
+def _(ctx, i):
+    return f"/orcamentos/{ctx.orcamento}/aprovar", {}
+
+
+@cenario("views.usuarios_list", "GET", "gerente")
+def _(ctx, i):
+    return "/usuarios", {}
+
+
+@cenario("views.usuario_create", "GET", "gerente")
+def _(ctx, i):
+    return "/usuarios/novo", {}
+
+
+@cenario("views.usuario_create", "POST", "gerente", status=302)
+def _(ctx, i):
+    dados = {
+        "nome": "Mecânico Novo",
+        "email": f"equipe{i}@oficina.com",
+        "telefone": "61977776666",
+        "tipo_usuario": "mecanico",
+        "senha": SENHA,
+    }
+    return "/usuarios/novo", {"data": dados}
+
+
+# ============= Execução =============
+
+
+def rotas_sem_cenario(app):
+    """(endpoint, método) dos blueprints medidos que não têm cenário registrado"""
+    cobertos = {(endpoint, metodo) for endpoint, metodo, _ in CENARIOS}
+    faltando = []
+    for regra in app.url_map.iter_rules():
+        if regra.endpoint.split(".")[0] not in BLUEPRINTS_MEDIDOS:
+            continue
+        for metodo in sorted(regra.methods - {"HEAD", "OPTIONS"}):
+            if (regra.endpoint, metodo) not in cobertos:
+                faltando.append((regra.endpoint, metodo))
+    return faltando
+
+
+def criar_aplicacao(caminho, dados):
+    """Aplicação sobre um SQLite novo, com a oficina sintética de ``dados``"""
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{caminho}",
+            "SECRET_KEY": "benchmark",
+            "JWT_SECRET_KEY": "benchmark",
+            "BCRYPT_LOG_ROUNDS": 4,
+            "DASHBOARD_CACHE": "nenhum",
+            "MIGRACOES": False,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        gerar_massa(db.session.connection(), **dados)
+        db.session.commit()
+    return app
+
+
+def percentis(amostras):
+    """p50, p95 e p99 (em ms) das durações em segundos"""
+    if len(amostras) == 1:
+        return [amostras[0] * 1000] * 3
+    cortes = statistics.quantiles(amostras, n=100, method="inclusive")
+    return [cortes[i] * 1000 for i in (49, 94, 98)]
+
+
+def medir(app, ctx, chave, repeticoes, aquecimento=2):
+    """Executa a rota ``aquecimento + repeticoes`` vezes e devolve o resumo"""
+    (endpoint, metodo, perfil), (preparar, esperado) = chave, CENARIOS[chave]
+    consultas = [0]
+
+    def contar(conexao, cursor, statement, parameters, context, executemany):
+        consultas[0] += 1
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", contar)
+    duracoes, contagens = [], []
+    try:
+        for rodada in range(aquecimento + repeticoes):
+            client = app.test_client()
+            with app.app_context():
+                caminho, opcoes = preparar(ctx, rodada)
+                if perfil != "anonimo":
+                    if endpoint.startswith("views."):
+                        with client.session_transaction() as sessao:
+                            sessao.update(ctx.sessao(perfil))
+                    else:
+                        opcoes.setdefault("headers", ctx.headers(perfil))
+
+            # Como no timeit: coleta fora da medição e sem pausas do GC dentro dela
+            gc.collect()
+            gc.disable()
+            consultas[0] = 0  # o preparo também consulta o banco
+            inicio = time.perf_counter()
+            resposta = client.open(caminho, method=metodo, **opcoes)
+            duracao = time.perf_counter() - inicio
+            gc.enable()
+
+            codigo = resposta.status_code
+            if (esperado is not None and codigo != esperado) or codigo >= 400:
+                raise RuntimeError(
+                    f"{nome_cenario(chave)}: {caminho} respondeu {codigo}: "
+                    f"{resposta.get_data(as_text=True)[:200]}"
+                )
+            if rodada >= aquecimento:
+                duracoes.append(duracao)
+                contagens.append(consultas[0])
+    finally:
+        gc.enable()
+        event.remove(engine, "before_cursor_execute", contar)
+
+    p50, p95, p99 = percentis(duracoes)
+    return {
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "consultas": max(contagens),
+    }
+
+
+def executar(dados, repeticoes, diretorio, filtro=None):
+    """Mede todas as rotas (ou as que contêm ``filtro``) e devolve o relatório"""
+    app = criar_aplicacao(os.path.join(diretorio, "endpoints.db"), dados)
+    faltando = rotas_sem_cenario(app)
+    if faltando:
+        rotas = ", ".join(f"{metodo} {endpoint}" for endpoint, metodo in faltando)
+        raise RuntimeError(f"Rotas sem cenário: {rotas}")
+
+    with app.app_context():
+        ctx = Contexto(dados["mecanicos"], dados["clientes"])
+        rotas = {}
+        for chave in CENARIOS:
+            nome = nome_cenario(chave)
+            if filtro is None or filtro in nome:
+                rotas[nome] = medir(app, ctx, chave, repeticoes)
+        db.engine.dispose()
+    return {"dados": dados, "repeticoes": repeticoes, "rotas": rotas}
+
+
+def comparar(baseline, atual, limite, folga_ms, percentil="p50"):
+    """Lista as regressões de ``atual`` em relação à ``baseline``"""
+    campo = f"{percentil}_ms"
+    regressoes = []
+    for nome, medida in atual["rotas"].items():
+        base = baseline["rotas"].get(nome)
+        if base is None:
+            continue
+        teto = base[campo] * limite + folga_ms
+        if medida[campo] > teto:
+            regressoes.append(
+                f"{nome}: {percentil} {medida[campo]:.2f} ms > {teto:.2f} ms "
+                f"(baseline {base[campo]:.2f} ms)"
+            )
+        if medida["consultas"] > base["consultas"]:
+            regressoes.append(
+                f"{nome}: {medida['consultas']} consultas (baseline {base['consultas']})"
+            )
+    return regressoes
+
+
+def imprimir(relatorio, baseline=None, percentil="p50"):
+    rotas = (baseline or {}).get("rotas", {})
+    cabecalho = f"base {percentil}"
+    print(f"{'rota':<58}{'p50':>9}{'p95':>9}{'p99':>9}{'consultas':>11}{cabecalho:>10}")
+    for nome, medida in relatorio["rotas"].items():
+        base = rotas.get(nome)
+        coluna_base = f"{base[percentil + '_ms']:>10.2f}" if base else f"{'-':>10}"
+        print(
+            f"{nome:<58}{medida['p50_ms']:>9.2f}{medida['p95_ms']:>9.2f}"
+            f"{medida['p99_ms']:>9.2f}{medida['consultas']:>11}{coluna_base}"
+        )
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clientes", type=int, default=500)
+    parser.add_argument("--veiculos-por-cliente", type=int, default=2)
+    parser.add_argument("--servicos", type=int, default=20000)
+    parser.add_argument("--mecanicos", type=int, default=10)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--repeticoes", type=int, default=30)
+    parser.add_argument("--rota", help="mede só os cenários que contêm este texto")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--salvar", action="store_true", help="grava a medição como baseline")
+    parser.add_argument("--percentil", choices=("p50", "p95", "p99"), default="p50")
+    parser.add_argument("--limite", type=float, default=2.0, help="máximo / valor da baseline")
+    parser.add_argument("--folga-ms", type=float, default=2.0, help="tolerância absoluta em ms")
+    args = parser.parse_args(argumentos)
+
+    dados = {
+        "clientes": args.clientes,
+        "veiculos_por_cliente": args.veiculos_por_cliente,
+        "servicos": args.servicos,
+        "mecanicos": args.mecanicos,
+        "semente": args.semente,
+    }
+    with tempfile.TemporaryDirectory() as diretorio:
+        relatorio = executar(dados, args.repeticoes, diretorio, args.rota)
+
+    if args.salvar:
+        with open(args.baseline, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+            arquivo.write("\n")
+        imprimir(relatorio)
+        print(f"Baseline gravada em {args.baseline}")
+        return 0
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as arquivo:
+            baseline = json.load(arquivo)
+    imprimir(relatorio, baseline, args.percentil)
+    if baseline is None:
+        print("Sem baseline: rode com --salvar")
+        return 0
+    if baseline["dados"] != dados:
+        print(f"A baseline foi medida com outra massa ({baseline['dados']}); nada comparado")
+        return 2
+
+    regressoes = comparar(baseline, relatorio, args.limite, args.folga_ms, args.percentil)
+    for regressao in regressoes:
+        print(f"REGRESSÃO {regressao}")
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
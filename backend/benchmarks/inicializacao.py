@@ -0,0 +1,98 @@
+"""Mede o tempo de partida da aplicação em processos Python novos
+
+Cada rodada abre um interpretador limpo (como um worker sem preload) e mede:
+o ``import app``, o ``create_app`` e a primeira requisição. O banco é um
+arquivo SQLite com as tabelas já criadas, como depois do ``flask banco criar``.
+
+Cenários:
+
+* ``cli``: ``create_app()``, como no ``flask`` (registra o Flask-Migrate);
+* ``wsgi``: ``create_app({"MIGRACOES": False})``, como no ``wsgi.py``.
+
+Uso (a partir de backend/):
+    python benchmarks/inicializacao.py --rodadas 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+RODADA = """
+import json, sys, time
+inicio = time.perf_counter()
+import app
+importado = time.perf_counter()
+aplicacao = app.create_app(json.loads(sys.argv[1]))
+criado = time.perf_counter()
+resposta = aplicacao.test_client().get("/login")
+assert resposta.status_code == 200, resposta.status_code
+fim = time.perf_counter()
+print(json.dumps({
+    "import": importado - inicio,
+    "create_app": criado - importado,
+    "primeira_requisicao": fim - criado,
+    "total": fim - inicio,
+}))
+"""
+
+CENARIOS = {"cli": {}, "wsgi": {"MIGRACOES": False}}
+FASES = ("import", "create_app", "primeira_requisicao", "total")
+
+
+def preparar_banco(caminho):
+    """Cria as tabelas uma vez, fora das medições"""
+    from app import create_app
+    from app.models import db
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{caminho}"})
+    with app.app_context():
+        db.create_all()
+        db.engine.dispose()
+
+
+def rodar(config, ambiente):
+    saida = subprocess.run(
+        [sys.executable, "-c", RODADA, json.dumps(config)],
+        cwd=BACKEND,
+        env=ambiente,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(saida.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rodadas", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "inicializacao.db")
+        preparar_banco(caminho)
+        ambiente = dict(os.environ, DATABASE_URL=f"sqlite:///{caminho}", DASHBOARD_CACHE="nenhum")
+
+        # Cenários intercalados, para que a variação da máquina afete os dois
+        rodadas = {nome: [] for nome in CENARIOS}
+        for _ in range(args.rodadas):
+            for nome, config in CENARIOS.items():
+                rodadas[nome].append(rodar(config, ambiente))
+
+        print("Medianas em ms (total mínimo na última coluna)")
+        print(f"{'cenário':<8}" + "".join(f"{fase:>22}" for fase in FASES) + f"{'mínimo':>10}")
+        for nome, medidas in rodadas.items():
+            medianas = [statistics.median(m[fase] for m in medidas) * 1000 for fase in FASES]
+            minimo = min(m["total"] for m in medidas) * 1000
+            print(
+                f"{nome:<8}" + "".join(f"{valor:>22.1f}" for valor in medianas) + f"{minimo:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Compara a serialização de uma listagem de serviços: ORM + to_dict + jsonify
+contra colunas + app.serializacao (orjson e fallback json)
+
+Gera N serviços (oficina sintética de seed.py) e mede
+o tempo de montar o corpo JSON da listagem completa em cada caminho.
+
+Uso (a partir de backend/):
+    python benchmarks/serializacao.py --servicos 10000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import jsonify  # noqa: E402
+
+from app import create_app, serializacao  # noqa: E402
+from app.carregamento import servicos_com_orcamentos  # noqa: E402
+from app.models import db, Servico  # noqa: E402
+from seed import gerar_massa  # noqa: E402
+
+
+def caminho_orm():
+    servicos = Servico.query.options(*servicos_com_orcamentos()).order_by(
+        Servico.criado_em, Servico.id
+    )
+    return jsonify({"servicos": [s.to_dict(include_orcamentos=True) for s in servicos]}).get_data()
+
+
+def caminho_colunas():
+    linhas = serializacao.consulta_servicos().order_by(Servico.criado_em, Servico.id)
+    return serializacao.resposta_json({"servicos": serializacao.servicos_json(linhas)}).get_data()
+
+
+def medir(funcao, repeticoes):
+    funcao()  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        # Sessão limpa: cada requisição real começa com o identity map vazio
+        db.session.remove()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--servicos", type=int, default=10000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"})
+    with app.app_context(), app.test_request_context():
+        db.create_all()
+        gerar_massa(
+            db.session.connection(),
+            clientes=max(args.servicos // 20, 1),
+            servicos=args.servicos,
+            semente=args.semente,
+        )
+        db.session.commit()
+
+        orjson = serializacao.orjson
+        resultados = {"ORM + to_dict + jsonify": medir(caminho_orm, args.repeticoes)}
+        if orjson is not None:
+            resultados["colunas + orjson"] = medir(caminho_colunas, args.repeticoes)
+        serializacao.orjson = None
+        resultados["colunas + json"] = medir(caminho_colunas, args.repeticoes)
+        serializacao.orjson = orjson
+
+    base = resultados["ORM + to_dict + jsonify"]
+    print(f"Listagem de {args.servicos} serviços (mediana de {args.repeticoes})")
+    print(f"{'caminho':<28}{'ms':>10}{'serv./s':>12}{'ganho':>8}")
+    for nome, ms in resultados.items():
+        print(f"{nome:<28}{ms:>10.1f}{args.servicos / ms * 1000:>12.0f}{base / ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Vazão do servidor de desenvolvimento (flask run) contra o Gunicorn
+
+Gera a oficina sintética de seed.py em um SQLite temporário,
+sobe o servidor escolhido em um subprocesso e dispara requisições
+autenticadas de gerente com N conexões simultâneas (keep-alive) contra o
+dashboard e as listagens.
+
+Uso (a partir de backend/):
+    python benchmarks/servidor_wsgi.py --servidor dev
+    python benchmarks/servidor_wsgi.py --servidor gunicorn --workers 3
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from app import create_app  # noqa: E402
+from app.models import db  # noqa: E402
+from seed import gerar_massa  # noqa: E402
+
+ENDPOINTS = (
+    "/api/dashboard",
+    "/api/servicos?limit=50",
+    "/api/veiculos?limit=50",
+)
+PORTA = 5077
+
+
+def preparar_banco(caminho, servicos, semente):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{caminho}", "BCRYPT_LOG_ROUNDS": 4})
+    with app.app_context():
+        db.create_all()
+        gerar_massa(
+            db.session.connection(),
+            clientes=max(servicos // 20, 1),
+            servicos=servicos,
+            semente=semente,
+        )
+        db.session.commit()
+
+
+def comando_servidor(args):
+    if args.servidor == "dev":
+        return [
+            sys.executable,
+            "-m",
+            "flask",
+            "run",
+            "--port",
+            str(PORTA),
+            "--with-threads",
+        ]
+    return [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        "-c",
+        "gunicorn.conf.py",
+        "--bind",
+        f"127.0.0.1:{PORTA}",
+        "--workers",
+        str(args.workers),
+        "--access-logfile",
+        "/dev/null",
+        "wsgi:app",
+    ]
+
+
+def aguardar_porta(timeout=30):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        try:
+            socket.create_connection(("127.0.0.1", PORTA), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Servidor não respondeu")
+
+
+def obter_token():
+    conexao = http.client.HTTPConnection("127.0.0.1", PORTA)
+    corpo = json.dumps({"email": "gerente@oficina.com", "senha": "senha123"})
+    conexao.request("POST", "/auth/login", corpo, {"Content-Type": "application/json"})
+    return json.loads(conexao.getresponse().read())["token"]
+
+
+def carga(caminho, token, requisicoes, concorrencia):
+    """Dispara ``requisicoes`` GETs com ``concorrencia`` conexões; retorna (req/s, ms)"""
+    cabecalhos = {"Authorization": f"Bearer {token}"}
+    tempos = []
+    erros = []
+    restantes = iter(range(requisicoes))
+    trava = threading.Lock()
+
+    def requisitar(conexao):
+        conexao.request("GET", caminho, headers=cabecalhos)
+        resposta = conexao.getresponse()
+        resposta.read()
+        return resposta.status
+
+    def cliente():
+        conexao = http.client.HTTPConnection("127.0.0.1", PORTA, timeout=30)
+        while True:
+            with trava:
+                if next(restantes, None) is None:
+                    break
+            inicio = time.perf_counter()
+            try:
+                status = requisitar(conexao)
+            except (OSError, http.client.HTTPException):
+                # Conexão keep-alive fechada pelo servidor (ex.: worker
+                # reciclado por max_requests): repete em uma nova, como os
+                # clientes HTTP fazem com GETs
+                conexao.close()
+                conexao = http.client.HTTPConnection("127.0.0.1", PORTA, timeout=30)
+                try:
+                    status = requisitar(conexao)
+                except (OSError, http.client.HTTPException):
+                    status = "conexão"
+            if status != 200:
+                erros.append(status)
+                continue
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        conexao.close()
+
+    inicio = time.perf_counter()
+    threads = [threading.Thread(target=cliente) for _ in range(concorrencia)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    tempos.sort()
+    return {
+        "req/s": len(tempos) / duracao,
+        "p50": statistics.median(tempos),
+        "p95": tempos[int(len(tempos) * 0.95) - 1],
+        "erros": len(erros),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--servidor", choices=["dev", "gunicorn"], default="gunicorn")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--servicos", type=int, default=5000)
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    parser.add_argument("--concorrencia", type=int, default=16)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "carga.db")
+        preparar_banco(caminho, args.servicos, args.semente)
+
+        ambiente = dict(
+            os.environ,
+            FLASK_APP="app",
+            DATABASE_URL=f"sqlite:///{caminho}",
+            BCRYPT_LOG_ROUNDS="4",
+        )
+        servidor = subprocess.Popen(
+            comando_servidor(args),
+            cwd=BACKEND,
+            env=ambiente,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            aguardar_porta()
+            token = obter_token()
+            print(
+                f"{args.servidor}: {args.requisicoes} requisições por endpoint, "
+                f"{args.concorrencia} conexões, {args.servicos} serviços"
+            )
+            print(f"{'endpoint':<28}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'erros':>8}")
+            for endpoint in ENDPOINTS:
+                carga(endpoint, token, 50, 4)  # aquecimento
+                r = carga(endpoint, token, args.requisicoes, args.concorrencia)
+                print(
+                    f"{endpoint:<28}{r['req/s']:>10.0f}{r['p50']:>10.1f}"
+                    f"{r['p95']:>10.1f}{r['erros']:>8}"
+                )
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+
+if __name__ == "__main__":
+    main()
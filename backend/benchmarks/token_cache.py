@@ -0,0 +1,77 @@
+"""Compara o custo de token_required com e sem o cache de tokens verificados
+
+Mede, dentro de um contexto de requisição, a verificação de um mesmo token
+repetida N vezes: primeiro com o cache desativado (JWT_CACHE_MAX=0, um
+jwt.decode por chamada), depois com o cache padrão. Com o backend
+compartilhado (DASHBOARD_CACHE=sqlite, o padrão do Gunicorn com vários
+workers), mede a consulta das revogações a cada chamada (JWT_REVOGACAO_TTL=0)
+e com o TTL padrão das consultas sem revogação.
+
+Uso (a partir de backend/):
+    python benchmarks/token_cache.py --repeticoes 20000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.utils import gerar_token, token_required  # noqa: E402
+
+
+@token_required
+def rota_vazia():
+    return "ok"
+
+
+def medir(cache_max, repeticoes, rodadas, **config):
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "JWT_SECRET_KEY": "benchmark",
+            "JWT_CACHE_MAX": cache_max,
+            "DASHBOARD_CACHE": "memoria",
+            **config,
+        }
+    )
+    with app.app_context():
+        token = gerar_token(1, "cliente")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with app.test_request_context(headers=headers):
+        tempos = timeit.repeat(rota_vazia, number=repeticoes, repeat=rodadas)
+    # Microssegundos por chamada (mediana das rodadas)
+    return statistics.median(tempos) / repeticoes * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=20000)
+    parser.add_argument("--rodadas", type=int, default=5)
+    args = parser.parse_args()
+
+    sem_cache = medir(0, args.repeticoes, args.rodadas)
+    com_cache = medir(4096, args.repeticoes, args.rodadas)
+    with tempfile.TemporaryDirectory() as pasta:
+        compartilhado = {
+            "DASHBOARD_CACHE": "sqlite",
+            "DASHBOARD_CACHE_PATH": os.path.join(pasta, "cache.db"),
+        }
+        sem_ttl = medir(4096, args.repeticoes, args.rodadas, JWT_REVOGACAO_TTL=0, **compartilhado)
+        com_ttl = medir(4096, args.repeticoes, args.rodadas, **compartilhado)
+
+    print(f"{'cenário':<28}{'µs/chamada':>12}")
+    print(f"{'sem cache':<28}{sem_cache:>12.2f}")
+    print(f"{'com cache':<28}{com_cache:>12.2f}")
+    print(f"{'compartilhado, sem TTL':<28}{sem_ttl:>12.2f}")
+    print(f"{'compartilhado, TTL padrão':<28}{com_ttl:>12.2f}")
+    print(f"ganho do cache: {sem_cache / com_cache:.1f}x")
+    print(f"ganho do TTL (compartilhado): {sem_ttl / com_ttl:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
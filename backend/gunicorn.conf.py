@@ -0,0 +1,90 @@
+"""Configuração do Gunicorn (perfil de produção)
+
+Todos os valores podem ser ajustados por variáveis de ambiente:
+
+* ``GUNICORN_BIND`` (``0.0.0.0:5000``);
+* ``WEB_CONCURRENCY``: processos (padrão ``2 * CPUs + 1``, no máximo 12);
+* ``GUNICORN_WORKER_CLASS``: ``gthread`` (padrão) ou ``gevent`` (requer o
+  pacote gevent e um driver de banco cooperativo, ex. psycogreen);
+* ``GUNICORN_THREADS``: threads por processo no ``gthread`` (4);
+* ``GUNICORN_MAX_REQUESTS``: requisições antes de reciclar o processo (1000);
+* ``GUNICORN_TIMEOUT``: segundos antes de matar um worker travado (30).
+
+Com mais de um worker, ``DASHBOARD_CACHE`` passa a ``sqlite`` se não for
+informado: a invalidação por commit e as revogações de tokens só chegam aos
+outros processos por um backend compartilhado. Pelo mesmo motivo, com o
+PostgreSQL, ``EVENTOS_BACKEND`` passa a ``postgres`` (LISTEN/NOTIFY).
+
+Cada conexão aberta em ``/api/eventos`` ocupa uma thread do ``gthread`` até
+``EVENTOS_DURACAO_MAX`` (60 s). ``EVENTOS_MAX_CONEXOES`` limita as conexões
+por processo: no ``gthread``, metade das threads (as demais ficam para as
+outras rotas; acima do limite a resposta é 503); no ``gevent``, metade de
+``worker_connections``. Para muitos clientes conectados, use ``gevent``.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 12)))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+
+if worker_class == "gevent":
+    os.environ.setdefault("EVENTOS_MAX_CONEXOES", str(worker_connections // 2))
+else:
+    os.environ.setdefault("EVENTOS_MAX_CONEXOES", str(max(1, threads // 2)))
+
+if workers > 1:
+    os.environ.setdefault("DASHBOARD_CACHE", "sqlite")
+    if os.getenv("DATABASE_URL", "postgresql").startswith("postgres"):
+        os.environ.setdefault("EVENTOS_BACKEND", "postgres")
+
+# Carrega a aplicação uma vez no master: os workers nascem por fork, já com
+# os módulos importados (menos memória e início mais rápido)
+preload_app = True
+
+# Recicla os processos periodicamente (contém vazamentos de memória); o
+# jitter evita que todos reiniciem ao mesmo tempo
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = max_requests // 10
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-")
+# O formato padrão, com o caminho sem a query string no lugar da linha da
+# requisição: o ticket de /api/eventos (?ticket=) não fica no log
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOGLEVEL", "info")
+
+
+def on_starting(server):
+    if workers > 1 and os.environ["DASHBOARD_CACHE"] == "memoria":
+        server.log.warning(
+            "DASHBOARD_CACHE=memoria com %d workers: cada processo terá o próprio cache "
+            "e as invalidações e revogações de tokens não chegam aos demais",
+            workers,
+        )
+    if workers > 1 and os.getenv("EVENTOS_BACKEND", "local") == "local":
+        server.log.warning(
+            "EVENTOS_BACKEND=local com %d workers: /api/eventos só recebe os eventos "
+            "das escritas feitas no mesmo processo",
+            workers,
+        )
+
+
+def post_fork(server, worker):
+    """Descarta as conexões herdadas do master (criadas no preload)
+
+    Conexões de banco não podem ser compartilhadas entre processos; cada
+    worker abre as suas sob demanda.
+    """
+    from wsgi import app
+    from app.models import db
+
+    with app.app_context():
+        for engine in db.engines.values():  # primário e réplica
+            engine.dispose(close=False)
@@ -0,0 +1,59 @@
+"""add hot path indexes
+
+Revision ID: c4e8f1a2b9d3
+Revises: a57b350666f6
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8f1a2b9d3'
+down_revision = 'a57b350666f6'
+branch_labels = None
+depends_on = None
+
+# O Enum do SQLAlchemy grava o nome do membro (AGUARDANDO_ORCAMENTO)
+AGUARDANDO_SEM_MECANICO = sa.text(
+    "status = 'AGUARDANDO_ORCAMENTO' AND mecanico_id IS NULL"
+)
+
+
+def upgrade():
+    op.create_index('ix_usuarios_tipo_nome', 'usuarios', ['tipo', 'nome'])
+    op.create_index('ix_veiculos_usuario_id', 'veiculos', ['usuario_id'])
+    op.create_index('ix_orcamentos_servico_id', 'orcamentos', ['servico_id'])
+
+    op.create_index(
+        'ix_servicos_mecanico_status', 'servicos', ['mecanico_id', 'status']
+    )
+    op.create_index(
+        'ix_servicos_status_criado_em',
+        'servicos',
+        ['status', sa.text('criado_em DESC')],
+    )
+    op.create_index(
+        'ix_servicos_veiculo_criado_em', 'servicos', ['veiculo_id', 'criado_em']
+    )
+    op.create_index('ix_servicos_criado_em_id', 'servicos', ['criado_em', 'id'])
+    op.create_index(
+        'ix_servicos_aguardando_sem_mecanico',
+        'servicos',
+        ['criado_em'],
+        postgresql_where=AGUARDANDO_SEM_MECANICO,
+        sqlite_where=AGUARDANDO_SEM_MECANICO,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_servicos_aguardando_sem_mecanico', table_name='servicos')
+    op.drop_index('ix_servicos_criado_em_id', table_name='servicos')
+    op.drop_index('ix_servicos_veiculo_criado_em', table_name='servicos')
+    op.drop_index('ix_servicos_status_criado_em', table_name='servicos')
+    op.drop_index('ix_servicos_mecanico_status', table_name='servicos')
+
+    op.drop_index('ix_orcamentos_servico_id', table_name='orcamentos')
+    op.drop_index('ix_veiculos_usuario_id', table_name='veiculos')
+    op.drop_index('ix_usuarios_tipo_nome', table_name='usuarios')
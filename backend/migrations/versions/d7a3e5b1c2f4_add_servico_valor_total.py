@@ -0,0 +1,46 @@
+"""add servico valor_total
+
+Revision ID: d7a3e5b1c2f4
+Revises: c4e8f1a2b9d3
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a3e5b1c2f4'
+down_revision = 'c4e8f1a2b9d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('servicos', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                'valor_total',
+                sa.Numeric(precision=10, scale=2),
+                nullable=False,
+                server_default='0',
+            )
+        )
+        batch_op.create_index('ix_servicos_valor_total', ['valor_total'])
+
+    # Backfill: valor quando preenchido, senão a soma dos orçamentos
+    op.execute(
+        """
+        UPDATE servicos SET valor_total = COALESCE(
+            NULLIF(valor, 0),
+            (SELECT SUM(o.valor) FROM orcamentos o WHERE o.servico_id = servicos.id),
+            0
+        )
+        """
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('servicos', schema=None) as batch_op:
+        batch_op.drop_index('ix_servicos_valor_total')
+        batch_op.drop_column('valor_total')
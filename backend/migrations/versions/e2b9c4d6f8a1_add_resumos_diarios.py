@@ -0,0 +1,73 @@
+"""add resumos diarios
+
+Revision ID: e2b9c4d6f8a1
+Revises: d7a3e5b1c2f4
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b9c4d6f8a1'
+down_revision = 'd7a3e5b1c2f4'
+branch_labels = None
+depends_on = None
+
+STATUS = (
+    'PENDENTE',
+    'AGUARDANDO_ORCAMENTO',
+    'ORCAMENTO_APROVADO',
+    'EM_ANDAMENTO',
+    'CONCLUIDO',
+    'CANCELADO',
+)
+
+
+def upgrade():
+    # Reaproveita o tipo statusservico já criado para servicos no PostgreSQL
+    status = sa.Enum(*STATUS, name='statusservico').with_variant(
+        postgresql.ENUM(*STATUS, name='statusservico', create_type=False),
+        'postgresql',
+    )
+    op.create_table(
+        'resumos_diarios',
+        sa.Column('dia', sa.Date(), nullable=False),
+        sa.Column('mecanico_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('status', status, nullable=False),
+        sa.Column('quantidade', sa.Integer(), nullable=False),
+        sa.Column('receita', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.PrimaryKeyConstraint('dia', 'mecanico_id', 'status'),
+    )
+    op.create_index(
+        'ix_resumos_diarios_mecanico_status_dia',
+        'resumos_diarios',
+        ['mecanico_id', 'status', 'dia'],
+    )
+
+    # Backfill (equivalente a `flask resumos reconstruir`)
+    op.execute(
+        """
+        INSERT INTO resumos_diarios (dia, mecanico_id, status, quantidade, receita)
+        SELECT dia, mecanico_id, status, COUNT(*), COALESCE(SUM(valor_total), 0)
+        FROM (
+            SELECT
+                DATE(CASE
+                    WHEN status = 'CONCLUIDO' AND data_conclusao IS NOT NULL
+                    THEN data_conclusao ELSE criado_em
+                END) AS dia,
+                COALESCE(mecanico_id, 0) AS mecanico_id,
+                status,
+                valor_total
+            FROM servicos
+        ) AS linhas
+        GROUP BY dia, mecanico_id, status
+        """
+    )
+
+
+def downgrade():
+    op.drop_index('ix_resumos_diarios_mecanico_status_dia', table_name='resumos_diarios')
+    op.drop_table('resumos_diarios')
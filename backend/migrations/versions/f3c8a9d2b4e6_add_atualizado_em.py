@@ -0,0 +1,36 @@
+"""add atualizado_em to usuarios and veiculos
+
+Revision ID: f3c8a9d2b4e6
+Revises: e2b9c4d6f8a1
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c8a9d2b4e6'
+down_revision = 'e2b9c4d6f8a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for tabela in ('usuarios', 'veiculos'):
+        with op.batch_alter_table(tabela, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('atualizado_em', sa.DateTime(), nullable=True))
+
+    # Backfill: a data de cadastro (alterações anteriores não têm registro)
+    op.execute('UPDATE usuarios SET atualizado_em = COALESCE(data_cadastro, CURRENT_TIMESTAMP)')
+    op.execute('UPDATE veiculos SET atualizado_em = criado_em')
+
+    for tabela in ('usuarios', 'veiculos'):
+        with op.batch_alter_table(tabela, schema=None) as batch_op:
+            batch_op.alter_column('atualizado_em', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    for tabela in ('veiculos', 'usuarios'):
+        with op.batch_alter_table(tabela, schema=None) as batch_op:
+            batch_op.drop_column('atualizado_em')
@@ -1,213 +1,458 @@
-"""Script para popular o banco de dados com dados de teste"""
+"""Script para popular o banco de dados com dados de teste
+
+Sem argumentos, cria os dados de demonstração (6 usuários, 6 veículos e 6
+serviços). Com ``--clientes``/``--servicos``, gera uma oficina sintética
+grande, a massa comum a todos os benchmarks:
+
+    python seed.py --clientes 100000 --veiculos-por-cliente 2 \\
+        --servicos 2000000 --mecanicos 50 --semente 42
+
+A geração é determinística: a mesma semente e a mesma ``--referencia`` (data
+final do histórico; padrão: hoje, em UTC) produzem as mesmas linhas. Todos os
+usuários têm a senha ``senha123`` (um único hash bcrypt, calculado uma vez).
+A inserção é feita em lotes (executemany; ``COPY`` no PostgreSQL), sem passar
+pelo ORM, e os resumos diários são reconstruídos no fim.
+
+ATENÇÃO: o banco indicado (``DATABASE_URL``) é apagado e recriado.
+"""
+import argparse
+import csv
+import io
+import math
+import random
+import string
+from datetime import datetime, timedelta
+from enum import Enum
+from sqlalchemy import DateTime, Enum as SAEnum, func, select, text
 from app import create_app
-from app.models import db, Usuario, Veiculo, Servico, Orcamento, StatusServico
+from app.models import db, Usuario, Veiculo, Servico, Orcamento, StatusServico, TipoUsuario
+from app.resumos import recalcular_resumos
+
+SENHA_PADRAO = "senha123"
+TAMANHO_LOTE = 10000
+
+# Distribuição de status em uma oficina com histórico longo
+PESOS_STATUS = {
+    StatusServico.PENDENTE: 2,
+    StatusServico.AGUARDANDO_ORCAMENTO: 3,
+    StatusServico.ORCAMENTO_APROVADO: 2,
+    StatusServico.EM_ANDAMENTO: 3,
+    StatusServico.CONCLUIDO: 85,
+    StatusServico.CANCELADO: 5,
+}
+# Serviços em aberto são recentes (criados nos últimos N dias)
+DIAS_EM_ABERTO = 30
+STATUS_ABERTOS = {
+    StatusServico.PENDENTE,
+    StatusServico.AGUARDANDO_ORCAMENTO,
+    StatusServico.ORCAMENTO_APROVADO,
+    StatusServico.EM_ANDAMENTO,
+}
+# Já passaram pelo orçamento (têm um ou dois)
+STATUS_ORCADOS = {
+    StatusServico.ORCAMENTO_APROVADO,
+    StatusServico.EM_ANDAMENTO,
+    StatusServico.CONCLUIDO,
+}
+
+MARCAS = {
+    "Volkswagen": ("Gol", "Polo", "T-Cross", "Saveiro"),
+    "Chevrolet": ("Onix", "Tracker", "S10", "Spin"),
+    "Fiat": ("Uno", "Argo", "Mobi", "Strada", "Toro"),
+    "Toyota": ("Corolla", "Hilux", "Yaris"),
+    "Honda": ("Civic", "HR-V", "Fit", "City"),
+    "Hyundai": ("HB20", "Creta"),
+    "Renault": ("Kwid", "Sandero", "Duster"),
+    "Ford": ("Ka", "Ranger", "EcoSport"),
+}
+CORES = ("Prata", "Branco", "Preto", "Cinza", "Vermelho", "Azul")
+LETRAS = string.ascii_uppercase
+DESCRICOES = (
+    "Troca de óleo e filtros",
+    "Alinhamento e balanceamento",
+    "Revisão completa",
+    "Troca de pastilhas de freio",
+    "Troca de bateria",
+    "Diagnóstico elétrico",
+    "Troca de correia dentada",
+    "Reparo na suspensão",
+    "Higienização do ar-condicionado",
+    "Troca de embreagem",
+)
+
+
+# ============= Oficina sintética =============
+
+
+def _instante(rnd, referencia, dias):
+    """Data de criação: horário comercial, de segunda a sábado, mais densa perto da referência"""
+    # sqrt concentra as amostras nos dias recentes (movimento crescente)
+    dia = referencia - timedelta(days=int(dias * (1 - math.sqrt(rnd.random()))))
+    if dia.weekday() == 6:  # domingo
+        dia -= timedelta(days=1)
+    return dia.replace(hour=8 + rnd.randrange(10), minute=rnd.randrange(60), second=0)
+
+
+def _valor(rnd):
+    """Valores com cauda longa (mediana perto de R$ 330)"""
+    return round(min(rnd.lognormvariate(5.8, 0.7), 50000), 2)
+
+
+def _placa(indice):
+    """Placa no padrão Mercosul (LLLNLNN), única para cada índice"""
+    prefixo, resto = divmod(indice, 10000)
+    letras = "".join(LETRAS[prefixo // divisor % 26] for divisor in (676, 26, 1))
+    return f"{letras}{resto // 1000}{LETRAS[resto // 100 % 10]}{resto % 100:02d}"
+
+
+def _bruto(valor):
+    """Valor como o driver recebe: enums pelo nome, datas no formato do SQLAlchemy"""
+    if isinstance(valor, Enum):
+        return valor.name
+    # Mesmo texto que o DateTime do SQLite grava (comparações de texto)
+    return valor.isoformat(" ", "microseconds")
+
+
+def _tuplas(tabela, colunas, linhas):
+    """Linhas como tuplas para o driver, convertendo só as colunas de data e enum"""
+    convertidas = [
+        i
+        for i, coluna in enumerate(colunas)
+        if isinstance(tabela.c[coluna].type, (DateTime, SAEnum))
+    ]
+    for linha in linhas:
+        valores = [linha[coluna] for coluna in colunas]
+        for i in convertidas:
+            if valores[i] is not None:
+                valores[i] = _bruto(valores[i])
+        yield tuple(valores)
+
+
+def _inserir(conexao, tabela, linhas):
+    """Insere uma lista de dicionários com as mesmas chaves
+
+    COPY no PostgreSQL; no SQLite, executemany direto no driver (sem o
+    processamento de parâmetros do SQLAlchemy); nos demais, ``insert()``.
+    """
+    if not linhas:
+        return
+    colunas = list(linhas[0])
+    nomes = ", ".join(colunas)
+    dialeto = conexao.dialect.name
+
+    if dialeto == "postgresql":
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        escritor.writerows(_tuplas(tabela, colunas, linhas))
+        buffer.seek(0)
+        cursor = conexao.connection.cursor()
+        cursor.copy_expert(f"COPY {tabela.name} ({nomes}) FROM STDIN WITH (FORMAT csv)", buffer)
+    elif dialeto == "sqlite":
+        marcadores = ", ".join("?" * len(colunas))
+        conexao.exec_driver_sql(
+            f"INSERT INTO {tabela.name} ({nomes}) VALUES ({marcadores})",
+            list(_tuplas(tabela, colunas, linhas)),
+        )
+    else:
+        conexao.execute(tabela.insert(), linhas)
+
+
+def gerar_massa(
+    conexao,
+    clientes,
+    veiculos_por_cliente=1,
+    servicos=0,
+    mecanicos=10,
+    semente=42,
+    referencia=None,
+    dias=3 * 365,
+    senha_hash=None,
+):
+    """Gera a oficina sintética em um banco vazio e devolve as quantidades inseridas
+
+    Ids atribuídos na ordem: mecânicos (1..M), clientes, e por último o
+    gerente ``gerente@oficina.com``. Emails: ``mecanico<i>@oficina.com`` e
+    ``cliente<i>@email.com``. Não confirma a transação.
+    """
+    if conexao.execute(select(func.count()).select_from(Usuario.__table__)).scalar():
+        raise ValueError("gerar_massa espera um banco vazio")
+    if servicos and not clientes * veiculos_por_cliente:
+        raise ValueError("Serviços precisam de ao menos um veículo")
+
+    rnd = random.Random(semente)
+    if referencia is None:
+        referencia = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    if senha_hash is None:
+        modelo = Usuario()
+        modelo.set_senha(SENHA_PADRAO)
+        senha_hash = modelo.senha_hash
+    inicio_cadastros = referencia - timedelta(days=dias)
+
+    def usuario(indice, nome, email, tipo):
+        cadastro = inicio_cadastros + timedelta(minutes=rnd.randrange(dias * 24 * 60))
+        return {
+            "id": indice,
+            "nome": nome,
+            "email": email,
+            "senha_hash": senha_hash,
+            "telefone": f"(61) 9{rnd.randrange(10**8):08d}",
+            "endereco": None,
+            "tipo": tipo,
+            "criado_em": cadastro,
+            "data_cadastro": cadastro,
+            "atualizado_em": cadastro,
+        }
+
+    linhas = [
+        usuario(i, f"Mecânico {i}", f"mecanico{i}@oficina.com", TipoUsuario.MECANICO)
+        for i in range(1, mecanicos + 1)
+    ]
+    _inserir(conexao, Usuario.__table__, linhas)
+    ids_mecanicos = list(range(1, mecanicos + 1))
+
+    for inicio in range(0, clientes, TAMANHO_LOTE):
+        linhas = [
+            usuario(mecanicos + i, f"Cliente {i}", f"cliente{i}@email.com", TipoUsuario.CLIENTE)
+            for i in range(inicio + 1, min(inicio + TAMANHO_LOTE, clientes) + 1)
+        ]
+        _inserir(conexao, Usuario.__table__, linhas)
+    id_gerente = mecanicos + clientes + 1
+    gerente = usuario(id_gerente, "Maria Silva", "gerente@oficina.com", TipoUsuario.GERENTE)
+    _inserir(conexao, Usuario.__table__, [gerente])
+
+    marcas = sorted(MARCAS)
+    total_veiculos = clientes * veiculos_por_cliente
+    for inicio in range(0, total_veiculos, TAMANHO_LOTE):
+        linhas = []
+        for indice in range(inicio, min(inicio + TAMANHO_LOTE, total_veiculos)):
+            marca = rnd.choice(marcas)
+            linhas.append(
+                {
+                    "id": indice + 1,
+                    "placa": _placa(indice),
+                    "modelo": rnd.choice(MARCAS[marca]),
+                    "marca": marca,
+                    "ano": rnd.randint(2005, referencia.year),
+                    "cor": rnd.choice(CORES),
+                    "usuario_id": mecanicos + 1 + indice // veiculos_por_cliente,
+                    "criado_em": inicio_cadastros,
+                    "atualizado_em": inicio_cadastros,
+                }
+            )
+        _inserir(conexao, Veiculo.__table__, linhas)
+
+    status, pesos = zip(*PESOS_STATUS.items())
+    id_orcamento = 0
+    for inicio in range(0, servicos, TAMANHO_LOTE):
+        lote_servicos, lote_orcamentos = [], []
+        for indice in range(inicio, min(inicio + TAMANHO_LOTE, servicos)):
+            estado = rnd.choices(status, pesos)[0]
+            if estado in STATUS_ABERTOS:
+                criado_em = _instante(rnd, referencia, DIAS_EM_ABERTO)
+            else:
+                criado_em = _instante(rnd, referencia, dias)
+            sem_mecanico = estado == StatusServico.PENDENTE or (
+                estado == StatusServico.AGUARDANDO_ORCAMENTO and rnd.random() < 0.5
+            )
 
+            orcamentos = []
+            if estado in STATUS_ORCADOS or (
+                estado == StatusServico.AGUARDANDO_ORCAMENTO and rnd.random() < 0.3
+            ):
+                orcamentos = [_valor(rnd) for _ in range(rnd.choice((1, 1, 1, 2)))]
+            # Valor fechado em parte dos serviços em execução ou concluídos
+            valor = None
+            if (
+                estado in (StatusServico.EM_ANDAMENTO, StatusServico.CONCLUIDO)
+                and rnd.random() < 0.6
+            ):
+                valor = _valor(rnd)
+
+            conclusao = None
+            if estado == StatusServico.CONCLUIDO:
+                conclusao = criado_em + timedelta(hours=rnd.randint(2, 10 * 24))
+            atualizado_em = conclusao or criado_em + timedelta(hours=rnd.randint(0, 48))
+            servico_id = indice + 1
+            # Veículos frequentes e esporádicos (distribuição enviesada)
+            veiculo_id = 1 + int(total_veiculos * rnd.random() ** 1.5)
+            lote_servicos.append(
+                {
+                    "id": servico_id,
+                    "descricao": rnd.choice(DESCRICOES),
+                    "observacoes": None,
+                    "status": estado,
+                    "valor": valor,
+                    # Mesmo cálculo de _sincronizar_valor_total (inserção sem flush)
+                    "valor_total": valor if valor else round(sum(orcamentos), 2),
+                    "veiculo_id": veiculo_id,
+                    "mecanico_id": None if sem_mecanico else rnd.choice(ids_mecanicos),
+                    "criado_em": criado_em,
+                    "atualizado_em": atualizado_em,
+                    "data_previsao": criado_em + timedelta(days=rnd.randint(1, 7))
+                    if estado in STATUS_ABERTOS
+                    else None,
+                    "data_conclusao": conclusao,
+                }
+            )
+            for valor_orcamento in orcamentos:
+                id_orcamento += 1
+                lote_orcamentos.append(
+                    {
+                        "id": id_orcamento,
+                        "descricao": "Peças e mão de obra",
+                        "valor": valor_orcamento,
+                        "servico_id": servico_id,
+                        "criado_em": criado_em + timedelta(hours=rnd.randint(1, 24)),
+                    }
+                )
+        _inserir(conexao, Servico.__table__, lote_servicos)
+        _inserir(conexao, Orcamento.__table__, lote_orcamentos)
+
+    if conexao.dialect.name == "postgresql":
+        # Ids explícitos: as sequências continuam a partir do maior id
+        for tabela in ("usuarios", "veiculos", "servicos", "orcamentos"):
+            conexao.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{tabela}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {tabela}), 1))"
+                )
+            )
+    recalcular_resumos(conexao)
+    return {
+        "usuarios": mecanicos + clientes + 1,
+        "veiculos": total_veiculos,
+        "servicos": servicos,
+        "orcamentos": id_orcamento,
+    }
+
+
+# ============= Dados de demonstração =============
+
+
+def popular_demonstracao():
+    """Usuários, veículos, serviços e orçamentos de exemplo (um commit)"""
+    senha = Usuario()
+    senha.set_senha(SENHA_PADRAO)
+
+    def usuario(nome, email, tipo):
+        novo = Usuario(nome=nome, email=email, tipo=tipo, senha_hash=senha.senha_hash)
+        db.session.add(novo)
+        return novo
+
+    gerente = usuario("Maria Silva", "gerente@oficina.com", TipoUsuario.GERENTE)
+    mecanico1 = usuario("João Mecânico", "joao@oficina.com", TipoUsuario.MECANICO)
+    mecanico2 = usuario("Pedro Mecânico", "pedro@oficina.com", TipoUsuario.MECANICO)
+    cliente1 = usuario("Carlos Cliente", "carlos@email.com", TipoUsuario.CLIENTE)
+    cliente2 = usuario("Ana Cliente", "ana@email.com", TipoUsuario.CLIENTE)
+    cliente3 = usuario("Roberto Silva", "roberto@email.com", TipoUsuario.CLIENTE)
+    db.session.flush()
+
+    veiculos_data = [
+        ("ABC1234", "Civic", "Honda", 2020, cliente1),
+        ("DEF5678", "Corolla", "Toyota", 2019, cliente1),
+        ("GHI9012", "Gol", "Volkswagen", 2018, cliente2),
+        ("JKL3456", "Onix", "Chevrolet", 2021, cliente2),
+        ("MNO7890", "HB20", "Hyundai", 2022, cliente3),
+        ("PQR1357", "Uno", "Fiat", 2015, cliente3),
+    ]
+    veiculos = [
+        Veiculo(placa=placa, modelo=modelo, marca=marca, ano=ano, usuario_id=dono.id)
+        for placa, modelo, marca, ano, dono in veiculos_data
+    ]
+    db.session.add_all(veiculos)
+    db.session.flush()
+
+    servicos_data = [
+        ("Troca de óleo e filtros", StatusServico.CONCLUIDO, 250.00, 0, mecanico1),
+        ("Alinhamento e balanceamento", StatusServico.EM_ANDAMENTO, 180.00, 1, mecanico1),
+        ("Revisão completa", StatusServico.PENDENTE, None, 2, None),
+        ("Troca de pastilhas de freio", StatusServico.EM_ANDAMENTO, 450.00, 3, mecanico2),
+        ("Troca de bateria", StatusServico.PENDENTE, None, 4, None),
+        ("Diagnóstico elétrico", StatusServico.CONCLUIDO, 320.00, 5, mecanico2),
+    ]
+    servicos = [
+        Servico(
+            descricao=descricao,
+            status=status,
+            valor=valor,
+            veiculo_id=veiculos[veiculo].id,
+            mecanico_id=mecanico.id if mecanico else None,
+        )
+        for descricao, status, valor, veiculo, mecanico in servicos_data
+    ]
+    db.session.add_all(servicos)
+    db.session.flush()
+
+    orcamentos_data = [
+        ("Óleo sintético 5W30 + filtros de óleo, ar e combustível", 250.00, 0),
+        ("Alinhamento 3D + balanceamento 4 rodas", 180.00, 1),
+        ("Revisão de 60mil km - peças e mão de obra", 850.00, 2),
+        ("Pastilhas + discos dianteiros", 450.00, 3),
+    ]
+    db.session.add_all(
+        Orcamento(descricao=descricao, valor=valor, servico_id=servicos[servico].id)
+        for descricao, valor, servico in orcamentos_data
+    )
+    db.session.commit()
+
+    print(f"✓ {Usuario.query.count()} usuários criados")
+    print(f"✓ {Veiculo.query.count()} veículos criados")
+    print(f"✓ {Servico.query.count()} serviços criados")
+    print(f"✓ {Orcamento.query.count()} orçamentos criados")
+    print("\n" + "=" * 50)
+    print("Banco de dados populado com sucesso!")
+    print("=" * 50)
+    print("\nUsuários criados:")
+    print(f"  Gerente: {gerente.email} / {SENHA_PADRAO}")
+    print(f"  Mecânico 1: {mecanico1.email} / {SENHA_PADRAO}")
+    print(f"  Mecânico 2: {mecanico2.email} / {SENHA_PADRAO}")
+    print(f"  Cliente 1: {cliente1.email} / {SENHA_PADRAO}")
+    print(f"  Cliente 2: {cliente2.email} / {SENHA_PADRAO}")
+    print(f"  Cliente 3: {cliente3.email} / {SENHA_PADRAO}")
+    print("\n" + "=" * 50)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clientes", type=int, help="gera a oficina sintética")
+    parser.add_argument("--veiculos-por-cliente", type=int, default=1)
+    parser.add_argument("--servicos", type=int, default=0)
+    parser.add_argument("--mecanicos", type=int, default=10)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument(
+        "--referencia",
+        type=datetime.fromisoformat,
+        help="data final do histórico (AAAA-MM-DD; padrão: hoje em UTC)",
+    )
+    parser.add_argument("--dias", type=int, default=3 * 365, help="extensão do histórico")
+    args = parser.parse_args(argumentos)
 
-def popular_banco():
     app = create_app()
-    
     with app.app_context():
-        # Limpar banco
         print("Limpando banco de dados...")
         db.drop_all()
         db.create_all()
-        
-        # Criar usuários
-        print("Criando usuários...")
-        
-        # Gerente
-        gerente = Usuario(
-            nome='Maria Silva',
-            email='gerente@oficina.com',
-            tipo='gerente'
-        )
-        gerente.set_senha('senha123')
-        db.session.add(gerente)
-        
-        # Mecânicos
-        mecanico1 = Usuario(
-            nome='João Mecânico',
-            email='joao@oficina.com',
-            tipo='mecanico'
-        )
-        mecanico1.set_senha('senha123')
-        db.session.add(mecanico1)
-        
-        mecanico2 = Usuario(
-            nome='Pedro Mecânico',
-            email='pedro@oficina.com',
-            tipo='mecanico'
-        )
-        mecanico2.set_senha('senha123')
-        db.session.add(mecanico2)
-        
-        # Clientes
-        cliente1 = Usuario(
-            nome='Carlos Cliente',
-            email='carlos@email.com',
-            tipo='cliente'
-        )
-        cliente1.set_senha('senha123')
-        db.session.add(cliente1)
-        
-        cliente2 = Usuario(
-            nome='Ana Cliente',
-            email='ana@email.com',
-            tipo='cliente'
-        )
-        cliente2.set_senha('senha123')
-        db.session.add(cliente2)
-        
-        cliente3 = Usuario(
-            nome='Roberto Silva',
-            email='roberto@email.com',
-            tipo='cliente'
+
+        if args.clientes is None and not args.servicos:
+            popular_demonstracao()
+            return
+
+        inicio = datetime.now()
+        quantidades = gerar_massa(
+            db.session.connection(),
+            clientes=args.clientes or 1,
+            veiculos_por_cliente=args.veiculos_por_cliente,
+            servicos=args.servicos,
+            mecanicos=args.mecanicos,
+            semente=args.semente,
+            referencia=args.referencia,
+            dias=args.dias,
         )
-        cliente3.set_senha('senha123')
-        db.session.add(cliente3)
-        
-        db.session.commit()
-        print(f"✓ {Usuario.query.count()} usuários criados")
-        
-        # Criar veículos
-        print("Criando veículos...")
-        
-        veiculos_data = [
-            {'placa': 'ABC1234', 'modelo': 'Civic', 'marca': 'Honda', 'ano': 2020, 'usuario': cliente1},
-            {'placa': 'DEF5678', 'modelo': 'Corolla', 'marca': 'Toyota', 'ano': 2019, 'usuario': cliente1},
-            {'placa': 'GHI9012', 'modelo': 'Gol', 'marca': 'Volkswagen', 'ano': 2018, 'usuario': cliente2},
-            {'placa': 'JKL3456', 'modelo': 'Onix', 'marca': 'Chevrolet', 'ano': 2021, 'usuario': cliente2},
-            {'placa': 'MNO7890', 'modelo': 'HB20', 'marca': 'Hyundai', 'ano': 2022, 'usuario': cliente3},
-            {'placa': 'PQR1357', 'modelo': 'Uno', 'marca': 'Fiat', 'ano': 2015, 'usuario': cliente3},
-        ]
-        
-        veiculos = []
-        for v_data in veiculos_data:
-            veiculo = Veiculo(
-                placa=v_data['placa'],
-                modelo=v_data['modelo'],
-                marca=v_data['marca'],
-                ano=v_data['ano'],
-                usuario_id=v_data['usuario'].id
-            )
-            db.session.add(veiculo)
-            veiculos.append(veiculo)
-        
         db.session.commit()
-        print(f"✓ {Veiculo.query.count()} veículos criados")
-        
-        # Criar serviços
-        print("Criando serviços...")
-        
-        servicos_data = [
-            {
-                'descricao': 'Troca de óleo e filtros',
-                'status': StatusServico.CONCLUIDO,
-                'valor': 250.00,
-                'veiculo': veiculos[0],
-                'mecanico': mecanico1
-            },
-            {
-                'descricao': 'Alinhamento e balanceamento',
-                'status': StatusServico.EM_ANDAMENTO,
-                'valor': 180.00,
-                'veiculo': veiculos[1],
-                'mecanico': mecanico1
-            },
-            {
-                'descricao': 'Revisão completa',
-                'status': StatusServico.PENDENTE,
-                'valor': None,
-                'veiculo': veiculos[2],
-                'mecanico': None
-            },
-            {
-                'descricao': 'Troca de pastilhas de freio',
-                'status': StatusServico.EM_ANDAMENTO,
-                'valor': 450.00,
-                'veiculo': veiculos[3],
-                'mecanico': mecanico2
-            },
-            {
-                'descricao': 'Troca de bateria',
-                'status': StatusServico.PENDENTE,
-                'valor': None,
-                'veiculo': veiculos[4],
-                'mecanico': None
-            },
-            {
-                'descricao': 'Diagnóstico elétrico',
-                'status': StatusServico.CONCLUIDO,
-                'valor': 320.00,
-                'veiculo': veiculos[5],
-                'mecanico': mecanico2
-            },
-        ]
-        
-        servicos = []
-        for s_data in servicos_data:
-            servico = Servico(
-                descricao=s_data['descricao'],
-                status=s_data['status'],
-                valor=s_data['valor'],
-                veiculo_id=s_data['veiculo'].id,
-                mecanico_id=s_data['mecanico'].id if s_data['mecanico'] else None
-            )
-            db.session.add(servico)
-            servicos.append(servico)
-        
-        db.session.commit()
-        print(f"✓ {Servico.query.count()} serviços criados")
-        
-        # Criar orçamentos
-        print("Criando orçamentos...")
-        
-        orcamentos_data = [
-            {
-                'descricao': 'Óleo sintético 5W30 + filtros de óleo, ar e combustível',
-                'valor': 250.00,
-                'servico': servicos[0]
-            },
-            {
-                'descricao': 'Alinhamento 3D + balanceamento 4 rodas',
-                'valor': 180.00,
-                'servico': servicos[1]
-            },
-            {
-                'descricao': 'Revisão de 60mil km - peças e mão de obra',
-                'valor': 850.00,
-                'servico': servicos[2]
-            },
-            {
-                'descricao': 'Pastilhas + discos dianteiros',
-                'valor': 450.00,
-                'servico': servicos[3]
-            },
-        ]
-        
-        for o_data in orcamentos_data:
-            orcamento = Orcamento(
-                descricao=o_data['descricao'],
-                valor=o_data['valor'],
-                servico_id=o_data['servico'].id
-            )
-            db.session.add(orcamento)
-        
-        db.session.commit()
-        print(f"✓ {Orcamento.query.count()} orçamentos criados")
-        
-        print("\n" + "="*50)
-        print("Banco de dados populado com sucesso!")
-        print("="*50)
-        print("\nUsuários criados:")
-        print(f"  Gerente: gerente@oficina.com / senha123")
-        print(f"  Mecânico 1: joao@oficina.com / senha123")
-        print(f"  Mecânico 2: pedro@oficina.com / senha123")
-        print(f"  Cliente 1: carlos@email.com / senha123")
-        print(f"  Cliente 2: ana@email.com / senha123")
-        print(f"  Cliente 3: roberto@email.com / senha123")
-        print("\n" + "="*50)
-
-
-if __name__ == '__main__':
-    popular_banco()
+        segundos = (datetime.now() - inicio).total_seconds()
+        print(", ".join(f"{n} {tabela}" for tabela, n in quantidades.items()))
+        print(f"Gerado em {segundos:.1f} s. Login: gerente@oficina.com / {SENHA_PADRAO}")
+
+
+if __name__ == "__main__":
+    main()
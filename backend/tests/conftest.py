@@ -1,4 +1,8 @@
+import itertools
+from contextlib import contextmanager
+
 import pytest
+from sqlalchemy import event
 from app import create_app
 from app.models import db, Usuario, Veiculo, Servico, Orcamento, TipoUsuario
 
@@ -11,6 +15,7 @@ def app():
             "TESTING": True,
             "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
             "SECRET_KEY": "test-secret-key",
+            "BCRYPT_LOG_ROUNDS": 4,
             "JWT_SECRET_KEY": "test-jwt-secret-key",
         }
     )
@@ -34,13 +39,32 @@ def runner(app):
     return app.test_cli_runner()
 
 
+@pytest.fixture
+def contar_queries(app):
+    """Context manager que conta as consultas SQL executadas no bloco"""
+
+    @contextmanager
+    def contador():
+        consultas = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            consultas.append(statement)
+
+        engine = db.engine
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            yield consultas
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+
+    return contador
+
+
 @pytest.fixture
 def usuario_cliente(app):
     """Cria um usuário cliente para testes"""
     with app.app_context():
-        usuario = Usuario(
-            nome="Cliente Teste", email="cliente@teste.com", tipo=TipoUsuario.CLIENTE
-        )
+        usuario = Usuario(nome="Cliente Teste", email="cliente@teste.com", tipo=TipoUsuario.CLIENTE)
         usuario.set_senha("senha123")
         db.session.add(usuario)
         db.session.commit()
@@ -54,13 +78,75 @@ def usuario_cliente(app):
         }
 
 
+class Fabrica:
+    """Cria usuários, veículos e serviços com valores padrão (flush, sem commit)"""
+
+    def __init__(self, cliente_id):
+        self.cliente_id = cliente_id
+        self._sequencia = itertools.count(1)
+
+    def usuario(self, tipo=TipoUsuario.CLIENTE, **campos):
+        numero = next(self._sequencia)
+        dados = {
+            "nome": f"Usuário {numero}",
+            "email": f"usuario{numero}@teste.com",
+            "senha_hash": "hash-fixo",
+            **campos,
+        }
+        usuario = Usuario(tipo=tipo, **dados)
+        db.session.add(usuario)
+        db.session.flush()
+        return usuario
+
+    def veiculo(self, usuario_id=None, **campos):
+        """Veículo do usuário informado (padrão: o usuario_cliente)"""
+        dados = {
+            "placa": f"TST{next(self._sequencia):04d}",
+            "modelo": "Gol",
+            "marca": "Volkswagen",
+            "ano": 2018,
+            **campos,
+        }
+        veiculo = Veiculo(usuario_id=usuario_id or self.cliente_id, **dados)
+        db.session.add(veiculo)
+        db.session.flush()
+        return veiculo
+
+    def servicos(self, quantidade=1, veiculo=None, orcamento=None, **campos):
+        """Serviços em um veículo (novo se omitido)
+
+        Campos chamáveis recebem o índice do serviço, ex.:
+        ``status=lambda i: StatusServico.CONCLUIDO if i < 2 else StatusServico.PENDENTE``.
+        Com ``orcamento``, cada serviço recebe um orçamento desse valor.
+        """
+        veiculo = veiculo or self.veiculo()
+        servicos = []
+        for i in range(quantidade):
+            dados = {"descricao": f"Serviço {i}"}
+            dados.update({k: v(i) if callable(v) else v for k, v in campos.items()})
+            servicos.append(Servico(veiculo_id=veiculo.id, **dados))
+        db.session.add_all(servicos)
+        db.session.flush()
+        if orcamento is not None:
+            db.session.add_all(
+                Orcamento(descricao="Peças", valor=orcamento, servico_id=servico.id)
+                for servico in servicos
+            )
+            db.session.flush()
+        return servicos
+
+
+@pytest.fixture
+def fabrica(app, usuario_cliente):
+    """Fábrica de usuários, veículos e serviços (veículos do usuario_cliente por padrão)"""
+    return Fabrica(usuario_cliente["id"])
+
+
 @pytest.fixture
 def usuario_gerente(app):
     """Cria um usuário gerente para testes"""
     with app.app_context():
-        usuario = Usuario(
-            nome="Gerente Teste", email="gerente@teste.com", tipo=TipoUsuario.GERENTE
-        )
+        usuario = Usuario(nome="Gerente Teste", email="gerente@teste.com", tipo=TipoUsuario.GERENTE)
         usuario.set_senha("senha123")
         db.session.add(usuario)
         db.session.commit()
@@ -95,9 +181,7 @@ def usuario_mecanico(app):
 @pytest.fixture
 def auth_headers_cliente(client, usuario_cliente):
     """Headers de autenticação para cliente"""
-    response = client.post(
-        "/auth/login", json={"email": "cliente@teste.com", "senha": "senha123"}
-    )
+    response = client.post("/auth/login", json={"email": "cliente@teste.com", "senha": "senha123"})
     token = response.get_json()["token"]
     return {"Authorization": f"Bearer {token}"}
 
@@ -105,9 +189,7 @@ def auth_headers_cliente(client, usuario_cliente):
 @pytest.fixture
 def auth_headers_gerente(client, usuario_gerente):
     """Headers de autenticação para gerente"""
-    response = client.post(
-        "/auth/login", json={"email": "gerente@teste.com", "senha": "senha123"}
-    )
+    response = client.post("/auth/login", json={"email": "gerente@teste.com", "senha": "senha123"})
     token = response.get_json()["token"]
     return {"Authorization": f"Bearer {token}"}
 
@@ -115,8 +197,6 @@ def auth_headers_gerente(client, usuario_gerente):
 @pytest.fixture
 def auth_headers_mecanico(client, usuario_mecanico):
     """Headers de autenticação para mecânico"""
-    response = client.post(
-        "/auth/login", json={"email": "mecanico@teste.com", "senha": "senha123"}
-    )
+    response = client.post("/auth/login", json={"email": "mecanico@teste.com", "senha": "senha123"})
     token = response.get_json()["token"]
     return {"Authorization": f"Bearer {token}"}
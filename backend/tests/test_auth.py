@@ -1,3 +1,11 @@
+import time
+import bcrypt
+import jwt
+from app import create_app
+from app.models import db, Usuario, TipoUsuario
+from app.utils import RegistroTokens, revogar_tokens_usuario
+
+
 def test_registro_usuario(client):
     """Testa o registro de um novo usuário"""
     response = client.post(
@@ -68,3 +76,186 @@ def test_perfil_sem_autenticacao(client):
     """Testa acesso ao perfil sem token"""
     response = client.get("/auth/perfil")
     assert response.status_code == 401
+
+
+def test_custo_bcrypt_configuravel(app, usuario_cliente):
+    """Testa que o hash usa o custo definido em BCRYPT_LOG_ROUNDS"""
+    usuario = db.session.get(Usuario, usuario_cliente["id"])
+    assert usuario.senha_hash.startswith("$2b$04$")
+    assert not usuario.precisa_rehash()
+
+
+def test_login_recalcula_hash_com_custo_antigo(client, app, usuario_cliente):
+    """Testa que o login atualiza hashes gerados com outro custo"""
+    usuario = db.session.get(Usuario, usuario_cliente["id"])
+    usuario.senha_hash = bcrypt.hashpw(b"senha123", bcrypt.gensalt(5)).decode()
+    db.session.commit()
+
+    response = client.post(
+        "/auth/login", json={"email": "cliente@teste.com", "senha": "senha123"}
+    )
+    assert response.status_code == 200
+
+    db.session.expire_all()
+    usuario = db.session.get(Usuario, usuario_cliente["id"])
+    assert usuario.senha_hash.startswith("$2b$04$")
+    assert usuario.verificar_senha("senha123")
+
+
+def test_login_email_inexistente_verifica_hash_ficticio(client, monkeypatch):
+    """Testa que emails inexistentes também pagam uma verificação bcrypt"""
+    chamadas = []
+    checkpw = bcrypt.checkpw
+    monkeypatch.setattr(
+        bcrypt, "checkpw", lambda *args: chamadas.append(args) or checkpw(*args)
+    )
+
+    response = client.post(
+        "/auth/login", json={"email": "nao_existe@teste.com", "senha": "senha123"}
+    )
+    assert response.status_code == 401
+    assert len(chamadas) == 1
+    assert chamadas[0][1].startswith(b"$2b$04$")
+
+
+def test_token_verificado_uma_vez(client, auth_headers_cliente, monkeypatch):
+    """Testa que requisições repetidas com o mesmo token não refazem o decode"""
+    client.get("/auth/perfil", headers=auth_headers_cliente)
+
+    def falhar(*args, **kwargs):
+        raise AssertionError("jwt.decode chamado com token em cache")
+
+    monkeypatch.setattr(jwt, "decode", falhar)
+    response = client.get("/auth/perfil", headers=auth_headers_cliente)
+    assert response.status_code == 200
+
+
+def test_logout_revoga_token(client, auth_headers_cliente):
+    """Testa que o token deixa de valer logo após o logout"""
+    assert client.get("/auth/perfil", headers=auth_headers_cliente).status_code == 200
+
+    response = client.post("/auth/logout", headers=auth_headers_cliente)
+    assert response.status_code == 200
+
+    response = client.get("/auth/perfil", headers=auth_headers_cliente)
+    assert response.status_code == 401
+    assert response.get_json()["message"] == "Token revogado"
+
+
+def test_mudanca_de_tipo_revoga_tokens(
+    client, usuario_cliente, auth_headers_cliente, auth_headers_gerente
+):
+    """Testa que um token com o tipo antigo é recusado após a mudança"""
+    assert client.get("/auth/perfil", headers=auth_headers_cliente).status_code == 200
+
+    response = client.put(
+        f"/api/usuarios/{usuario_cliente['id']}",
+        headers=auth_headers_gerente,
+        json={"tipo": "mecanico"},
+    )
+    assert response.status_code == 200
+    assert client.get("/auth/perfil", headers=auth_headers_cliente).status_code == 401
+
+    # Um novo login emite um token válido com o novo tipo
+    response = client.post(
+        "/auth/login", json={"email": "cliente@teste.com", "senha": "senha123"}
+    )
+    token = response.get_json()["token"]
+    response = client.get("/auth/perfil", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.get_json()["tipo"] == "mecanico"
+
+
+def test_registro_tokens_limitado():
+    """Testa o descarte LRU e a expiração das entradas do cache"""
+    registro = RegistroTokens(max_itens=2)
+    futuro = time.time() + 60
+    for digest in ("a", "b", "c"):
+        registro.guardar(digest, {"usuario_id": 1, "exp": futuro})
+
+    assert registro.obter("a") is None
+    assert registro.obter("c") is not None
+
+    registro.guardar("d", {"usuario_id": 1, "exp": time.time() - 1})
+    assert registro.obter("d") is None
+
+
+class Compartilhado:
+    """Backend compartilhado em memória que conta as consultas"""
+
+    def __init__(self):
+        self.dados = {}
+        self.consultas = 0
+
+    def get(self, chave):
+        self.consultas += 1
+        return self.dados.get(chave)
+
+    def set(self, chave, valor, ttl):
+        self.dados[chave] = valor
+
+
+def test_revogacao_compartilhada_com_ttl(monkeypatch):
+    """Testa que a consulta sem revogação ao compartilhado vale por ttl_revogacao"""
+    agora = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: agora[0])
+    compartilhado = Compartilhado()
+    worker_a = RegistroTokens(compartilhado=compartilhado, ttl_revogacao=5)
+    worker_b = RegistroTokens(compartilhado=compartilhado, ttl_revogacao=5)
+    token = {"usuario_id": 1, "iat": 999.0, "exp": 5000}
+    outro = {"usuario_id": 1, "iat": 999.5, "exp": 5000}
+
+    assert not worker_b.revogado("token", token)
+    assert compartilhado.consultas == 2
+    assert not worker_b.revogado("token", token)
+    assert compartilhado.consultas == 2
+
+    # No próprio processo, na hora; nos demais, quando a consulta vence
+    worker_a.revogar("token", token["exp"])
+    assert worker_a.revogado("token", token)
+    assert not worker_b.revogado("token", token)
+    agora[0] += 5
+    assert worker_b.revogado("token", token)
+
+    assert not worker_b.revogado("outro", outro)
+    worker_a.revogar_usuario(1)
+    assert not worker_b.revogado("outro", outro)
+    agora[0] += 5
+    assert worker_b.revogado("outro", outro)
+
+
+def test_revogacao_compartilhada_entre_workers(tmp_path):
+    """Testa que o logout em um worker vale nos demais (cache sqlite compartilhado)"""
+    config = {
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'banco.db'}",
+        "BCRYPT_LOG_ROUNDS": 4,
+        "DASHBOARD_CACHE": "sqlite",
+        "DASHBOARD_CACHE_PATH": str(tmp_path / "cache.db"),
+        # Sem o TTL das consultas negativas: a revogação vale na hora
+        "JWT_REVOGACAO_TTL": 0,
+    }
+    worker_a, worker_b = create_app(config), create_app(config)
+    with worker_a.app_context():
+        db.create_all()
+        usuario = Usuario(nome="Cliente", email="multi@teste.com", tipo=TipoUsuario.CLIENTE)
+        usuario.set_senha("senha123")
+        db.session.add(usuario)
+        db.session.commit()
+        usuario_id = usuario.id
+
+    cliente_a, cliente_b = worker_a.test_client(), worker_b.test_client()
+    response = cliente_a.post("/auth/login", json={"email": "multi@teste.com", "senha": "senha123"})
+    headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+    # O worker B já tem o payload verificado em cache
+    assert cliente_b.get("/auth/perfil", headers=headers).status_code == 200
+
+    assert cliente_a.post("/auth/logout", headers=headers).status_code == 200
+    assert cliente_b.get("/auth/perfil", headers=headers).status_code == 401
+
+    response = cliente_a.post("/auth/login", json={"email": "multi@teste.com", "senha": "senha123"})
+    headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+    assert cliente_b.get("/auth/perfil", headers=headers).status_code == 200
+    with worker_a.app_context():
+        revogar_tokens_usuario(usuario_id)
+    assert cliente_b.get("/auth/perfil", headers=headers).status_code == 401
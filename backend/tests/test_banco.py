@@ -0,0 +1,78 @@
+"""Testes da criação do esquema fora do create_app"""
+import subprocess
+import sys
+import pytest
+from sqlalchemy import inspect, text
+from app import create_app
+from app.models import db
+
+ULTIMA_REVISAO = "f3c8a9d2b4e6"
+
+
+@pytest.fixture
+def app_arquivo(tmp_path):
+    """Aplicação com um banco SQLite em arquivo, ainda vazio"""
+    return create_app(
+        {"TESTING": True, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'banco.db'}"}
+    )
+
+
+def tabelas(app):
+    with app.app_context():
+        return set(inspect(db.engine).get_table_names())
+
+
+def revisao(app):
+    with app.app_context():
+        return db.session.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def test_create_app_nao_cria_tabelas(app_arquivo):
+    """Testa que subir a aplicação não executa DDL"""
+    assert tabelas(app_arquivo) == set()
+
+
+def test_banco_criar_em_banco_vazio(app_arquivo):
+    """Testa que o comando cria as tabelas e marca a última migração"""
+    runner = app_arquivo.test_cli_runner()
+    resultado = runner.invoke(args=["banco", "criar"])
+
+    assert resultado.exit_code == 0, resultado.output
+    assert "Esquema criado" in resultado.output
+    assert {"usuarios", "veiculos", "servicos", "resumos_diarios"} <= tabelas(app_arquivo)
+    assert revisao(app_arquivo) == ULTIMA_REVISAO
+
+    # Rodar de novo só aplica migrações pendentes (nenhuma)
+    resultado = runner.invoke(args=["banco", "criar"])
+    assert "Esquema atualizado" in resultado.output
+    assert revisao(app_arquivo) == ULTIMA_REVISAO
+
+
+def test_banco_criar_marca_banco_existente(app_arquivo):
+    """Testa que um banco do antigo create_all (sem alembic_version) só é marcado"""
+    with app_arquivo.app_context():
+        db.create_all()
+
+    resultado = app_arquivo.test_cli_runner().invoke(args=["banco", "criar"])
+
+    assert "Esquema marcado" in resultado.output
+    assert revisao(app_arquivo) == ULTIMA_REVISAO
+
+
+def test_wsgi_sem_flask_migrate():
+    """Testa que o import do pacote e o create_app do wsgi não carregam dotenv nem Alembic"""
+    codigo = (
+        "import sys, app\n"
+        "print('dotenv' in sys.modules)\n"
+        "app.create_app({'MIGRACOES': False, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})\n"
+        "print('alembic' in sys.modules)\n"
+    )
+    saida = subprocess.run(
+        [sys.executable, "-c", codigo], capture_output=True, text=True, check=True
+    ).stdout
+    assert saida.split() == ["False", "False"]
+
+
+def test_migracoes_registradas_por_padrao(app_arquivo):
+    """Testa que o create_app padrão (CLI) registra o Flask-Migrate"""
+    assert "migrate" in app_arquivo.extensions
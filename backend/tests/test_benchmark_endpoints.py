@@ -0,0 +1,44 @@
+"""Testes da suíte de benchmark das rotas (benchmarks/endpoints.py)"""
+import json
+from benchmarks.endpoints import BASELINE, CENARIOS, comparar, executar, nome_cenario
+
+DADOS = {"clientes": 5, "veiculos_por_cliente": 2, "servicos": 40, "mecanicos": 2, "semente": 1}
+
+
+def test_todas_as_rotas_respondem(tmp_path):
+    """Testa que cada rota dos blueprints medidos tem cenário e responde sem erro"""
+    relatorio = executar(DADOS, 2, str(tmp_path))
+
+    assert set(relatorio["rotas"]) == {nome_cenario(chave) for chave in CENARIOS}
+    for medida in relatorio["rotas"].values():
+        assert 0 < medida["p50_ms"] <= medida["p95_ms"] <= medida["p99_ms"]
+
+
+def test_baseline_cobre_os_cenarios():
+    """Testa que a baseline versionada foi regravada depois de novos cenários"""
+    with open(BASELINE, encoding="utf-8") as arquivo:
+        baseline = json.load(arquivo)
+    assert set(baseline["rotas"]) == {nome_cenario(chave) for chave in CENARIOS}
+
+
+def test_comparar_aponta_regressoes():
+    """Testa o limite relativo com folga e a contagem de consultas"""
+    base = {"p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0, "consultas": 3}
+    baseline = {"rotas": {"a": base, "b": base, "c": base}}
+    atual = {
+        "rotas": {
+            "a": dict(base, p50_ms=16.0),  # dentro de 10 * 1.5 + 2
+            "b": dict(base, p50_ms=18.0),
+            "c": dict(base, consultas=4),
+            "nova": dict(base, p50_ms=500.0),  # sem baseline: ignorada
+        }
+    }
+
+    regressoes = comparar(baseline, atual, limite=1.5, folga_ms=2.0)
+
+    assert len(regressoes) == 2
+    assert regressoes[0].startswith("b: p50 18.00 ms > 17.00 ms")
+    assert regressoes[1] == "c: 4 consultas (baseline 3)"
+    assert comparar(baseline, atual, limite=1.5, folga_ms=2.0, percentil="p95") == [
+        "c: 4 consultas (baseline 3)"
+    ]
@@ -0,0 +1,141 @@
+"""Testes do cache dos dashboards e da invalidação por commit"""
+import time
+from app import create_app
+from app.cache import CacheMemoria, CacheSQLite, chave_dashboard
+from app.models import db, Usuario, StatusServico, TipoUsuario
+
+
+def backend(app):
+    return app.extensions["cache_dashboard"]
+
+
+def test_cache_memoria_lru_e_ttl(monkeypatch):
+    """Testa o descarte do item menos usado e a expiração"""
+    cache = CacheMemoria(max_itens=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    assert cache.get("a") == 1
+    cache.set("c", 3, ttl=60)  # descarta "b", o menos usado
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    agora = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: agora + 61)
+    assert cache.get("a") is None
+
+
+def test_cache_sqlite_compartilhado(tmp_path):
+    """Testa que duas instâncias no mesmo arquivo enxergam os mesmos dados"""
+    caminho = str(tmp_path / "cache.db")
+    primeiro, segundo = CacheSQLite(caminho), CacheSQLite(caminho)
+
+    primeiro.set("dashboard:cliente:1:api:", {"total": 3}, ttl=60)
+    primeiro.set("dashboard:cliente:10:api:", {"total": 5}, ttl=60)
+    assert segundo.get("dashboard:cliente:1:api:") == {"total": 3}
+
+    segundo.delete_prefix(chave_dashboard("cliente", 1))
+    assert primeiro.get("dashboard:cliente:1:api:") is None
+    assert primeiro.get("dashboard:cliente:10:api:") == {"total": 5}
+
+    primeiro.set("expirado", 1, ttl=-1)
+    assert segundo.get("expirado") is None
+
+
+def test_dashboard_servido_do_cache(client, auth_headers_gerente, contar_queries):
+    """Testa que a segunda requisição não consulta o banco"""
+    primeira = client.get("/api/dashboard", headers=auth_headers_gerente)
+    with contar_queries() as consultas:
+        segunda = client.get("/api/dashboard", headers=auth_headers_gerente)
+
+    assert segunda.get_json() == primeira.get_json()
+    assert consultas == []
+
+
+def test_commit_invalida_dashboard(client, fabrica, auth_headers_gerente, auth_headers_cliente):
+    """Testa que um novo serviço aparece nos dashboards já em cache"""
+    veiculo_id = fabrica.veiculo().id
+    db.session.commit()
+    client.get("/api/dashboard", headers=auth_headers_gerente)
+    client.get("/api/dashboard", headers=auth_headers_cliente)
+
+    response = client.post(
+        "/api/servicos",
+        headers=auth_headers_cliente,
+        json={"descricao": "Troca de óleo", "veiculo_id": veiculo_id},
+    )
+    assert response.status_code == 201
+
+    gerente = client.get("/api/dashboard", headers=auth_headers_gerente).get_json()
+    cliente = client.get("/api/dashboard", headers=auth_headers_cliente).get_json()
+    assert gerente["estatisticas"]["total_servicos"] == 1
+    assert cliente["estatisticas"]["total_servicos"] == 1
+
+
+def test_invalidacao_apenas_das_chaves_afetadas(
+    client, app, fabrica, usuario_mecanico, auth_headers_mecanico
+):
+    """Testa que alterar um serviço não descarta o dashboard de outro mecânico"""
+    outro = fabrica.usuario(TipoUsuario.MECANICO)
+    (servico,) = fabrica.servicos(
+        mecanico_id=usuario_mecanico["id"], status=StatusServico.EM_ANDAMENTO
+    )
+    db.session.commit()
+
+    chave_mecanico = chave_dashboard("mecanico", usuario_mecanico["id"], "api")
+    chave_outro = chave_dashboard("mecanico", outro.id, "api")
+    backend(app).set(chave_mecanico, {"antigo": True}, ttl=60)
+    backend(app).set(chave_outro, {"antigo": True}, ttl=60)
+
+    servico.status = StatusServico.CONCLUIDO
+    db.session.commit()
+
+    assert backend(app).get(chave_mecanico) is None
+    assert backend(app).get(chave_outro) == {"antigo": True}
+    response = client.get("/api/dashboard", headers=auth_headers_mecanico)
+    assert response.get_json()["estatisticas"]["concluidos"] == 1
+
+
+def test_rollback_nao_invalida(app, usuario_gerente):
+    """Testa que alterações descartadas mantêm o cache"""
+    chave = chave_dashboard("gerente", usuario_gerente["id"], "api")
+    backend(app).set(chave, {"total": 1}, ttl=60)
+
+    db.session.add(
+        Usuario(
+            nome="Temporário",
+            email="tmp@teste.com",
+            tipo=TipoUsuario.CLIENTE,
+            senha_hash="hash-fixo",
+        )
+    )
+    db.session.flush()
+    db.session.rollback()
+
+    assert backend(app).get(chave) == {"total": 1}
+
+
+def test_dashboard_html_usa_cache(client, app, usuario_gerente, contar_queries):
+    """Testa que o dashboard HTML reaproveita as estatísticas em cache"""
+    client.post("/login", data={"email": "gerente@teste.com", "senha": "senha123"})
+    client.get("/dashboard")
+    with contar_queries() as sem_cache:
+        backend(app).clear()
+        client.get("/dashboard")
+    with contar_queries() as com_cache:
+        response = client.get("/dashboard")
+
+    assert response.status_code == 200
+    assert len(com_cache) < len(sem_cache)
+
+
+def test_cache_desativado():
+    """Testa que DASHBOARD_CACHE=nenhum não registra backend"""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "DASHBOARD_CACHE": "nenhum",
+        }
+    )
+    assert app.extensions["cache_dashboard"] is None
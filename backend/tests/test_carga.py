@@ -0,0 +1,84 @@
+"""Testes do teste de carga (benchmarks/carga.py) contra um servidor local"""
+import asyncio
+import socket
+import threading
+import pytest
+from werkzeug.serving import make_server
+from app import create_app
+from app.models import db
+from benchmarks.carga import Estatisticas, UsuarioVirtual, criar_usuarios, executar, ler_mix
+from seed import gerar_massa
+
+
+@pytest.fixture
+def servidor(tmp_path):
+    """Aplicação com a oficina sintética servida em uma thread (porta livre)"""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'carga.db'}",
+            "BCRYPT_LOG_ROUNDS": 4,
+            "MIGRACOES": False,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        gerar_massa(db.session.connection(), clientes=10, mecanicos=2, servicos=200)
+        db.session.commit()
+
+    http = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=http.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{http.server_port}"
+    http.shutdown()
+    with app.app_context():
+        db.engine.dispose()
+
+
+def test_perfis_sem_erros(servidor):
+    """Testa que os três perfis fazem login e executam as suas ações sem erros"""
+    estatisticas = Estatisticas()
+    usuarios = criar_usuarios(
+        9, ler_mix("cliente=1,mecanico=1,gerente=1"), 10, 2, servidor, estatisticas, 3
+    )
+
+    resumo = asyncio.run(executar(usuarios, estatisticas, duracao=1.5, pausa=0.01))
+
+    assert resumo["erros"] == 0, resumo["acoes"]
+    assert {acao.split()[0] for acao in resumo["acoes"]} == {"cliente", "mecanico", "gerente"}
+    assert {"cliente login", "gerente servicos", "mecanico atualizar status"} <= set(
+        resumo["acoes"]
+    )
+    for dados in resumo["acoes"].values():
+        assert sum(dados["histograma_ms"].values()) == dados["requisicoes"]
+    assert resumo["requisicoes"] == sum(d["requisicoes"] for d in resumo["acoes"].values())
+
+
+def test_erros_contabilizados(servidor):
+    """Testa que respostas de erro e falhas de conexão entram na taxa de erros"""
+    with socket.socket() as livre:
+        livre.bind(("127.0.0.1", 0))
+        porta_fechada = livre.getsockname()[1]
+    estatisticas = Estatisticas()
+    sem_conta = UsuarioVirtual("cliente", "ninguem@email.com", servidor, estatisticas, None)
+    sem_servidor = UsuarioVirtual(
+        "gerente", "gerente@oficina.com", f"http://127.0.0.1:{porta_fechada}", estatisticas, None
+    )
+
+    async def tentar():
+        await sem_conta.login()
+        await sem_servidor.login()
+
+    asyncio.run(tentar())
+    resumo = estatisticas.resumo(1)
+
+    assert resumo["taxa_erros"] == 1
+    assert resumo["acoes"]["cliente login"]["por_erro"] == {"401": 1}
+    assert resumo["acoes"]["gerente login"]["por_erro"] == {"conexao": 1}
+
+
+def test_mix_invalido():
+    """Testa a validação do mix de perfis"""
+    assert ler_mix("cliente=3, gerente=1") == {"cliente": 3, "gerente": 1}
+    with pytest.raises(ValueError, match="Mix inválido"):
+        ler_mix("visitante=5")
@@ -0,0 +1,58 @@
+"""Testes de orçamento de consultas das listagens de serviços"""
+import pytest
+from app.models import db, StatusServico
+
+# Máximo de consultas por requisição, independentemente da quantidade de linhas
+ORCAMENTO_CONSULTAS = {
+    "/api/servicos": 4,
+    "/api/dashboard": 8,
+    "/servicos": 4,
+    "/dashboard": 8,
+}
+
+
+@pytest.mark.parametrize("url", list(ORCAMENTO_CONSULTAS))
+@pytest.mark.parametrize("perfil", ["cliente", "mecanico", "gerente"])
+def test_orcamento_consultas_listagens(
+    app,
+    client,
+    fabrica,
+    usuario_mecanico,
+    usuario_gerente,
+    contar_queries,
+    perfil,
+    url,
+):
+    """Testa que listar N serviços custa um número fixo de consultas"""
+    email = f"{perfil}@teste.com"
+    token = client.post("/auth/login", json={"email": email, "senha": "senha123"}).get_json()[
+        "token"
+    ]
+    client.post("/login", data={"email": email, "senha": "senha123"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def medir():
+        with contar_queries() as consultas:
+            response = client.get(url, headers=headers)
+            assert response.status_code == 200
+        return len(consultas)
+
+    def popular(quantidade):
+        # Veículos de proprietários distintos, cada serviço com orçamento
+        for i in range(quantidade):
+            fabrica.servicos(
+                veiculo=fabrica.veiculo(fabrica.usuario().id if i % 2 else None),
+                orcamento=50,
+                mecanico_id=usuario_mecanico["id"],
+                status=StatusServico.EM_ANDAMENTO,
+            )
+        db.session.commit()
+
+    popular(2)
+    poucos = medir()
+
+    popular(12)
+    muitos = medir()
+
+    assert poucos == muitos
+    assert muitos <= ORCAMENTO_CONSULTAS[url]
@@ -0,0 +1,164 @@
+"""Testes do GET condicional (ETag e Last-Modified) da API"""
+from datetime import datetime, timedelta
+from app.models import db, Servico, Orcamento, StatusServico, Usuario, Veiculo
+
+
+def com_etag(headers, resposta):
+    return {**headers, "If-None-Match": resposta.headers["ETag"]}
+
+
+def envelhecer(servico_id, horas=1):
+    """Recua o atualizado_em do serviço (o segundo atual não vai no Last-Modified)"""
+    db.session.execute(
+        db.update(Servico)
+        .where(Servico.id == servico_id)
+        .values(atualizado_em=datetime.utcnow() - timedelta(hours=horas))
+    )
+    db.session.commit()
+
+
+def test_servico_nao_modificado(
+    client, fabrica, auth_headers_cliente, auth_headers_gerente, contar_queries
+):
+    """Testa o 304 do serviço com uma consulta, e a ETag nova a cada alteração"""
+    (servico,) = fabrica.servicos(orcamento=100)
+    db.session.commit()
+    url = f"/api/servicos/{servico.id}"
+
+    primeira = client.get(url, headers=auth_headers_cliente)
+    assert primeira.status_code == 200
+    assert primeira.get_json()["orcamentos"][0]["valor"] == 100
+    assert primeira.headers["Cache-Control"] in ("private, no-cache", "no-cache, private")
+
+    with contar_queries() as consultas:
+        resposta = client.get(url, headers=com_etag(auth_headers_cliente, primeira))
+    assert resposta.status_code == 304
+    assert resposta.data == b""
+    assert resposta.headers["ETag"] == primeira.headers["ETag"]
+    assert len(consultas) == 1
+
+    # Novo orçamento: muda valor_total e a lista de orçamentos
+    client.post(
+        f"{url}/orcamento", headers=auth_headers_gerente, json={"descricao": "Extra", "valor": 50}
+    )
+    segunda = client.get(url, headers=com_etag(auth_headers_cliente, primeira))
+    assert segunda.status_code == 200
+    assert len(segunda.get_json()["orcamentos"]) == 2
+
+    client.put(url, headers=auth_headers_gerente, json={"status": "em_andamento"})
+    terceira = client.get(url, headers=com_etag(auth_headers_cliente, segunda))
+    assert terceira.status_code == 200
+    assert terceira.get_json()["status"] == "em_andamento"
+
+
+def test_permissao_antes_do_304(client, fabrica, auth_headers_cliente, auth_headers_mecanico):
+    """Testa que a ETag não dispensa a verificação de acesso"""
+    (servico,) = fabrica.servicos()
+    db.session.commit()
+    url = f"/api/servicos/{servico.id}"
+    etag = client.get(url, headers=auth_headers_cliente).headers["ETag"]
+
+    resposta = client.get(url, headers={**auth_headers_mecanico, "If-None-Match": etag})
+    assert resposta.status_code == 403
+
+    resposta = client.get(
+        "/api/servicos/9999", headers={**auth_headers_cliente, "If-None-Match": "*"}
+    )
+    assert resposta.status_code == 404
+
+
+def test_if_modified_since(client, fabrica, usuario_cliente, auth_headers_cliente):
+    """Testa o Last-Modified do serviço, e que o do usuário não dispensa o corpo"""
+    (servico,) = fabrica.servicos()
+    db.session.commit()
+    url = f"/api/servicos/{servico.id}"
+
+    # Alterado neste segundo: sem Last-Modified
+    assert "Last-Modified" not in client.get(url, headers=auth_headers_cliente).headers
+
+    envelhecer(servico.id)
+    primeira = client.get(url, headers=auth_headers_cliente)
+    desde = {**auth_headers_cliente, "If-Modified-Since": primeira.headers["Last-Modified"]}
+    assert client.get(url, headers=desde).status_code == 304
+
+    # Alteração posterior (meia hora atrás)
+    envelhecer(servico.id, horas=0.5)
+    assert client.get(url, headers=desde).status_code == 200
+
+    # Veículos excluídos não mudam o maior timestamp: If-Modified-Since é ignorado
+    url = f"/api/usuarios/{usuario_cliente['id']}"
+    ontem = datetime.utcnow() - timedelta(days=1)
+    db.session.execute(db.update(Usuario).values(atualizado_em=ontem))
+    db.session.execute(db.update(Veiculo).values(atualizado_em=ontem))
+    db.session.commit()
+    resposta = client.get(url, headers=auth_headers_cliente)
+    assert "Last-Modified" in resposta.headers
+    desde = {**auth_headers_cliente, "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}
+    assert client.get(url, headers=desde).status_code == 200
+    assert client.get(url, headers=com_etag(auth_headers_cliente, resposta)).status_code == 304
+
+
+def test_veiculo_e_usuario(client, fabrica, usuario_cliente, auth_headers_cliente):
+    """Testa que alterar o veículo muda as ETags do veículo e do dono"""
+    veiculo = fabrica.veiculo()
+    db.session.commit()
+    url_veiculo = f"/api/veiculos/{veiculo.id}"
+    url_usuario = f"/api/usuarios/{usuario_cliente['id']}"
+
+    do_veiculo = client.get(url_veiculo, headers=auth_headers_cliente)
+    do_usuario = client.get(url_usuario, headers=auth_headers_cliente)
+    assert (
+        client.get(url_veiculo, headers=com_etag(auth_headers_cliente, do_veiculo)).status_code
+        == 304
+    )
+    assert (
+        client.get(url_usuario, headers=com_etag(auth_headers_cliente, do_usuario)).status_code
+        == 304
+    )
+
+    client.put(url_veiculo, headers=auth_headers_cliente, json={"modelo": "Polo"})
+    resposta = client.get(url_veiculo, headers=com_etag(auth_headers_cliente, do_veiculo))
+    assert resposta.status_code == 200
+    assert resposta.get_json()["modelo"] == "Polo"
+    assert (
+        client.get(url_usuario, headers=com_etag(auth_headers_cliente, do_usuario)).status_code
+        == 200
+    )
+
+    # Serviço novo no veículo
+    do_veiculo = resposta
+    fabrica.servicos(veiculo=veiculo)
+    db.session.commit()
+    resposta = client.get(url_veiculo, headers=com_etag(auth_headers_cliente, do_veiculo))
+    assert resposta.status_code == 200
+    assert len(resposta.get_json()["servicos"]) == 1
+
+
+def test_listagem_condicional(client, fabrica, auth_headers_gerente, contar_queries):
+    """Testa a ETag da página: itens, orçamentos, próxima página e total"""
+    servicos = fabrica.servicos(3)
+    db.session.commit()
+    url = "/api/servicos?limit=2&total=1"
+
+    primeira = client.get(url, headers=auth_headers_gerente)
+    assert primeira.get_json()["total_registros"] == 3
+    with contar_queries() as consultas:
+        resposta = client.get(url, headers=com_etag(auth_headers_gerente, primeira))
+    assert resposta.status_code == 304
+    # Versão da janela e COUNT
+    assert len(consultas) == 2
+
+    # Orçamento em um item da página
+    db.session.add(Orcamento(descricao="Peças", valor=80, servico_id=servicos[0].id))
+    db.session.commit()
+    segunda = client.get(url, headers=com_etag(auth_headers_gerente, primeira))
+    assert segunda.status_code == 200
+    assert segunda.get_json()["servicos"][0]["valor_total"] == 80
+
+    # Serviço novo fora da janela: só o total muda
+    fabrica.servicos(status=StatusServico.PENDENTE)
+    db.session.commit()
+    terceira = client.get(url, headers=com_etag(auth_headers_gerente, segunda))
+    assert terceira.status_code == 200
+    assert terceira.get_json()["total_registros"] == 4
+    assert client.get(url, headers=com_etag(auth_headers_gerente, terceira)).status_code == 304
@@ -0,0 +1,97 @@
+"""Testes das opções do pool de conexões e das estatísticas"""
+import logging
+from app import create_app
+from app.conexoes import opcoes_engine, estatisticas_pool
+from app.models import db
+
+POSTGRES = "postgresql://postgres:postgres@db:5432/mecanica_db"
+
+
+def test_opcoes_padrao_postgres():
+    """Testa os valores padrão do pool para o PostgreSQL"""
+    assert opcoes_engine(POSTGRES, {}) == {
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+    }
+
+
+def test_opcoes_por_variaveis_de_ambiente():
+    """Testa os ajustes por variável de ambiente e o statement_timeout"""
+    ambiente = {
+        "DB_POOL_SIZE": "20",
+        "DB_MAX_OVERFLOW": "0",
+        "DB_POOL_TIMEOUT": "5",
+        "DB_POOL_RECYCLE": "300",
+        "DB_POOL_PRE_PING": "false",
+        "DB_STATEMENT_TIMEOUT_MS": "15000",
+    }
+    assert opcoes_engine(POSTGRES, ambiente) == {
+        "pool_pre_ping": False,
+        "pool_recycle": 300,
+        "pool_size": 20,
+        "max_overflow": 0,
+        "pool_timeout": 5,
+        "connect_args": {"options": "-c statement_timeout=15000"},
+    }
+
+
+def test_opcoes_sqlite_sem_tamanho_de_pool():
+    """Testa que o SQLite não recebe opções de tamanho nem statement_timeout"""
+    ambiente = {"DB_POOL_SIZE": "20", "DB_STATEMENT_TIMEOUT_MS": "15000"}
+    assert opcoes_engine("sqlite:///:memory:", ambiente) == {
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+    }
+
+
+def test_create_app_aplica_opcoes(tmp_path, monkeypatch, caplog):
+    """Testa as opções no engine e o aviso de pool esgotado"""
+    monkeypatch.setenv("DB_POOL_RECYCLE", "120")
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'pool.db'}",
+        }
+    )
+    assert app.config["SQLALCHEMY_ENGINE_OPTIONS"]["pool_recycle"] == 120
+
+    with app.app_context():
+        pool = db.engine.pool
+        assert pool._recycle == 120 and pool._pre_ping
+
+        maximo = estatisticas_pool()["maximo"]
+        conexoes = []
+        with caplog.at_level(logging.WARNING, logger="app.conexoes"):
+            for _ in range(maximo):
+                conexoes.append(db.engine.connect())
+        assert estatisticas_pool()["em_uso"] == maximo
+        assert "Pool de conexões esgotado" in caplog.text
+        for conexao in conexoes:
+            conexao.close()
+
+
+def test_opcoes_explicitas_prevalecem():
+    """Testa que SQLALCHEMY_ENGINE_OPTIONS informado não é substituído"""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQLALCHEMY_ENGINE_OPTIONS": {"echo": False},
+        }
+    )
+    assert app.config["SQLALCHEMY_ENGINE_OPTIONS"] == {"echo": False}
+
+
+def test_endpoint_pool(client, auth_headers_gerente, auth_headers_cliente):
+    """Testa as estatísticas do pool expostas ao gerente"""
+    response = client.get("/api/sistema/pool", headers=auth_headers_gerente)
+    assert response.status_code == 200
+    dados = response.get_json()
+    assert dados["pool"]["classe"]
+    assert dados["configuracao"]["pool_pre_ping"] is True
+
+    response = client.get("/api/sistema/pool", headers=auth_headers_cliente)
+    assert response.status_code == 403
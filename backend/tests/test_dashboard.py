@@ -0,0 +1,152 @@
+"""Testes das agregações dos dashboards do gerente e do mecânico"""
+from datetime import datetime
+from app.models import db, Veiculo, Servico, StatusServico, TipoUsuario
+from app import estatisticas
+from app.estatisticas import (
+    resumo_gerente,
+    resumo_mecanico,
+    estatisticas_mecanicos,
+    inicio_do_mes,
+)
+
+
+def criar_oficina(fabrica, quantidade_mecanicos):
+    """Cria mecânicos com um serviço aguardando e um concluído no mesmo veículo"""
+    veiculo = Veiculo.query.first() or fabrica.veiculo()
+    for _ in range(quantidade_mecanicos):
+        mecanico = fabrica.usuario(TipoUsuario.MECANICO)
+        fabrica.servicos(
+            2,
+            veiculo=veiculo,
+            mecanico_id=mecanico.id,
+            status=lambda i: (StatusServico.AGUARDANDO_ORCAMENTO, StatusServico.CONCLUIDO)[i],
+            valor=lambda i: (None, 100)[i],
+            data_conclusao=lambda i: (None, datetime.utcnow())[i],
+        )
+    db.session.commit()
+
+
+def test_resumo_gerente_valores(app, fabrica):
+    """Testa os valores agregados do resumo do gerente"""
+    with app.app_context():
+        criar_oficina(fabrica, 3)
+
+        resumo = resumo_gerente()
+
+        assert resumo["total_clientes"] == 1
+        assert resumo["total_mecanicos"] == 3
+        assert resumo["total_veiculos"] == 1
+        assert resumo["total_servicos"] == 6
+        assert resumo["receita"] == 300.0
+        assert resumo["servicos_ativos"] == 3
+        assert resumo["por_status"]["concluido"] == 3
+        assert resumo["por_status"]["cancelado"] == 0
+
+        mecanicos = estatisticas_mecanicos()
+        assert len(mecanicos) == 3
+        for mecanico in mecanicos:
+            assert mecanico["aguardando"] == 1
+            assert mecanico["em_andamento"] == 0
+            assert mecanico["concluidos"] == 1
+            assert mecanico["total"] == 2
+
+
+def test_estatisticas_mecanicos_concluidos_fora_do_mes(app, fabrica):
+    """Testa que concluídos de outros meses não contam como concluídos no mês"""
+    with app.app_context():
+        criar_oficina(fabrica, 1)
+        Servico.query.filter_by(status=StatusServico.CONCLUIDO).update(
+            {"data_conclusao": datetime(2000, 1, 15)}
+        )
+        db.session.commit()
+
+        mecanico = estatisticas_mecanicos()[0]
+        assert mecanico["concluidos"] == 0
+        assert mecanico["total"] == 2
+
+
+def test_resumo_gerente_queries_constantes(app, fabrica, contar_queries):
+    """Testa que o número de consultas não cresce com a quantidade de mecânicos"""
+    with app.app_context():
+        criar_oficina(fabrica, 2)
+        with contar_queries() as poucos:
+            resumo_gerente()
+
+        criar_oficina(fabrica, 40)
+        with contar_queries() as muitos:
+            resumo = resumo_gerente()
+
+        assert len(resumo["mecanicos"]) == 42
+        assert len(poucos) == len(muitos)
+
+
+def test_dashboard_endpoints_queries_constantes(
+    app, client, fabrica, usuario_gerente, auth_headers_gerente, contar_queries
+):
+    """Testa que HTML e API do dashboard têm custo fixo em consultas"""
+    client.post("/login", data={"email": "gerente@teste.com", "senha": "senha123"})
+
+    def medir():
+        with contar_queries() as api:
+            response = client.get("/api/dashboard", headers=auth_headers_gerente)
+            assert response.status_code == 200
+        with contar_queries() as html:
+            response = client.get("/dashboard")
+            assert response.status_code == 200
+        return len(api), len(html)
+
+    with app.app_context():
+        criar_oficina(fabrica, 2)
+    poucos = medir()
+
+    with app.app_context():
+        criar_oficina(fabrica, 40)
+    muitos = medir()
+
+    assert poucos == muitos
+    response = client.get("/api/dashboard", headers=auth_headers_gerente)
+    assert len(response.get_json()["mecanicos"]) == 42
+
+
+def test_resumo_mecanico(app, fabrica, usuario_mecanico, contar_queries):
+    """Testa o resumo do mecânico: os sem mecânico contam só em aguardando"""
+    with app.app_context():
+        criar_oficina(fabrica, 1)
+        mecanico_id = usuario_mecanico["id"]
+        fabrica.servicos(
+            3,
+            mecanico_id=mecanico_id,
+            status=lambda i: (
+                StatusServico.EM_ANDAMENTO,
+                StatusServico.CONCLUIDO,
+                StatusServico.AGUARDANDO_ORCAMENTO,
+            )[i],
+        )
+        fabrica.servicos(2, status=StatusServico.AGUARDANDO_ORCAMENTO)
+        db.session.commit()
+
+        with contar_queries() as consultas:
+            resumo = resumo_mecanico(mecanico_id)
+        assert len(consultas) == 1
+        assert resumo == {
+            "aguardando_orcamento": 3,
+            "em_andamento": 1,
+            "concluidos_mes": 1,
+            "total_servicos": 3,
+        }
+
+
+def test_mes_corrente_em_utc(monkeypatch):
+    """Testa que o mês corrente segue o relógio UTC dos timestamps gravados"""
+
+    class Relogio(datetime):
+        @classmethod
+        def utcnow(cls):
+            return cls(2025, 2, 1, 0, 30)  # 21:30 de 31/01 em UTC-3
+
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2025, 1, 31, 21, 30)
+
+    monkeypatch.setattr(estatisticas, "datetime", Relogio)
+    assert inicio_do_mes() == (datetime(2025, 2, 1), datetime(2025, 3, 1))
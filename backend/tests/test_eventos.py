@@ -0,0 +1,196 @@
+"""Testes dos eventos de serviços (/api/eventos)"""
+import json
+from app import create_app
+from app.eventos import canais_inscricao
+from app.models import db, Orcamento, StatusServico, TipoUsuario
+
+
+def inscrever(app, usuario_id, tipo):
+    return app.extensions["eventos"].inscrever(canais_inscricao(usuario_id, tipo))
+
+
+def recebidos(inscricao):
+    """(tipo, dados) dos eventos na fila, esvaziando-a"""
+    eventos = []
+    while not inscricao.fila.empty():
+        evento = inscricao.fila.get_nowait()
+        eventos.append((evento["tipo"], evento["dados"]))
+    return eventos
+
+
+def test_fluxo_sse(
+    client, app, fabrica, usuario_mecanico, auth_headers_cliente, auth_headers_gerente
+):
+    """Testa o fluxo do cliente recebendo a mudança de status feita pelo gerente"""
+    (servico,) = fabrica.servicos(mecanico_id=usuario_mecanico["id"], status=StatusServico.PENDENTE)
+    db.session.commit()
+
+    resposta = client.get("/api/eventos", headers=auth_headers_cliente, buffered=False)
+    assert resposta.status_code == 200
+    assert resposta.mimetype == "text/event-stream"
+    assert resposta.headers["X-Accel-Buffering"] == "no"
+    fluxo = iter(resposta.response)
+    assert b"retry: 3000" in next(fluxo)
+
+    atualizacao = client.put(
+        f"/api/servicos/{servico.id}", headers=auth_headers_gerente, json={"status": "em_andamento"}
+    )
+    assert atualizacao.status_code == 200
+
+    tipo, dados = next(fluxo).decode().strip().split("\n")
+    assert tipo == "event: servico_status"
+    assert json.loads(dados.removeprefix("data: ")) == {
+        "servico_id": servico.id,
+        "de": "pendente",
+        "para": "em_andamento",
+    }
+
+    resposta.close()
+    assert len(app.extensions["eventos"].corretor) == 0
+
+
+def test_destinatarios(app, fabrica, usuario_cliente, usuario_mecanico, usuario_gerente):
+    """Testa quem recebe a criação, o orçamento e a aprovação de um serviço"""
+    outro_cliente = fabrica.usuario()
+    outro_mecanico = fabrica.usuario(TipoUsuario.MECANICO)
+    db.session.commit()
+    cliente = inscrever(app, usuario_cliente["id"], "cliente")
+    alheio = inscrever(app, outro_cliente.id, "cliente")
+    mecanico = inscrever(app, usuario_mecanico["id"], "mecanico")
+    colega = inscrever(app, outro_mecanico.id, "mecanico")
+    gerente = inscrever(app, usuario_gerente["id"], "gerente")
+
+    # Aguardando orçamento sem mecânico: todos os mecânicos podem assumir
+    (servico,) = fabrica.servicos(status=StatusServico.AGUARDANDO_ORCAMENTO)
+    db.session.commit()
+    criado = (
+        "servico_status",
+        {"servico_id": servico.id, "de": None, "para": "aguardando_orcamento"},
+    )
+    for inscricao in (cliente, mecanico, colega, gerente):
+        assert recebidos(inscricao) == [criado]
+
+    servico.mecanico_id = usuario_mecanico["id"]
+    db.session.add(Orcamento(servico_id=servico.id, descricao="Pastilhas", valor=320))
+    db.session.commit()
+    orcamento = ("orcamento_criado", {"servico_id": servico.id, "orcamento_id": 1, "valor": 320.0})
+    for inscricao in (cliente, mecanico, gerente):
+        assert recebidos(inscricao) == [orcamento]
+    assert recebidos(colega) == []
+
+    servico.status = StatusServico.ORCAMENTO_APROVADO
+    db.session.commit()
+    aprovado = (
+        "orcamento_aprovado",
+        {"servico_id": servico.id, "de": "aguardando_orcamento", "para": "orcamento_aprovado"},
+    )
+    for inscricao in (cliente, mecanico, gerente):
+        assert recebidos(inscricao) == [aprovado]
+    assert recebidos(colega) == recebidos(alheio) == []
+
+
+def test_rollback_e_lote(
+    client, app, fabrica, usuario_cliente, usuario_mecanico, auth_headers_gerente
+):
+    """Testa que um rollback não publica e que o lote publica só o que mudou de status"""
+    servicos = fabrica.servicos(
+        2, mecanico_id=usuario_mecanico["id"], status=StatusServico.PENDENTE
+    )
+    db.session.commit()
+    cliente = inscrever(app, usuario_cliente["id"], "cliente")
+
+    servicos[0].status = StatusServico.CANCELADO
+    db.session.flush()
+    db.session.rollback()
+    assert recebidos(cliente) == []
+
+    resposta = client.post(
+        "/api/servicos/batch",
+        headers=auth_headers_gerente,
+        json=[{"id": servicos[0].id, "status": "concluido"}, {"id": servicos[1].id, "valor": 90}],
+    )
+    assert resposta.get_json()["atualizados"] == 2
+    assert recebidos(cliente) == [
+        ("servico_status", {"servico_id": servicos[0].id, "de": "pendente", "para": "concluido"})
+    ]
+
+
+def test_sem_inscritos_nada_capturado(app, fabrica):
+    """Testa que, com o backend local e ninguém escutando, as escritas não pagam nada"""
+    (servico,) = fabrica.servicos(status=StatusServico.PENDENTE)
+    servico.status = StatusServico.CONCLUIDO
+    db.session.flush()
+
+    assert "eventos" not in db.session.info
+    db.session.commit()
+
+
+def test_autenticacao(client, app, usuario_cliente, auth_headers_cliente):
+    """Testa token no cabeçalho, o ticket em ?ticket= (EventSource) e a sessão das páginas"""
+    assert client.get("/api/eventos").status_code == 401
+    assert client.get("/api/eventos?ticket=invalido").status_code == 401
+
+    # O token da API não vai na URL
+    token = auth_headers_cliente["Authorization"].split()[1]
+    assert client.get(f"/api/eventos?ticket={token}").status_code == 401
+    assert client.get(f"/api/eventos?token={token}").status_code == 401
+
+    assert client.post("/api/eventos/ticket").status_code == 401
+    gerado = client.post("/api/eventos/ticket", headers=auth_headers_cliente).get_json()
+    assert gerado["validade"] == 30
+    resposta = client.get(f"/api/eventos?ticket={gerado['ticket']}", buffered=False)
+    assert resposta.status_code == 200
+    resposta.close()
+
+    # O ticket não vale como token da API
+    ticket = {"Authorization": f"Bearer {gerado['ticket']}"}
+    assert client.get("/api/eventos", headers=ticket).status_code == 401
+    assert client.get("/api/servicos", headers=ticket).status_code == 401
+
+    with client.session_transaction() as sessao:
+        sessao.update(user_id=usuario_cliente["id"], tipo_usuario="cliente")
+    resposta = client.get("/api/eventos", buffered=False)
+    assert resposta.status_code == 200
+    resposta.close()
+    assert len(app.extensions["eventos"].corretor) == 0
+
+
+def test_limite_de_conexoes(client, app, monkeypatch, auth_headers_cliente):
+    """Testa o 503 com Retry-After quando o processo está no limite de conexões"""
+    monkeypatch.setattr(app.extensions["eventos"], "max_conexoes", 1)
+    primeira = client.get("/api/eventos", headers=auth_headers_cliente, buffered=False)
+    assert primeira.status_code == 200
+
+    lotado = client.get("/api/eventos", headers=auth_headers_cliente)
+    assert lotado.status_code == 503
+    assert lotado.headers["Retry-After"] == "30"
+
+    primeira.close()
+    segunda = client.get("/api/eventos", headers=auth_headers_cliente, buffered=False)
+    assert segunda.status_code == 200
+    segunda.close()
+    assert len(app.extensions["eventos"].corretor) == 0
+
+
+def test_paginas_com_atualizacao(client, fabrica, usuario_gerente):
+    """Testa que dashboard, lista e detalhe dos serviços carregam o eventos.js"""
+    (servico,) = fabrica.servicos()
+    db.session.commit()
+    client.post("/login", data={"email": "gerente@teste.com", "senha": "senha123"})
+
+    for url in ("/dashboard", "/servicos"):
+        pagina = client.get(url).get_data(as_text=True)
+        assert "js/eventos.js" in pagina
+        assert 'data-servico-id=""' in pagina
+    detalhe = client.get(f"/servicos/{servico.id}").get_data(as_text=True)
+    assert f'data-servico-id="{servico.id}"' in detalhe
+    assert "js/eventos.js" not in client.get("/veiculos").get_data(as_text=True)
+
+
+def test_eventos_desativados():
+    """Testa que EVENTOS_BACKEND=nenhum remove o fluxo"""
+    app = create_app(
+        {"TESTING": True, "SQLALCHEMY_DATABASE_URI": "sqlite://", "EVENTOS_BACKEND": "nenhum"}
+    )
+    assert app.extensions["eventos"] is None
+    assert app.test_client().get("/api/eventos").status_code == 404
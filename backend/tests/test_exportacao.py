@@ -0,0 +1,109 @@
+"""Testes da exportação em streaming (NDJSON/CSV)"""
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from app.models import db, Servico, Orcamento, StatusServico
+from app.routes import exportacao
+
+
+@pytest.fixture
+def historico(fabrica, usuario_mecanico):
+    """Serviços do cliente em dois anos e um serviço de outro cliente"""
+    veiculo = fabrica.veiculo(placa="EXP0001")
+    servicos = fabrica.servicos(
+        10,
+        veiculo=veiculo,
+        mecanico_id=lambda i: usuario_mecanico["id"] if i % 2 else None,
+        status=lambda i: StatusServico.CONCLUIDO if i < 4 else StatusServico.PENDENTE,
+        valor=lambda i: Decimal("100.00") if i < 4 else None,
+        criado_em=lambda i: datetime(2024 if i < 3 else 2025, 1, 1 + i),
+    )
+    fabrica.servicos(veiculo=fabrica.veiculo(fabrica.usuario().id), descricao="De outro")
+    db.session.add(Orcamento(descricao="Peças", valor=Decimal("55.00"), servico_id=servicos[5].id))
+    db.session.commit()
+
+
+def ler_ndjson(response):
+    return [json.loads(linha) for linha in response.data.decode().splitlines()]
+
+
+def test_exporta_servicos_ndjson(client, historico, auth_headers_gerente):
+    """Testa o NDJSON completo no mesmo formato de to_dict"""
+    response = client.get("/api/export/servicos", headers=auth_headers_gerente)
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert response.is_streamed
+    linhas = ler_ndjson(response)
+    esperado = [s.to_dict() for s in Servico.query.order_by(Servico.criado_em)]
+    assert linhas == esperado
+    assert {"Serviço 5": 55.0}.items() <= {s["descricao"]: s["valor_total"] for s in linhas}.items()
+
+
+def test_exporta_servicos_csv_com_filtros(client, historico, auth_headers_gerente):
+    """Testa o CSV com filtro de status e período"""
+    response = client.get(
+        "/api/export/servicos?formato=csv&status=concluido"
+        "&data_inicio=2025-01-01&data_fim=2025-12-31",
+        headers=auth_headers_gerente,
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert "servicos.csv" in response.headers["Content-Disposition"]
+    linhas = list(csv.DictReader(io.StringIO(response.data.decode())))
+    assert [linha["descricao"] for linha in linhas] == ["Serviço 3"]
+    assert linhas[0]["status"] == "concluido"
+    assert linhas[0]["data_previsao"] == ""
+
+
+def test_exportacao_respeita_tipo_de_usuario(
+    client, historico, auth_headers_cliente, auth_headers_mecanico
+):
+    """Testa que cliente e mecânico exportam apenas o que podem ver"""
+    cliente = ler_ndjson(client.get("/api/export/servicos", headers=auth_headers_cliente))
+    assert len(cliente) == 10
+    assert "De outro" not in [s["descricao"] for s in cliente]
+
+    mecanico = ler_ndjson(client.get("/api/export/servicos", headers=auth_headers_mecanico))
+    assert len(mecanico) == 5
+
+    veiculos = ler_ndjson(client.get("/api/export/veiculos", headers=auth_headers_cliente))
+    assert [v["placa"] for v in veiculos] == ["EXP0001"]
+
+
+def test_exporta_orcamentos(client, historico, auth_headers_gerente):
+    """Testa a exportação de orçamentos e o filtro pelo status do serviço"""
+    response = client.get("/api/export/orcamentos", headers=auth_headers_gerente)
+    assert [o["valor"] for o in ler_ndjson(response)] == [55.0]
+
+    response = client.get("/api/export/orcamentos?status=concluido", headers=auth_headers_gerente)
+    assert ler_ndjson(response) == []
+
+
+def test_exportacao_em_lotes(client, historico, auth_headers_gerente, monkeypatch):
+    """Testa que a resposta é gerada um lote por vez"""
+    monkeypatch.setattr(exportacao, "TAMANHO_LOTE", 4)
+    response = client.get("/api/export/servicos", headers=auth_headers_gerente)
+
+    blocos = [bloco for bloco in response.response if bloco]
+    assert len(blocos) == 3  # 11 serviços em lotes de 4
+    assert sum(bloco.count(b"\n") for bloco in blocos) == 11
+
+
+@pytest.mark.parametrize(
+    "parametros",
+    ["formato=xml", "data_inicio=01/01/2025", "status=inexistente"],
+)
+def test_exportacao_parametros_invalidos(client, auth_headers_gerente, parametros):
+    """Testa a validação dos parâmetros"""
+    response = client.get(f"/api/export/servicos?{parametros}", headers=auth_headers_gerente)
+    assert response.status_code == 400
+
+
+def test_exportacao_sem_token(client):
+    """Testa que a exportação exige autenticação"""
+    assert client.get("/api/export/servicos").status_code == 401
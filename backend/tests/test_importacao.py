@@ -0,0 +1,212 @@
+"""Testes da importação de veículos em lote"""
+import io
+import json
+from app.models import db, Usuario, Veiculo, TipoUsuario
+from app import importacao
+
+CSV_VALIDO = (
+    "placa,modelo,marca,ano,cor\n"
+    "imp0001,Onix,Chevrolet,2021,Prata\n"
+    "IMP0002,HB20,Hyundai,2019,\n"
+)
+
+
+def test_importa_csv(client, auth_headers_cliente, usuario_cliente):
+    """Testa a importação de CSV no corpo da requisição"""
+    response = client.post(
+        "/api/veiculos/bulk",
+        headers=auth_headers_cliente,
+        data=CSV_VALIDO,
+        content_type="text/csv",
+    )
+
+    assert response.status_code == 201
+    assert response.get_json()["importados"] == 2
+    veiculos = Veiculo.query.order_by(Veiculo.placa).all()
+    assert [v.placa for v in veiculos] == ["IMP0001", "IMP0002"]
+    assert {v.usuario_id for v in veiculos} == {usuario_cliente["id"]}
+    assert veiculos[1].cor is None
+
+
+def test_importa_json_para_clientes(client, auth_headers_gerente, usuario_cliente, contar_queries):
+    """Testa o gerente importando para clientes por id e por email"""
+    registros = [
+        {"placa": f"FRT{i:04d}", "modelo": "Strada", "marca": "Fiat", "ano": 2022}
+        for i in range(50)
+    ]
+    registros[0]["usuario_id"] = usuario_cliente["id"]
+    registros[1]["email_cliente"] = "cliente@teste.com"
+
+    with contar_queries() as consultas:
+        response = client.post("/api/veiculos/bulk", headers=auth_headers_gerente, json=registros)
+
+    assert response.status_code == 201
+    assert Veiculo.query.count() == 50
+    cliente = Veiculo.query.filter_by(usuario_id=usuario_cliente["id"]).all()
+    assert sorted(v.placa for v in cliente) == ["FRT0000", "FRT0001"]
+    # Placas, usuários, emails e o INSERT: não cresce com o número de linhas
+    assert len([c for c in consultas if "veiculos" in c]) == 2
+
+
+def test_erros_por_linha_sem_importar(client, app, auth_headers_gerente):
+    """Testa que com erros nada é importado e cada linha é reportada"""
+    db.session.add(Veiculo(placa="DUP0001", modelo="Ka", marca="Ford", ano=2015, usuario_id=1))
+    db.session.commit()
+    csv = (
+        "placa,modelo,marca,ano,email_cliente\n"
+        "NOV0001,Argo,Fiat,2020,\n"
+        "dup0001,Ka,Ford,2015,\n"
+        "NOV0001,Argo,Fiat,2020,\n"
+        ",Argo,Fiat,dois mil,\n"
+        "NOV0002,Argo,Fiat,2020,ninguem@teste.com\n"
+    )
+
+    response = client.post(
+        "/api/veiculos/bulk",
+        headers=auth_headers_gerente,
+        data=csv,
+        content_type="text/csv",
+    )
+
+    assert response.status_code == 400
+    dados = response.get_json()
+    assert dados["importados"] == 0
+    assert [(e["linha"], e["erros"]) for e in dados["erros"]] == [
+        (3, ["Placa já cadastrada"]),
+        (4, ["Placa repetida no arquivo"]),
+        (5, ["Campo placa é obrigatório", "Ano inválido"]),
+        (6, ["Cliente não encontrado"]),
+    ]
+    assert Veiculo.query.count() == 1
+
+    response = client.post(
+        "/api/veiculos/bulk?parcial=1",
+        headers=auth_headers_gerente,
+        data=csv,
+        content_type="text/csv",
+    )
+    assert response.status_code == 201
+    assert response.get_json()["importados"] == 1
+    assert Veiculo.query.filter_by(placa="NOV0001").count() == 1
+
+
+def test_cliente_nao_escolhe_dono(client, auth_headers_cliente):
+    """Testa que o cliente não importa veículos para outros usuários"""
+    response = client.post(
+        "/api/veiculos/bulk",
+        headers=auth_headers_cliente,
+        json=[
+            {
+                "placa": "OUT0001",
+                "modelo": "Up",
+                "marca": "VW",
+                "ano": 2017,
+                "usuario_id": 99,
+            }
+        ],
+    )
+    assert response.status_code == 400
+    assert "gerente" in response.get_json()["erros"][0]["erros"][0]
+
+
+def test_importa_arquivo_multipart(client, auth_headers_gerente):
+    """Testa o envio como arquivo em formulário"""
+    response = client.post(
+        "/api/veiculos/bulk",
+        headers=auth_headers_gerente,
+        data={"arquivo": (io.BytesIO(CSV_VALIDO.encode()), "frota.csv")},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 201
+    assert response.get_json()["importados"] == 2
+
+
+def test_importacao_invalida_dashboard(client, auth_headers_gerente):
+    """Testa que o INSERT em massa invalida o dashboard em cache"""
+    antes = client.get("/api/dashboard", headers=auth_headers_gerente).get_json()
+    client.post(
+        "/api/veiculos/bulk",
+        headers=auth_headers_gerente,
+        data=CSV_VALIDO,
+        content_type="text/csv",
+    )
+    depois = client.get("/api/dashboard", headers=auth_headers_gerente).get_json()
+    assert depois["estatisticas"]["total_veiculos"] == antes["estatisticas"]["total_veiculos"] + 2
+
+
+def test_corpo_invalido(client, auth_headers_gerente):
+    """Testa corpos que não são lista JSON nem CSV"""
+    response = client.post("/api/veiculos/bulk", headers=auth_headers_gerente, json={"placa": "X"})
+    assert response.status_code == 400
+    response = client.post("/api/veiculos/bulk", headers=auth_headers_gerente, data="placa=X")
+    assert response.status_code == 400
+
+
+def test_comando_importar(runner, tmp_path, usuario_cliente, monkeypatch):
+    """Testa a importação pela CLI, em lotes menores que o arquivo"""
+    monkeypatch.setattr(importacao, "TAMANHO_LOTE", 3)
+    arquivo = tmp_path / "frota.json"
+    arquivo.write_text(
+        json.dumps(
+            [
+                {"placa": f"CLI{i:04d}", "modelo": "Mobi", "marca": "Fiat", "ano": 2020}
+                for i in range(10)
+            ]
+        )
+    )
+
+    resultado = runner.invoke(
+        args=["veiculos", "importar", str(arquivo), "--email-dono", "cliente@teste.com"]
+    )
+
+    assert resultado.exit_code == 0, resultado.output
+    assert "10 de 10 veículos importados" in resultado.output
+    assert Veiculo.query.filter_by(usuario_id=usuario_cliente["id"]).count() == 10
+
+    resultado = runner.invoke(
+        args=["veiculos", "importar", str(arquivo), "--email-dono", "cliente@teste.com"]
+    )
+    assert resultado.exit_code == 1
+    assert "Placa já cadastrada" in resultado.output
+
+
+def test_email_de_usuario_que_nao_e_cliente(client, auth_headers_gerente):
+    """Testa que email_cliente só aceita clientes"""
+    mecanico = Usuario(nome="Mecânico", email="mec@teste.com", tipo=TipoUsuario.MECANICO)
+    mecanico.senha_hash = "hash-fixo"
+    db.session.add(mecanico)
+    db.session.commit()
+
+    response = client.post(
+        "/api/veiculos/bulk",
+        headers=auth_headers_gerente,
+        json=[
+            {
+                "placa": "MEC0001",
+                "modelo": "Up",
+                "marca": "VW",
+                "ano": 2017,
+                "email_cliente": "mec@teste.com",
+            }
+        ],
+    )
+    assert response.get_json()["erros"][0]["erros"] == ["Cliente não encontrado"]
+
+
+def test_usuario_id_que_nao_e_cliente(client, auth_headers_gerente, usuario_mecanico):
+    """Testa que usuario_id só aceita clientes, como email_cliente"""
+    registro = {"modelo": "Up", "marca": "VW", "ano": 2017}
+    response = client.post(
+        "/api/veiculos/bulk",
+        headers=auth_headers_gerente,
+        json=[
+            {**registro, "placa": "MEC0001", "usuario_id": usuario_mecanico["id"]},
+            {**registro, "placa": "MEC0002", "usuario_id": 9999},
+        ],
+    )
+    assert response.status_code == 400
+    assert [e["erros"] for e in response.get_json()["erros"]] == [
+        ["Cliente não encontrado"],
+        ["Cliente não encontrado"],
+    ]
+    assert Veiculo.query.count() == 0
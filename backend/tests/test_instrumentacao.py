@@ -0,0 +1,75 @@
+"""Testes da instrumentação das requisições (Server-Timing, logs e /metrics)"""
+import json
+import logging
+import re
+import pytest
+from sqlalchemy import event
+from app import create_app
+from app.instrumentacao import _antes_da_consulta
+from app.models import db, Usuario, TipoUsuario
+from app.utils import gerar_token
+
+
+@pytest.fixture
+def app_instrumentada():
+    """Aplicação com INSTRUMENTACAO ligada"""
+    instrumentada = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "BCRYPT_LOG_ROUNDS": 4,
+            "INSTRUMENTACAO": True,
+        }
+    )
+    with instrumentada.app_context():
+        db.create_all()
+        yield instrumentada
+        db.session.remove()
+        db.drop_all()
+
+
+def test_desligada_por_padrao(app, client, auth_headers_gerente):
+    """Testa que sem INSTRUMENTACAO não há cabeçalho, eventos nem /metrics"""
+    response = client.get("/api/veiculos", headers=auth_headers_gerente)
+
+    assert "Server-Timing" not in response.headers
+    assert client.get("/metrics").status_code == 404
+    assert not event.contains(db.engine, "before_cursor_execute", _antes_da_consulta)
+    assert "metricas" not in app.extensions
+
+
+def test_server_timing_e_metricas(app_instrumentada):
+    """Testa o cabeçalho Server-Timing e os histogramas por endpoint"""
+    client = app_instrumentada.test_client()
+    response = client.get("/api/veiculos")  # sem token: 401
+    timing = response.headers["Server-Timing"]
+    assert re.fullmatch(r'app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ consultas"', timing)
+
+    texto = client.get("/metrics").get_data(as_text=True)
+    rotulos = 'endpoint="veiculos.listar_veiculos",metodo="GET"'
+    assert f'oficina_requisicao_duracao_segundos_bucket{{{rotulos},le="+Inf"}} 1' in texto
+    assert f"oficina_requisicao_duracao_segundos_count{{{rotulos}}} 1" in texto
+    assert f'oficina_requisicoes_total{{{rotulos},status="401"}} 1' in texto
+    # A própria /metrics não entra nas métricas
+    assert "metricas" not in texto.split("# HELP", 1)[1]
+
+
+def test_conta_consultas_e_bytes(app_instrumentada, caplog):
+    """Testa o log JSON com consultas, tempo de banco e tamanho da resposta"""
+    gerente = Usuario(nome="Gerente", email="g@instr.com", tipo=TipoUsuario.GERENTE)
+    gerente.set_senha("senha123")
+    db.session.add(gerente)
+    db.session.commit()
+    headers = {"Authorization": f"Bearer {gerar_token(gerente.id, 'gerente')}"}
+
+    client = app_instrumentada.test_client()
+    with caplog.at_level(logging.INFO, logger="app.instrumentacao"):
+        response = client.get("/api/usuarios", headers=headers)
+
+    registro = json.loads(caplog.records[-1].getMessage())
+    assert registro["endpoint"] == "usuarios.listar_usuarios"
+    assert registro["status"] == 200
+    assert registro["consultas"] >= 1
+    assert registro["banco_ms"] >= 0
+    assert registro["bytes"] == len(response.get_data())
+    assert f'desc="{registro["consultas"]} consultas"' in response.headers["Server-Timing"]
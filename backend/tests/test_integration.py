@@ -16,6 +16,7 @@ def app():
             "TESTING": True,
             "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
             "SECRET_KEY": "test-secret-key",
+            "BCRYPT_LOG_ROUNDS": 4,
             "WTF_CSRF_ENABLED": False,
         }
     )
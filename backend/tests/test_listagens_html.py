@@ -0,0 +1,169 @@
+"""Testes da paginação e dos filtros das listagens HTML"""
+from datetime import datetime
+from app.models import db, StatusServico
+
+
+def login(client, email):
+    client.post("/login", data={"email": email, "senha": "senha123"})
+
+
+def linhas_servicos(response):
+    return response.data.count(b'<span class="fw-semibold text-primary">#')
+
+
+def test_servicos_paginados(client, app, usuario_gerente, fabrica):
+    """Testa que a listagem de serviços exibe apenas a página solicitada"""
+    with app.app_context():
+        fabrica.servicos(23)
+        db.session.commit()
+    login(client, "gerente@teste.com")
+
+    response = client.get("/servicos?per_page=10")
+    assert response.status_code == 200
+    assert linhas_servicos(response) == 10
+    assert "23 serviços".encode() in response.data
+
+    response = client.get("/servicos?per_page=10&page=3")
+    assert linhas_servicos(response) == 3
+
+    # Tamanho de página fora das opções volta ao padrão
+    response = client.get("/servicos?per_page=100000")
+    assert linhas_servicos(response) == 23
+
+
+def test_servicos_filtros(client, app, usuario_gerente, fabrica, usuario_mecanico):
+    """Testa os filtros de status, mecânico e período"""
+    with app.app_context():
+        fabrica.servicos(2, status=StatusServico.CONCLUIDO)
+        fabrica.servicos(3, status=StatusServico.EM_ANDAMENTO, mecanico_id=usuario_mecanico["id"])
+        fabrica.servicos(4, criado_em=datetime(2020, 3, 10, 15, 0))
+        db.session.commit()
+    login(client, "gerente@teste.com")
+
+    assert linhas_servicos(client.get("/servicos?status=concluido")) == 2
+    response = client.get(f"/servicos?mecanico_id={usuario_mecanico['id']}")
+    assert linhas_servicos(response) == 3
+    response = client.get("/servicos?data_inicio=2020-03-10&data_fim=2020-03-10")
+    assert linhas_servicos(response) == 4
+    assert linhas_servicos(client.get("/servicos?data_fim=2020-03-09")) == 0
+
+    response = client.get("/servicos?data_inicio=ontem", follow_redirects=True)
+    assert "Data inválida".encode() in response.data
+
+
+def test_servicos_consultas_independem_do_tamanho(
+    client, app, usuario_gerente, fabrica, contar_queries
+):
+    """Testa que renderizar uma página custa o mesmo para tabelas maiores"""
+    login(client, "gerente@teste.com")
+
+    with app.app_context():
+        fabrica.servicos(15)
+        db.session.commit()
+    with contar_queries() as poucos:
+        client.get("/servicos?per_page=10")
+
+    with app.app_context():
+        fabrica.servicos(120)
+        db.session.commit()
+    with contar_queries() as muitos:
+        response = client.get("/servicos?per_page=10")
+
+    assert linhas_servicos(response) == 10
+    assert len(poucos) == len(muitos)
+
+
+def test_usuarios_paginados_e_filtrados(client, app, usuario_gerente, fabrica):
+    """Testa a paginação e o filtro por tipo da listagem de usuários"""
+    with app.app_context():
+        for _ in range(11):  # mais o usuario_cliente da fábrica
+            fabrica.usuario()
+        db.session.commit()
+    login(client, "gerente@teste.com")
+
+    response = client.get("/usuarios?per_page=10")
+    assert response.status_code == 200
+    assert response.data.count(b"mailto:") == 10
+    assert "13 usuários".encode() in response.data
+
+    response = client.get("/usuarios?tipo=gerente")
+    assert response.data.count(b"mailto:") == 1
+
+
+def test_veiculos_cliente_paginados(client, app, fabrica):
+    """Testa a paginação dos veículos do cliente"""
+    with app.app_context():
+        for _ in range(12):
+            fabrica.veiculo()
+        db.session.commit()
+    login(client, "cliente@teste.com")
+
+    response = client.get("/veiculos?per_page=10")
+    assert response.status_code == 200
+    assert response.data.count(b'class="vehicle-card animate-fade-in"') == 10
+
+    response = client.get("/veiculos?per_page=10&page=2")
+    assert response.data.count(b'class="vehicle-card animate-fade-in"') == 2
+
+
+def criar_clientes_com_veiculos(fabrica, quantidade):
+    """Clientes com dois veículos, cada um com um serviço"""
+    for _ in range(quantidade):
+        cliente = fabrica.usuario()
+        for _ in range(2):
+            fabrica.servicos(veiculo=fabrica.veiculo(cliente.id))
+    db.session.commit()
+
+
+def test_veiculos_agrupados_por_cliente(client, app, usuario_gerente, fabrica):
+    """Testa o agrupamento paginado por cliente, sem clientes sem veículos"""
+    with app.app_context():
+        criar_clientes_com_veiculos(fabrica, 12)
+    login(client, "gerente@teste.com")
+
+    response = client.get("/veiculos?per_page=10")
+    assert response.status_code == 200
+    assert response.data.count(b'class="cliente-grupo') == 10
+    assert response.data.count(b'class="vehicle-card-compact"') == 20
+    assert "1 serviço(s)".encode() in response.data
+    # usuario_cliente não tem veículos e não aparece
+    assert b"Cliente Teste" not in response.data
+
+    response = client.get("/veiculos?per_page=10&page=2")
+    assert response.data.count(b'class="cliente-grupo') == 2
+
+
+def test_veiculos_agrupados_consultas_constantes(
+    client, app, usuario_gerente, fabrica, contar_queries
+):
+    """Testa que a listagem agrupada não faz uma consulta por cliente"""
+    login(client, "gerente@teste.com")
+
+    with app.app_context():
+        criar_clientes_com_veiculos(fabrica, 3)
+    with contar_queries() as poucos:
+        client.get("/veiculos")
+
+    with app.app_context():
+        criar_clientes_com_veiculos(fabrica, 20)
+    with contar_queries() as muitos:
+        response = client.get("/veiculos")
+
+    assert response.data.count(b'class="cliente-grupo') == 23
+    assert len(poucos) == len(muitos)
+
+
+def test_veiculos_agrupados_contam_servicos(client, app, usuario_gerente, fabrica, contar_queries):
+    """Testa a quantidade de serviços por veículo, contada sem carregar os serviços"""
+    with app.app_context():
+        cliente = fabrica.usuario()
+        fabrica.servicos(3, veiculo=fabrica.veiculo(cliente.id))
+        fabrica.veiculo(cliente.id)
+        db.session.commit()
+    login(client, "gerente@teste.com")
+
+    with contar_queries() as consultas:
+        response = client.get("/veiculos")
+    assert "3 serviço(s)".encode() in response.data
+    assert "0 serviço(s)".encode() in response.data
+    assert not any("servicos.descricao" in consulta for consulta in consultas)
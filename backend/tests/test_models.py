@@ -678,3 +678,126 @@ class TestTipoUsuario:
         assert TipoUsuario.CLIENTE.value == "cliente"
         assert TipoUsuario.MECANICO.value == "mecanico"
         assert TipoUsuario.GERENTE.value == "gerente"
+
+
+class TestIndices:
+    """Testes dos índices das consultas mais frequentes"""
+
+    def test_indices_criados(self, app):
+        """Testa que os índices do modelo existem no banco"""
+        with app.app_context():
+            inspetor = db.inspect(db.engine)
+            indices = {
+                indice["name"]
+                for tabela in ("usuarios", "veiculos", "servicos", "orcamentos")
+                for indice in inspetor.get_indexes(tabela)
+            }
+
+            assert {
+                "ix_usuarios_tipo_nome",
+                "ix_veiculos_usuario_id",
+                "ix_orcamentos_servico_id",
+                "ix_servicos_mecanico_status",
+                "ix_servicos_status_criado_em",
+                "ix_servicos_veiculo_criado_em",
+                "ix_servicos_criado_em_id",
+                "ix_servicos_aguardando_sem_mecanico",
+                "ix_servicos_valor_total",
+            } <= indices
+
+    def test_fila_aguardando_usa_indice(self, app):
+        """Testa que o SQLite usa índice para a fila do mecânico"""
+        with app.app_context():
+            plano = db.session.execute(
+                db.text(
+                    "EXPLAIN QUERY PLAN SELECT id FROM servicos "
+                    "WHERE status = 'AGUARDANDO_ORCAMENTO' AND mecanico_id IS NULL"
+                )
+            ).fetchall()
+
+            assert any("USING" in linha[-1] for linha in plano)
+
+
+class TestValorTotal:
+    """Testes da coluna valor_total mantida em sincronia com os orçamentos"""
+
+    @pytest.fixture
+    def servico(self, app):
+        with app.app_context():
+            usuario = Usuario(
+                nome="Cliente Total", email="total@test.com", tipo=TipoUsuario.CLIENTE
+            )
+            usuario.senha_hash = "hash-fixo"
+            db.session.add(usuario)
+            db.session.flush()
+            veiculo = Veiculo(
+                placa="TOT1234",
+                modelo="Gol",
+                marca="VW",
+                ano=2019,
+                usuario_id=usuario.id,
+            )
+            db.session.add(veiculo)
+            db.session.flush()
+            servico = Servico(descricao="Revisão", veiculo_id=veiculo.id)
+            db.session.add(servico)
+            db.session.commit()
+            yield servico
+
+    def valor_no_banco(self, servico_id):
+        return db.session.execute(
+            db.text("SELECT valor_total FROM servicos WHERE id = :id"),
+            {"id": servico_id},
+        ).scalar_one()
+
+    def test_acompanha_orcamentos(self, servico):
+        """Testa inclusão, alteração e remoção de orçamentos"""
+        assert self.valor_no_banco(servico.id) == 0
+
+        orcamento = Orcamento(descricao="Peças", valor=100.00, servico_id=servico.id)
+        db.session.add_all(
+            [orcamento, Orcamento(descricao="Óleo", valor=30.00, servico_id=servico.id)]
+        )
+        db.session.commit()
+        assert servico.valor_total == 130.00
+        assert self.valor_no_banco(servico.id) == 130.00
+
+        orcamento.valor = 70.00
+        db.session.commit()
+        assert servico.valor_total == 100.00
+
+        db.session.delete(orcamento)
+        db.session.commit()
+        assert servico.valor_total == 30.00
+
+    def test_valor_proprio_tem_prioridade(self, servico):
+        """Testa que o valor do serviço substitui a soma dos orçamentos"""
+        db.session.add(Orcamento(descricao="Peças", valor=40.00, servico_id=servico.id))
+        db.session.commit()
+
+        servico.valor = 250.00
+        db.session.commit()
+        assert servico.valor_total == 250.00
+
+        servico.valor = None
+        db.session.commit()
+        assert servico.valor_total == 40.00
+
+    def test_nao_altera_atualizado_em(self, servico):
+        """Testa que o recálculo não conta como alteração do serviço"""
+        antes = servico.atualizado_em
+        db.session.add(Orcamento(descricao="Peças", valor=10.00, servico_id=servico.id))
+        db.session.commit()
+
+        assert servico.atualizado_em == antes
+
+    def test_ordenacao_em_sql(self, servico):
+        """Testa que valor_total pode ser usado em ORDER BY/SUM no banco"""
+        outro = Servico(descricao="Pintura", veiculo_id=servico.veiculo_id, valor=500)
+        db.session.add(outro)
+        db.session.add(Orcamento(descricao="Peças", valor=90.00, servico_id=servico.id))
+        db.session.commit()
+
+        ordenados = Servico.query.order_by(Servico.valor_total.desc()).all()
+        assert [s.descricao for s in ordenados] == ["Pintura", "Revisão"]
+        assert db.session.query(db.func.sum(Servico.valor_total)).scalar() == 590.00
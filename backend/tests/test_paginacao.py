@@ -0,0 +1,112 @@
+"""Testes da paginação por cursor das listagens da API"""
+from datetime import datetime
+from app.models import db, Veiculo
+from app.paginacao import (
+    LIMITE_MAXIMO,
+    LIMITE_PADRAO,
+    codificar_cursor,
+    decodificar_cursor,
+)
+
+
+def percorrer(client, url, headers, chave):
+    """Segue os cursores até a última página e retorna ids e número de páginas"""
+    ids, paginas, cursor = [], 0, None
+    while True:
+        parametros = f"&after={cursor}" if cursor else ""
+        response = client.get(f"{url}?limit=2{parametros}", headers=headers)
+        assert response.status_code == 200
+        data = response.get_json()
+        paginas += 1
+        assert data["total"] == len(data[chave]) <= 2
+        ids.extend(item["id"] for item in data[chave])
+        cursor = data["proximo_cursor"]
+        if not cursor:
+            return ids, paginas
+
+
+def test_cursor_ida_e_volta():
+    """Testa que o cursor preserva a chave de ordenação"""
+    criado_em = datetime(2024, 5, 1, 10, 30, 15, 123456)
+    cursor = codificar_cursor(criado_em, 42)
+    assert decodificar_cursor(cursor) == (criado_em, 42)
+
+
+def test_percorrer_paginas_veiculos(client, app, auth_headers_gerente, fabrica):
+    """Testa que as páginas cobrem todos os veículos sem repetição"""
+    with app.app_context():
+        for _ in range(5):
+            fabrica.veiculo()
+        db.session.commit()
+        esperados = [v.id for v in Veiculo.query.order_by(Veiculo.id).all()]
+
+    ids, paginas = percorrer(client, "/api/veiculos", auth_headers_gerente, "veiculos")
+    assert sorted(ids) == esperados
+    assert paginas == 3
+
+
+def test_percorrer_paginas_com_empate_em_criado_em(client, app, auth_headers_gerente, fabrica):
+    """Testa o desempate por id quando criado_em é igual"""
+    with app.app_context():
+        for _ in range(5):
+            fabrica.veiculo(criado_em=datetime(2024, 1, 1))
+        db.session.commit()
+
+    ids, _ = percorrer(client, "/api/veiculos", auth_headers_gerente, "veiculos")
+    assert ids == sorted(ids)
+    assert len(set(ids)) == 5
+
+
+def test_servicos_paginados_cliente(client, app, auth_headers_cliente, fabrica):
+    """Testa a paginação da listagem de serviços do cliente"""
+    with app.app_context():
+        fabrica.servicos(3)
+        db.session.commit()
+
+    ids, paginas = percorrer(client, "/api/servicos", auth_headers_cliente, "servicos")
+    assert len(ids) == 3
+    assert paginas == 2
+
+
+def test_total_registros_opcional(client, app, auth_headers_gerente, fabrica):
+    """Testa que o total geral só é calculado quando solicitado"""
+    with app.app_context():
+        for _ in range(3):
+            fabrica.veiculo()
+        db.session.commit()
+
+    response = client.get("/api/veiculos?limit=1", headers=auth_headers_gerente)
+    assert "total_registros" not in response.get_json()
+
+    response = client.get("/api/veiculos?limit=1&total=1", headers=auth_headers_gerente)
+    data = response.get_json()
+    assert data["total"] == 1
+    assert data["total_registros"] == 3
+
+
+def test_limite_padrao_e_maximo(client, app, auth_headers_gerente, fabrica):
+    """Testa o limite padrão e que limites acima do máximo são truncados"""
+    with app.app_context():
+        for _ in range(LIMITE_MAXIMO + 1):
+            fabrica.veiculo()
+        db.session.commit()
+
+    response = client.get("/api/veiculos", headers=auth_headers_gerente)
+    assert response.get_json()["total"] == LIMITE_PADRAO
+
+    response = client.get("/api/veiculos?limit=100000", headers=auth_headers_gerente)
+    data = response.get_json()
+    assert data["total"] == LIMITE_MAXIMO
+    assert data["proximo_cursor"]
+
+
+def test_parametros_invalidos(client, auth_headers_gerente):
+    """Testa que cursor e limite inválidos retornam 400"""
+    response = client.get("/api/usuarios?after=invalido", headers=auth_headers_gerente)
+    assert response.status_code == 400
+
+    response = client.get("/api/usuarios?limit=0", headers=auth_headers_gerente)
+    assert response.status_code == 400
+
+    response = client.get("/api/servicos?limit=abc", headers=auth_headers_gerente)
+    assert response.status_code == 400
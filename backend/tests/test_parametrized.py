@@ -15,6 +15,7 @@ def app():
             "TESTING": True,
             "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
             "SECRET_KEY": "test-secret-key",
+            "BCRYPT_LOG_ROUNDS": 4,
             "JWT_SECRET_KEY": "test-jwt-secret-key",
         }
     )
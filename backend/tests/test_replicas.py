@@ -0,0 +1,91 @@
+"""Testes do roteamento de leituras para a réplica (dois bancos SQLite)"""
+import shutil
+import time
+import pytest
+from app import create_app
+from app.models import db, Usuario, Veiculo, TipoUsuario
+from app.replicas import BIND_REPLICA
+
+
+@pytest.fixture
+def app_replica(tmp_path):
+    """Aplicação com primário e réplica; a réplica começa como cópia do primário"""
+    primario, replica = tmp_path / "primario.db", tmp_path / "replica.db"
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{primario}",
+            "SQLALCHEMY_REPLICA_URI": f"sqlite:///{replica}",
+            "BCRYPT_LOG_ROUNDS": 4,
+            "DASHBOARD_CACHE": "nenhum",
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        for email, tipo in (
+            ("cliente@r.com", TipoUsuario.CLIENTE),
+            ("gerente@r.com", TipoUsuario.GERENTE),
+        ):
+            usuario = Usuario(nome=email, email=email, tipo=tipo)
+            usuario.set_senha("senha123")
+            db.session.add(usuario)
+        db.session.commit()
+        db.engine.dispose()
+    shutil.copy(primario, replica)  # "replicação" inicial
+    return app
+
+
+def headers(client, email):
+    response = client.post("/auth/login", json={"email": email, "senha": "senha123"})
+    return {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+
+def placas(client, cabecalhos):
+    response = client.get("/api/veiculos", headers=cabecalhos)
+    assert response.status_code == 200
+    return [v["placa"] for v in response.get_json()["veiculos"]]
+
+
+def test_get_le_da_replica(app_replica):
+    """Testa que uma listagem GET é servida pela réplica"""
+    with app_replica.app_context():
+        cliente_id = Usuario.query.filter_by(email="cliente@r.com").one().id
+        with db.engines[BIND_REPLICA].begin() as conexao:
+            conexao.execute(
+                db.insert(Veiculo).values(
+                    placa="REP0001", modelo="Gol", marca="VW", ano=2020, usuario_id=cliente_id
+                )
+            )
+        assert Veiculo.query.count() == 0  # fora de requisição: primário
+
+    client = app_replica.test_client()
+    assert placas(client, headers(client, "gerente@r.com")) == ["REP0001"]
+
+
+def test_le_as_proprias_escritas(app_replica, monkeypatch):
+    """Testa a janela em que quem escreveu lê do primário"""
+    client = app_replica.test_client()
+    cliente, gerente = headers(client, "cliente@r.com"), headers(client, "gerente@r.com")
+
+    response = client.post(
+        "/api/veiculos",
+        headers=cliente,
+        json={"placa": "NOV0001", "modelo": "Ka", "marca": "Ford", "ano": 2019},
+    )
+    assert response.status_code == 201
+
+    # Quem escreveu vê a alteração; os demais leem a réplica, ainda sem ela
+    assert placas(client, cliente) == ["NOV0001"]
+    assert placas(client, gerente) == []
+
+    # Passada a janela, o cliente volta a ler da réplica
+    agora = time.monotonic()
+    janela = app_replica.config["REPLICA_JANELA_ESCRITA"]
+    monkeypatch.setattr(time, "monotonic", lambda: agora + janela + 1)
+    assert placas(client, cliente) == []
+
+
+def test_sem_replica_usa_o_primario(app):
+    """Testa que sem réplica configurada não há bind extra"""
+    assert BIND_REPLICA not in db.engines
+    assert db.session.get_bind() is db.engine
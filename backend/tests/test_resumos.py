@@ -0,0 +1,230 @@
+"""Testes dos resumos diários e do endpoint de relatórios"""
+from datetime import date, datetime
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.dialects import postgresql
+from app.models import (
+    db,
+    Servico,
+    Orcamento,
+    ResumoDiario,
+    StatusServico,
+)
+from app.estatisticas import resumo_gerente
+from app.resumos import recalcular_resumos, _insert_ou_soma
+
+
+def resumos():
+    return sorted(
+        (r.dia, r.mecanico_id, r.status.value, r.quantidade, r.receita) for r in ResumoDiario.query
+    )
+
+
+def reconstruidos():
+    """Resumos calculados do zero, para comparar com os incrementais"""
+    atuais = resumos()
+    recalcular_resumos(db.session.connection())
+    esperados = resumos()
+    db.session.rollback()
+    assert resumos() == atuais
+    return esperados
+
+
+@pytest.fixture
+def veiculo(fabrica):
+    veiculo = fabrica.veiculo()
+    db.session.commit()
+    return veiculo
+
+
+def test_resumos_acompanham_transicoes(veiculo, usuario_mecanico):
+    """Testa inclusão, mudança de status/mecânico, orçamentos e remoção"""
+    servico = Servico(descricao="Freios", veiculo_id=veiculo.id, criado_em=datetime(2025, 3, 1, 9))
+    outro = Servico(descricao="Óleo", veiculo_id=veiculo.id, criado_em=datetime(2025, 3, 1, 15))
+    db.session.add_all([servico, outro])
+    db.session.commit()
+    assert resumos() == [(date(2025, 3, 1), 0, "pendente", 2, 0.0)]
+
+    servico.mecanico_id = usuario_mecanico["id"]
+    servico.status = StatusServico.EM_ANDAMENTO
+    db.session.add(Orcamento(descricao="Pastilhas", valor=180, servico_id=servico.id))
+    db.session.commit()
+    assert resumos() == reconstruidos()
+
+    servico.status = StatusServico.CONCLUIDO
+    servico.data_conclusao = datetime(2025, 3, 4, 17)
+    db.session.commit()
+    assert (date(2025, 3, 4), usuario_mecanico["id"], "concluido", 1, 180.0) in (resumos())
+    assert resumos() == reconstruidos()
+
+    db.session.delete(outro)
+    db.session.commit()
+    assert resumos() == [(date(2025, 3, 4), usuario_mecanico["id"], "concluido", 1, 180.0)]
+
+
+def test_conclusao_registra_data(veiculo):
+    """Testa que concluir um serviço sem data_conclusao usa a data atual"""
+    servico = Servico(descricao="Alinhamento", veiculo_id=veiculo.id)
+    db.session.add(servico)
+    db.session.commit()
+
+    servico.status = StatusServico.CONCLUIDO
+    db.session.commit()
+
+    assert servico.data_conclusao is not None
+    assert resumos()[0][0] == servico.data_conclusao.date()
+
+
+def test_resumos_acompanham_update_em_massa(veiculo):
+    """Testa UPDATE e DELETE em massa sobre Servico"""
+    for dia in (1, 2, 3):
+        db.session.add(
+            Servico(
+                descricao=f"Serviço {dia}",
+                veiculo_id=veiculo.id,
+                criado_em=datetime(2025, 5, dia),
+                valor=100,
+            )
+        )
+    db.session.commit()
+
+    Servico.query.filter(Servico.criado_em < datetime(2025, 5, 3)).update(
+        {"status": StatusServico.CANCELADO}
+    )
+    db.session.commit()
+    assert resumos() == reconstruidos()
+    assert [r[2] for r in resumos()] == ["cancelado", "cancelado", "pendente"]
+
+    db.session.execute(db.delete(Servico).where(Servico.descricao == "Serviço 3"))
+    db.session.commit()
+    assert len(resumos()) == 2
+
+
+def test_novos_servicos_somam_na_chave(veiculo, contar_queries):
+    """Testa que incluir serviços soma diferenças em vez de recalcular a chave"""
+    db.session.add(Servico(descricao="Primeiro", veiculo_id=veiculo.id))
+    db.session.commit()
+
+    with contar_queries() as consultas:
+        db.session.add(Servico(descricao="Segundo", veiculo_id=veiculo.id, valor=70))
+        db.session.commit()
+
+    assert resumos() == [(datetime.utcnow().date(), 0, "pendente", 2, 70.0)]
+    resumos_sql = [c for c in consultas if "resumos_diarios" in c]
+    assert len(resumos_sql) == 2  # upsert e remoção de chaves zeradas
+    assert "ON CONFLICT" in resumos_sql[0]
+
+
+def test_upsert_no_postgresql():
+    """Testa o INSERT ... ON CONFLICT DO UPDATE gerado para o PostgreSQL"""
+    conexao = SimpleNamespace(dialect=postgresql.dialect())
+    sql = str(_insert_ou_soma(conexao).compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (dia, mecanico_id, status) DO UPDATE" in sql
+    assert "quantidade = (resumos_diarios.quantidade + excluded.quantidade)" in sql
+
+
+def test_comando_reconstruir(runner, veiculo):
+    """Testa a reconstrução completa pela CLI"""
+    db.session.add(Servico(descricao="Pintura", veiculo_id=veiculo.id))
+    db.session.commit()
+    esperado = resumos()
+    db.session.execute(db.delete(ResumoDiario))
+    db.session.commit()
+
+    resultado = runner.invoke(args=["resumos", "reconstruir"])
+
+    assert resultado.exit_code == 0
+    assert "1 linhas" in resultado.output
+    assert resumos() == esperado
+
+
+def test_receita_mensal_separada_da_total(veiculo):
+    """Testa que receita_mensal considera apenas os concluídos no mês"""
+    for data_conclusao in (datetime(2000, 1, 10), datetime.utcnow()):
+        db.session.add(
+            Servico(
+                descricao="Concluído",
+                veiculo_id=veiculo.id,
+                status=StatusServico.CONCLUIDO,
+                valor=100,
+                data_conclusao=data_conclusao,
+            )
+        )
+    db.session.commit()
+
+    resumo = resumo_gerente()
+    assert resumo["receita"] == 200.0
+    assert resumo["receita_mensal"] == 100.0
+
+
+@pytest.fixture
+def movimento(veiculo, usuario_mecanico):
+    dados = [
+        (datetime(2025, 1, 10), StatusServico.CONCLUIDO, 150, usuario_mecanico["id"]),
+        (datetime(2025, 1, 10), StatusServico.CONCLUIDO, 50, None),
+        (datetime(2025, 1, 20), StatusServico.PENDENTE, None, None),
+        (datetime(2025, 2, 5), StatusServico.CONCLUIDO, 300, usuario_mecanico["id"]),
+    ]
+    for data, status, valor, mecanico_id in dados:
+        db.session.add(
+            Servico(
+                descricao="Movimento",
+                veiculo_id=veiculo.id,
+                criado_em=data,
+                data_conclusao=data if status == StatusServico.CONCLUIDO else None,
+                status=status,
+                valor=valor,
+                mecanico_id=mecanico_id,
+            )
+        )
+    db.session.commit()
+
+
+def test_relatorio_por_dia(client, movimento, auth_headers_gerente):
+    """Testa a série diária do relatório"""
+    response = client.get(
+        "/api/relatorios?data_inicio=2025-01-01&data_fim=2025-01-31",
+        headers=auth_headers_gerente,
+    )
+
+    assert response.status_code == 200
+    dados = response.get_json()
+    assert [p["periodo"] for p in dados["series"]] == ["2025-01-10", "2025-01-20"]
+    assert dados["series"][0]["concluidos"] == 2
+    assert dados["series"][0]["receita"] == 200.0
+    assert dados["series"][1]["por_status"]["pendente"] == 1
+    assert dados["totais"] == {"total": 3, "concluidos": 2, "receita": 200.0}
+
+
+def test_relatorio_por_mes_e_mecanico(client, movimento, usuario_mecanico, auth_headers_gerente):
+    """Testa o agrupamento mensal filtrado por mecânico"""
+    response = client.get(
+        "/api/relatorios?data_inicio=2025-01-01&data_fim=2025-12-31&agrupar=mes"
+        f"&mecanico_id={usuario_mecanico['id']}",
+        headers=auth_headers_gerente,
+    )
+
+    series = response.get_json()["series"]
+    assert [(p["periodo"], p["receita"]) for p in series] == [
+        ("2025-01", 150.0),
+        ("2025-02", 300.0),
+    ]
+
+
+@pytest.mark.parametrize(
+    "parametros",
+    [
+        "agrupar=ano",
+        "data_inicio=10/01/2025",
+        "data_inicio=2025-02-01&data_fim=2025-01-01",
+    ],
+)
+def test_relatorio_parametros_invalidos(client, auth_headers_gerente, parametros):
+    """Testa a validação dos parâmetros"""
+    response = client.get(f"/api/relatorios?{parametros}", headers=auth_headers_gerente)
+    assert response.status_code == 400
+
+
+def test_relatorio_apenas_gerente(client, auth_headers_cliente):
+    """Testa que apenas o gerente acessa os relatórios"""
+    assert client.get("/api/relatorios", headers=auth_headers_cliente).status_code == 403
@@ -0,0 +1,108 @@
+"""Testes do gerador da oficina sintética (seed.py)"""
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select
+from app.models import db, Usuario, Veiculo, Servico, Orcamento, ResumoDiario
+from app.resumos import recalcular_resumos
+from seed import DIAS_EM_ABERTO, STATUS_ABERTOS, gerar_massa, popular_demonstracao
+
+REFERENCIA = datetime(2026, 3, 2)
+
+
+def gerar(semente=7):
+    quantidades = gerar_massa(
+        db.session.connection(),
+        clientes=40,
+        veiculos_por_cliente=2,
+        servicos=600,
+        mecanicos=5,
+        semente=semente,
+        referencia=REFERENCIA,
+    )
+    db.session.commit()
+    return quantidades
+
+
+def conteudo():
+    return (
+        db.session.execute(select(Usuario.email, Usuario.tipo).order_by(Usuario.id)).all(),
+        db.session.execute(select(Veiculo.placa, Veiculo.usuario_id).order_by(Veiculo.id)).all(),
+        db.session.execute(
+            select(Servico.status, Servico.valor_total, Servico.criado_em).order_by(Servico.id)
+        ).all(),
+    )
+
+
+def recriar():
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+
+
+def test_quantidades_e_determinismo(app):
+    """Testa as quantidades e que a mesma semente gera as mesmas linhas"""
+    quantidades = gerar()
+    assert quantidades["usuarios"] == Usuario.query.count() == 5 + 40 + 1
+    assert quantidades["veiculos"] == Veiculo.query.count() == 80
+    assert quantidades["servicos"] == Servico.query.count() == 600
+    assert quantidades["orcamentos"] == Orcamento.query.count()
+    primeira = conteudo()
+
+    recriar()
+    gerar()
+    assert conteudo() == primeira
+
+    recriar()
+    gerar(semente=8)
+    assert conteudo() != primeira
+
+
+def test_consistencia_com_o_orm(app, client):
+    """Testa valor_total, resumos, datas e o login com o hash pré-calculado"""
+    gerar()
+
+    for servico in Servico.query.all():
+        esperado = (
+            float(servico.valor)
+            if servico.valor
+            else sum(float(o.valor) for o in servico.orcamentos)
+        )
+        assert servico.valor_total == round(esperado, 2)
+        assert servico.criado_em.weekday() != 6
+        if servico.status in STATUS_ABERTOS:
+            assert servico.criado_em >= REFERENCIA - timedelta(days=DIAS_EM_ABERTO + 1)
+
+    resumos = db.session.execute(
+        select(ResumoDiario.__table__).order_by("dia", "mecanico_id", "status")
+    ).all()
+    recalcular_resumos(db.session.connection())
+    assert (
+        db.session.execute(
+            select(ResumoDiario.__table__).order_by("dia", "mecanico_id", "status")
+        ).all()
+        == resumos
+    )
+
+    response = client.post(
+        "/auth/login", json={"email": "gerente@oficina.com", "senha": "senha123"}
+    )
+    assert response.status_code == 200
+    assert response.get_json()["usuario"]["tipo"] == "gerente"
+
+
+def test_exige_banco_vazio(app, usuario_cliente):
+    """Testa que o gerador não mistura a massa com dados existentes"""
+    with pytest.raises(ValueError, match="banco vazio"):
+        gerar()
+
+
+def test_dados_de_demonstracao(app, client):
+    """Testa os dados de demonstração (senha única, um commit)"""
+    popular_demonstracao()
+
+    assert Usuario.query.count() == 6
+    assert Veiculo.query.count() == 6
+    assert Servico.query.count() == 6
+    assert Orcamento.query.count() == 4
+    response = client.post("/auth/login", json={"email": "carlos@email.com", "senha": "senha123"})
+    assert response.status_code == 200
@@ -0,0 +1,90 @@
+"""Testes da serialização rápida das listagens"""
+import json
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from app import serializacao
+from app.models import db, Usuario, Veiculo, Servico, Orcamento, StatusServico
+
+
+@pytest.fixture
+def servicos_variados(fabrica, usuario_mecanico):
+    """Serviços com valor próprio, com orçamentos e sem nenhum dos dois"""
+    veiculo = fabrica.veiculo(cor="Prata")
+    fabrica.servicos(
+        veiculo=veiculo,
+        descricao="Com valor",
+        mecanico_id=usuario_mecanico["id"],
+        status=StatusServico.CONCLUIDO,
+        valor=Decimal("350.50"),
+        data_conclusao=datetime(2026, 5, 4, 10, 30, 15, 123456),
+    )
+    (com_orcamentos,) = fabrica.servicos(veiculo=veiculo, descricao="Com orçamentos")
+    fabrica.servicos(veiculo=veiculo, descricao="Sem valor")
+    db.session.add_all(
+        [
+            Orcamento(descricao="Peças", valor=Decimal("120.00"), servico_id=com_orcamentos.id),
+            Orcamento(
+                descricao="Mão de obra",
+                valor=Decimal("80.25"),
+                servico_id=com_orcamentos.id,
+            ),
+        ]
+    )
+    db.session.commit()
+
+
+def test_listagem_servicos_igual_ao_to_dict(client, app, servicos_variados, auth_headers_gerente):
+    """Testa que a listagem rápida produz o mesmo JSON que to_dict"""
+    response = client.get("/api/servicos", headers=auth_headers_gerente)
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+
+    esperado = [
+        s.to_dict(include_orcamentos=True)
+        for s in Servico.query.order_by(Servico.criado_em, Servico.id)
+    ]
+    assert response.get_json()["servicos"] == esperado
+
+
+def test_listagens_veiculos_e_usuarios_iguais_ao_to_dict(
+    client, app, servicos_variados, auth_headers_gerente
+):
+    """Testa veículos e usuários contra to_dict"""
+    veiculos = client.get("/api/veiculos", headers=auth_headers_gerente).get_json()
+    assert veiculos["veiculos"] == [v.to_dict() for v in Veiculo.query]
+
+    usuarios = client.get("/api/usuarios", headers=auth_headers_gerente).get_json()
+    esperado = [u.to_dict() for u in Usuario.query.order_by(Usuario.criado_em, Usuario.id)]
+    assert usuarios["usuarios"] == esperado
+
+
+def test_servicos_sem_orcamentos_nao_consultam_o_banco(app, servicos_variados, contar_queries):
+    """Testa que sem include_orcamentos o valor_total vem da própria linha"""
+    linhas = serializacao.consulta_servicos().order_by(Servico.id).all()
+    with contar_queries() as consultas:
+        dados = serializacao.servicos_json(linhas, include_orcamentos=False)
+
+    assert consultas == []
+    assert [s["valor_total"] for s in dados] == [350.5, 200.25, 0.0]
+    assert all("orcamentos" not in s for s in dados)
+
+
+@pytest.mark.parametrize("com_orjson", [True, False])
+def test_codificar_tipos(monkeypatch, com_orjson):
+    """Testa datas e Decimal com orjson e com o fallback da biblioteca padrão"""
+    if not com_orjson:
+        monkeypatch.setattr(serializacao, "orjson", None)
+    elif serializacao.orjson is None:
+        pytest.skip("orjson não instalado")
+
+    dados = {
+        "criado_em": datetime(2026, 1, 2, 3, 4, 5),
+        "valor": Decimal("10.50"),
+        "nome": "Mecânico",
+    }
+    assert json.loads(serializacao.codificar(dados)) == {
+        "criado_em": "2026-01-02T03:04:05",
+        "valor": 10.5,
+        "nome": "Mecânico",
+    }
@@ -0,0 +1,208 @@
+"""Testes da atualização de serviços em lote"""
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from app.models import db, Servico, Orcamento, ResumoDiario, StatusServico
+from app.routes import servicos as rotas_servicos
+
+
+@pytest.fixture
+def servicos_do_dia(fabrica, usuario_mecanico):
+    """Três serviços do mecânico, um sem mecânico e um com orçamento"""
+    servicos = fabrica.servicos(
+        4,
+        mecanico_id=lambda i: usuario_mecanico["id"] if i < 3 else None,
+        status=StatusServico.EM_ANDAMENTO,
+    )
+    db.session.add(Orcamento(descricao="Peças", valor=90, servico_id=servicos[0].id))
+    db.session.commit()
+    return [s.id for s in servicos]
+
+
+def test_gerente_fecha_servicos_do_dia(
+    client, servicos_do_dia, usuario_mecanico, auth_headers_gerente, contar_queries
+):
+    """Testa status, mecânico e valor aplicados em uma chamada"""
+    primeiro, segundo, terceiro, sem_mecanico = servicos_do_dia
+    itens = [
+        {"id": primeiro, "status": "concluido"},
+        {"id": segundo, "status": "concluido", "valor": 250},
+        {"id": sem_mecanico, "mecanico_id": usuario_mecanico["id"]},
+    ]
+
+    with contar_queries() as consultas:
+        response = client.post("/api/servicos/batch", headers=auth_headers_gerente, json=itens)
+
+    assert response.status_code == 200
+    dados = response.get_json()
+    assert dados["atualizados"] == 3
+    assert all(r["ok"] for r in dados["resultados"])
+    assert [r["id"] for r in dados["resultados"]] == [primeiro, segundo, sem_mecanico]
+    assert dados["resultados"][1]["servico"]["valor_total"] == 250.0
+
+    servico = db.session.get(Servico, primeiro)
+    assert servico.status == StatusServico.CONCLUIDO
+    assert servico.data_conclusao is not None
+    assert servico.valor_total == 90.0
+    assert db.session.get(Servico, sem_mecanico).mecanico_id == usuario_mecanico["id"]
+    assert db.session.get(Servico, terceiro).status == StatusServico.EM_ANDAMENTO
+
+    # Uma única instrução UPDATE em servicos para o lote inteiro
+    updates = [c for c in consultas if c.startswith("UPDATE servicos SET status")]
+    assert len(updates) == 1
+
+    concluidos = ResumoDiario.query.filter_by(status=StatusServico.CONCLUIDO).one()
+    assert (concluidos.dia, concluidos.quantidade, concluidos.receita) == (
+        datetime.utcnow().date(),
+        2,
+        340.0,
+    )
+
+
+def test_erros_por_item(client, servicos_do_dia, auth_headers_gerente):
+    """Testa que itens inválidos são reportados sem impedir os demais"""
+    primeiro, segundo, terceiro, _ = servicos_do_dia
+    itens = [
+        {"id": primeiro, "status": "inexistente"},
+        {"id": 9999, "status": "concluido"},
+        {"id": segundo, "mecanico_id": 9999},
+        {"id": terceiro, "valor": "abc"},
+        {"status": "concluido"},
+        {"id": terceiro, "status": "cancelado"},
+        {"id": terceiro, "status": "concluido"},
+    ]
+
+    response = client.post("/api/servicos/batch", headers=auth_headers_gerente, json=itens)
+
+    dados = response.get_json()
+    assert [(r["ok"], r.get("status_code")) for r in dados["resultados"]] == [
+        (False, 400),
+        (False, 404),
+        (False, 400),
+        (False, 400),
+        (False, 400),
+        (False, 400),
+        (False, 400),
+    ]
+    assert dados["atualizados"] == 0
+    assert Servico.query.filter_by(status=StatusServico.EM_ANDAMENTO).count() == 4
+
+
+@pytest.mark.parametrize("valor", ["NaN", "Infinity", "-inf", 1e20, "100000000", True])
+def test_valor_fora_do_numeric(client, servicos_do_dia, auth_headers_gerente, valor):
+    """Testa que valores não finitos ou maiores que Numeric(10, 2) falham só no item"""
+    primeiro, segundo, _, _ = servicos_do_dia
+    response = client.post(
+        "/api/servicos/batch",
+        headers=auth_headers_gerente,
+        json=[{"id": primeiro, "valor": valor}, {"id": segundo, "valor": "99999999.99"}],
+    )
+
+    assert response.status_code == 200
+    resultados = response.get_json()["resultados"]
+    assert resultados[0] == {
+        "id": primeiro,
+        "ok": False,
+        "message": "Valor inválido",
+        "status_code": 400,
+    }
+    assert resultados[1]["ok"] is True
+    assert db.session.get(Servico, segundo).valor == Decimal("99999999.99")
+
+
+@pytest.mark.parametrize("mecanico_id", [[1], {}, "1", True, 1.0])
+def test_mecanico_id_que_nao_e_id(
+    client, servicos_do_dia, usuario_mecanico, auth_headers_gerente, mecanico_id
+):
+    """Testa que um mecanico_id que não é inteiro falha só no item (sem 500 no lote)"""
+    primeiro, segundo, _, _ = servicos_do_dia
+    response = client.post(
+        "/api/servicos/batch",
+        headers=auth_headers_gerente,
+        json=[
+            {"id": primeiro, "mecanico_id": mecanico_id},
+            {"id": segundo, "mecanico_id": usuario_mecanico["id"]},
+        ],
+    )
+
+    assert response.status_code == 200
+    resultados = response.get_json()["resultados"]
+    assert resultados[0] == {
+        "id": primeiro,
+        "ok": False,
+        "message": "Mecânico inválido",
+        "status_code": 400,
+    }
+    assert resultados[1]["ok"] is True
+
+
+def test_mecanico_id_nulo_remove_atribuicao(
+    client, servicos_do_dia, auth_headers_gerente, auth_headers_mecanico
+):
+    """Testa que mecanico_id null desfaz a atribuição, como os demais campos"""
+    primeiro, _, _, _ = servicos_do_dia
+    antes = client.get("/api/dashboard", headers=auth_headers_mecanico).get_json()
+
+    response = client.post(
+        "/api/servicos/batch",
+        headers=auth_headers_gerente,
+        json=[{"id": primeiro, "mecanico_id": None}],
+    )
+
+    assert response.status_code == 200
+    resultado = response.get_json()["resultados"][0]
+    assert resultado["ok"] is True
+    assert resultado["servico"]["mecanico_id"] is None
+    assert db.session.get(Servico, primeiro).mecanico_id is None
+    # O dashboard do mecânico que perdeu o serviço é invalidado
+    depois = client.get("/api/dashboard", headers=auth_headers_mecanico).get_json()
+    assert depois != antes
+
+
+def test_mecanico_altera_apenas_status_dos_seus(client, servicos_do_dia, auth_headers_mecanico):
+    """Testa as regras do mecânico aplicadas a cada item"""
+    primeiro, _, _, sem_mecanico = servicos_do_dia
+    response = client.post(
+        "/api/servicos/batch",
+        headers=auth_headers_mecanico,
+        json=[
+            {"id": primeiro, "status": "concluido", "valor": 1000},
+            {"id": sem_mecanico, "status": "concluido"},
+        ],
+    )
+
+    resultados = response.get_json()["resultados"]
+    assert resultados[0]["ok"] is True
+    assert resultados[1]["status_code"] == 403
+
+    servico = db.session.get(Servico, primeiro)
+    assert servico.status == StatusServico.CONCLUIDO
+    assert servico.valor is None
+
+
+def test_lote_invalida_dashboard_do_mecanico(
+    client, servicos_do_dia, auth_headers_gerente, auth_headers_mecanico
+):
+    """Testa que o UPDATE em massa invalida os dashboards afetados"""
+    antes = client.get("/api/dashboard", headers=auth_headers_mecanico).get_json()
+    assert antes["estatisticas"]["concluidos"] == 0
+
+    client.post(
+        "/api/servicos/batch",
+        headers=auth_headers_gerente,
+        json=[{"id": servicos_do_dia[0], "status": "concluido"}],
+    )
+
+    depois = client.get("/api/dashboard", headers=auth_headers_mecanico).get_json()
+    assert depois["estatisticas"]["concluidos"] == 1
+
+
+def test_corpo_e_tipo_de_usuario(client, auth_headers_gerente, auth_headers_cliente, monkeypatch):
+    """Testa corpo inválido, limite do lote e acesso do cliente"""
+    url = "/api/servicos/batch"
+    assert client.post(url, headers=auth_headers_gerente, json={}).status_code == 400
+    assert client.post(url, headers=auth_headers_cliente, json=[{"id": 1}]).status_code == 403
+
+    monkeypatch.setattr(rotas_servicos, "MAX_ITENS_LOTE", 2)
+    itens = [{"id": i} for i in range(3)]
+    assert client.post(url, headers=auth_headers_gerente, json=itens).status_code == 400
@@ -0,0 +1,47 @@
+"""Testes do ponto de entrada WSGI e da configuração do Gunicorn"""
+import importlib
+import os
+import runpy
+import sys
+
+
+def test_wsgi_cria_aplicacao(monkeypatch):
+    """Testa que wsgi:app é a aplicação montada por create_app"""
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///:memory:")
+    monkeypatch.delitem(sys.modules, "wsgi", raising=False)
+    wsgi = importlib.import_module("wsgi")
+
+    assert "servicos" in wsgi.app.blueprints
+    assert wsgi.app.config["SQLALCHEMY_DATABASE_URI"] == "sqlite:///:memory:"
+    assert "migrate" not in wsgi.app.extensions
+
+
+def test_configuracao_gunicorn(monkeypatch):
+    """Testa os valores padrão e os ajustes por variável de ambiente"""
+    monkeypatch.setenv("WEB_CONCURRENCY", "5")
+    monkeypatch.setenv("GUNICORN_MAX_REQUESTS", "200")
+    monkeypatch.setenv("DASHBOARD_CACHE", "memoria")
+    configuracao = runpy.run_path("gunicorn.conf.py")
+
+    assert configuracao["workers"] == 5
+    assert configuracao["worker_class"] == "gthread"
+    assert configuracao["preload_app"] is True
+    assert configuracao["max_requests"] == 200
+    assert configuracao["max_requests_jitter"] == 20
+
+
+def test_varios_workers_usam_cache_compartilhado(monkeypatch):
+    """Testa que vários workers passam a usar o cache sqlite, salvo escolha explícita"""
+    monkeypatch.delenv("DASHBOARD_CACHE", raising=False)
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    runpy.run_path("gunicorn.conf.py")
+    assert os.environ.pop("DASHBOARD_CACHE") == "sqlite"
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+    runpy.run_path("gunicorn.conf.py")
+    assert "DASHBOARD_CACHE" not in os.environ
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    monkeypatch.setenv("DASHBOARD_CACHE", "nenhum")
+    runpy.run_path("gunicorn.conf.py")
+    assert os.environ["DASHBOARD_CACHE"] == "nenhum"
@@ -0,0 +1,10 @@
+"""Ponto de entrada WSGI para produção
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+O esquema do banco é criado antes, por ``flask banco criar``. Os workers não
+precisam do Flask-Migrate (nem do Alembic que ele importa).
+"""
+from app import create_app
+
+app = create_app({"MIGRACOES": False})
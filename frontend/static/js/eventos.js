@@ -0,0 +1,59 @@
+// Atualiza a página quando /api/eventos avisa de uma mudança nos serviços
+// (dashboard, lista e detalhe do serviço; ver base.html)
+(function () {
+    if (!('EventSource' in window)) return;
+
+    const script = document.currentScript;
+    // No detalhe, só os eventos do serviço aberto interessam
+    const servicoId = Number(script.dataset.servicoId) || null;
+    const TIPOS = ['servico_status', 'orcamento_criado', 'orcamento_aprovado', 'recarregar'];
+    // Várias mudanças seguidas (ex. atualização em lote) viram uma recarga só
+    const ESPERA_MS = 1000;
+    let pendente = null;
+
+    function editando() {
+        const ativo = document.activeElement;
+        return Boolean(ativo && ativo.form && ['INPUT', 'TEXTAREA', 'SELECT'].includes(ativo.tagName));
+    }
+
+    // Com um formulário em edição, avisa em vez de recarregar (perderia o que foi digitado)
+    function avisar() {
+        if (document.getElementById('aviso-atualizacao')) return;
+        const aviso = document.createElement('div');
+        aviso.id = 'aviso-atualizacao';
+        aviso.className = 'alert alert-info alert-permanent';
+        aviso.setAttribute('role', 'status');
+        aviso.innerHTML = '<i class="bi bi-arrow-clockwise"></i>' +
+            '<div>Há atualizações nesta página. <a href="#">Recarregar</a></div>';
+        aviso.querySelector('a').addEventListener('click', function (e) {
+            e.preventDefault();
+            location.reload();
+        });
+        document.querySelector('.page-content')?.prepend(aviso);
+    }
+
+    function atualizar(evento) {
+        if (servicoId && evento.type !== 'recarregar') {
+            const dados = JSON.parse(evento.data);
+            if (dados.servico_id !== servicoId) return;
+        }
+        clearTimeout(pendente);
+        pendente = setTimeout(() => (editando() ? avisar() : location.reload()), ESPERA_MS);
+    }
+
+    function conectar() {
+        // As páginas se autenticam pelo cookie de sessão
+        const fonte = new EventSource('/api/eventos');
+        TIPOS.forEach(tipo => fonte.addEventListener(tipo, atualizar));
+        fonte.onerror = function () {
+            // Resposta de erro (503 no limite de conexões, sessão expirada): o
+            // navegador não reconecta sozinho; tenta de novo mais tarde, com
+            // jitter para as páginas recusadas juntas não voltarem juntas
+            if (fonte.readyState === EventSource.CLOSED) {
+                setTimeout(conectar, 30000 + Math.random() * 30000);
+            }
+        };
+    }
+
+    conectar();
+})();